@@ -98,6 +98,14 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
   // Fee paid in BTC to burn lst tokens
   uint64 public utxoFee;
 
+  // the last round of each continuous range of rounds with a non-zero accruedRewardPerBTCMap value,
+  // it is used to look up the accrued reward of a round which has no value by binary search
+  uint256[] continuousRewardEndRounds;
+
+  // whether continuousRewardEndRounds has been seeded with the rounds distributed before it was added
+  // to the contract
+  bool continuousRewardEndRoundsSeeded;
+
   struct BtcTx {
     uint64 amount;
     uint32 outputIndex;
@@ -267,12 +275,18 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     for (uint256 i = 0; i < validatorSize; ++i) {
       reward += rewardList[i];
     }
-    if (stakedAmount == 0) {
-      accruedRewardPerBTCMap[roundTag] = _getRoundRewardPerBTC(roundTag-1);
-    } else {
-      accruedRewardPerBTCMap[roundTag] = _getRoundRewardPerBTC(roundTag-1) + reward * SatoshiPlusHelper.BTC_DECIMAL / stakedAmount;
+    if (!continuousRewardEndRoundsSeeded) {
+      _seedContinuousRewardEndRounds();
+    }
+    uint256 accruedReward = _getRoundRewardPerBTC(roundTag-1);
+    if (stakedAmount != 0) {
+      accruedReward += reward * SatoshiPlusHelper.BTC_DECIMAL / stakedAmount;
     }
-    emit rewardUpdated(roundTag, accruedRewardPerBTCMap[roundTag]);
+    accruedRewardPerBTCMap[roundTag] = accruedReward;
+    if (accruedReward != 0) {
+      _updateContinuousRewardEndRounds(roundTag);
+    }
+    emit rewardUpdated(roundTag, accruedReward);
   }
 
   /// Get staked BTC amount.
@@ -325,6 +339,13 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     return (reward, 0, accStakedAmount);
   }
 
+  /// Collect rewards of a range of the delegator's stake records without claiming them
+  function collectRewardRange(address /*delegator*/, uint256 start, uint256 /*count*/) external view override onlyStakeHub returns (uint256 next, bool finished) {
+    // LST rewards are tracked per holder in rewardMap and claimed whole by claimReward, there are no stake
+    // records to collect in ranges, so every range is finished where it starts
+    return (start, true);
+  }
+
   /*********************** External implementations ***************************/
   /// Burn LST token and redeem BTC assets.
   /// This method is called by LST holders.
@@ -565,13 +586,76 @@ contract BitcoinLSTStake is IBitcoinStake, System, IParamSubscriber, ReentrancyG
     if (round <= initRound) {
       return 0;
     }
-    for (;round != initRound; --round) {
-      reward = accruedRewardPerBTCMap[round];
-      if (reward != 0) {
-        return reward;
+    reward = accruedRewardPerBTCMap[round];
+    if (reward != 0) {
+      return reward;
+    }
+
+    // the accrued reward map is not updated on rounds without a reward distribution, e.g. before the first
+    // LST reward or when rounds are skipped, the accrued reward for round N == a round smaller but also
+    // closest to N. here we use binary search to get that round efficiently
+    uint256 b = continuousRewardEndRounds.length;
+    if (b == 0 || continuousRewardEndRounds[0] >= round) {
+      return 0;
+    }
+    b -= 1;
+    uint256 a;
+    uint256 m;
+    uint256 targetRound;
+    uint256 t;
+    while (a <= b) {
+      m = (a + b) / 2;
+      t = continuousRewardEndRounds[m];
+      if (t < round) {
+        targetRound = t;
+        a = m + 1;
+      } else {
+        b = m - 1;
       }
     }
-    return 0;
+
+    if (targetRound > initRound) {
+      reward = accruedRewardPerBTCMap[targetRound];
+    }
+    return reward;
+  }
+
+  /// index the rounds distributed before continuousRewardEndRounds was added to the contract, it runs once
+  /// on the first reward distribution after the upgrade
+  function _seedContinuousRewardEndRounds() internal {
+    continuousRewardEndRoundsSeeded = true;
+    if (roundTag <= initRound + 1) {
+      return;
+    }
+    uint256[] memory endRounds = new uint256[](roundTag - initRound - 1);
+    uint256 count;
+    bool inRange;
+    for (uint256 round = roundTag - 1; round > initRound; --round) {
+      if (accruedRewardPerBTCMap[round] == 0) {
+        inRange = false;
+      } else if (!inRange) {
+        inRange = true;
+        endRounds[count++] = round;
+      }
+    }
+    while (count != 0) {
+      continuousRewardEndRounds.push(endRounds[--count]);
+    }
+  }
+
+  /// record a round with a non-zero accrued reward in continuousRewardEndRounds
+  /// @param round the round to record
+  function _updateContinuousRewardEndRounds(uint256 round) internal {
+    uint256 l = continuousRewardEndRounds.length;
+    uint256 lastRewardRound;
+    if (l != 0) {
+      lastRewardRound = continuousRewardEndRounds[l - 1];
+    }
+    if (l != 0 && lastRewardRound + 1 == round) {
+      continuousRewardEndRounds[l - 1] = round;
+    } else if (lastRewardRound < round) {
+      continuousRewardEndRounds.push(round);
+    }
   }
 
   /// calculate user reward and update internal reward map
@@ -70,6 +70,11 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   // whether the time grading is enabled
   bool public gradeActive;
 
+  // This field keeps the progress of collectRewardRange calls
+  // key: delegator address
+  // value: the round and the number of leading txids in delegatorMap whose rewards are collected in it
+  mapping(address => ClaimCursor) public claimCursorMap;
+
   struct BtcTx {
     uint64 amount;
     uint32 outputIndex;
@@ -99,6 +104,11 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     mapping(address => uint256) amountMap;
   }
 
+  struct ClaimCursor {
+    uint256 round;
+    uint256 index;
+  }
+
   struct LockLengthGrade {
     uint64 lockDuration; // In second
     uint32 percentage; // [0 ~ DENOMINATOR]
@@ -290,7 +300,16 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
   function claimReward(address delegator) external override onlyBtcAgent returns (uint256 reward, uint256 rewardUnclaimed, uint256 accStakedAmount) {
     bool expired;
     bytes32[] storage txids = delegatorMap[delegator].txids;
-    for (uint256 i = txids.length; i != 0; i--) {
+    // the leading txids collected by collectRewardRange in this round are skipped
+    uint256 collected;
+    ClaimCursor storage cursor = claimCursorMap[delegator];
+    if (cursor.round != 0) {
+      if (cursor.round == roundTag) {
+        collected = cursor.index;
+      }
+      delete claimCursorMap[delegator];
+    }
+    for (uint256 i = txids.length; i > collected; i--) {
       (, expired, ) = _collectReward(txids[i - 1]);
       if (expired) {
         if (i != txids.length) {
@@ -307,6 +326,44 @@ contract BitcoinStake is IBitcoinStake, System, IParamSubscriber, ReentrancyGuar
     }
   }
 
+  /// Collect rewards of a range of the delegator's BTC stake transactions without claiming them, so that
+  /// a delegator with too many transactions to claim in one call can spread them over several calls.
+  /// The progress is kept until the round ends, claimReward then only iterates the remaining transactions
+  /// @param delegator the delegator address
+  /// @param start the index of the first transaction to collect, no larger than the index returned by the last call in this round
+  /// @param count the maximum number of transactions to collect
+  /// @return next the index to start the next call from
+  /// @return finished whether the rewards of all transactions are collected in this round
+  function collectRewardRange(address delegator, uint256 start, uint256 count) external override onlyStakeHub returns (uint256 next, bool finished) {
+    ClaimCursor storage cursor = claimCursorMap[delegator];
+    uint256 collected;
+    if (cursor.round == roundTag) {
+      collected = cursor.index;
+    }
+    require(start <= collected, "invalid claim cursor");
+
+    bool expired;
+    bytes32[] storage txids = delegatorMap[delegator].txids;
+    next = start;
+    for (uint256 n = 0; n < count && next < txids.length; n++) {
+      (, expired, ) = _collectReward(txids[next]);
+      if (expired) {
+        // the last txid takes the place of the expired one and is collected next
+        txids[next] = txids[txids.length - 1];
+        txids.pop();
+      } else {
+        next++;
+      }
+    }
+    if (next < collected) {
+      next = collected < txids.length ? collected : txids.length;
+    }
+
+    cursor.round = roundTag;
+    cursor.index = next;
+    finished = next == txids.length;
+  }
+
   /// Start new round, this is called by the CandidateHub contract
   /// @param validators List of elected validators in this round
   /// @param round The new round tag
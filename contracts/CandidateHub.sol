@@ -33,6 +33,9 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
   uint256 public constant ACTIVE_STATUS = SET_CANDIDATE | SET_VALIDATOR;
   uint256 public constant UNREGISTER_STATUS = SET_CANDIDATE | SET_INACTIVE | SET_MARGIN;
 
+  // getValidators moves on to the score tree once its partitions have scanned this many times the candidates
+  uint256 internal constant SELECT_SCAN_FACTOR = 4;
+
   // the refundable deposit
   uint256 public requiredMargin;
   // the unregister fee
@@ -383,6 +386,10 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
   }
 
   /// Rank validator candidates on hybrid score using quicksort
+  /// The partitions scan O(n) candidates in total on most layouts, but O(n^2) on all-equal or sorted scores.
+  /// Once they have scanned SELECT_SCAN_FACTOR times the candidates, the remaining partitions run on a
+  /// min/max tree of the scores which finds each candidate to move in O(logn). The validators, their order
+  /// and scoreList are the same either way, and the selection is bounded to O(nlogn)
   function getValidators(address[] memory candidateList, uint256[] memory scoreList, uint256 count) internal pure returns (address[] memory validatorList){
     uint256 candidateSize = candidateList.length;
     // quicksort by scores O(nlogk)
@@ -393,7 +400,13 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     } else {
       count = candidateSize;
     }
+    uint256 scanned;
     while (l < r) {
+      if (scanned > candidateSize * SELECT_SCAN_FACTOR) {
+        selectOnScoreTree(candidateList, scoreList, count, l, r);
+        break;
+      }
+      scanned += r - l + 1;
       // partition
       uint256 ll = l;
       uint256 rr = r;
@@ -432,6 +445,129 @@ contract CandidateHub is ICandidateHub, System, IParamSubscriber {
     return candidateList;
   }
 
+  /// Run the partitions of getValidators on [l, r] with the scores kept in a min/max tree. Each scan of a
+  /// partition becomes a search of the tree and each move an update of it, both O(logn). A partition moves
+  /// at most twice as many candidates as it discards, so the whole selection is O(nlogn)
+  function selectOnScoreTree(address[] memory candidateList, uint256[] memory scoreList, uint256 count, uint256 l, uint256 r) internal pure {
+    (uint256[] memory minTree, uint256[] memory maxTree) = buildScoreTree(scoreList);
+    while (l < r) {
+      // partition
+      uint256 ll = l;
+      uint256 rr = r;
+      address back = candidateList[ll];
+      uint256 p = scoreList[ll];
+      while (ll < rr) {
+        rr = findLastNotBelow(maxTree, ll, rr, p);
+        candidateList[ll] = candidateList[rr];
+        scoreList[ll] = scoreList[rr];
+        updateScoreTree(minTree, maxTree, ll, scoreList[ll]);
+        ll = findFirstBelow(minTree, ll, rr, p);
+        candidateList[rr] = candidateList[ll];
+        scoreList[rr] = scoreList[ll];
+        updateScoreTree(minTree, maxTree, rr, scoreList[rr]);
+      }
+      candidateList[ll] = back;
+      scoreList[ll] = p;
+      updateScoreTree(minTree, maxTree, ll, p);
+      // sub sort
+      if (ll < count) {
+        l = ll + 1;
+      } else if (ll > count) {
+        r = ll - 1;
+      } else {
+        break;
+      }
+    }
+  }
+
+  /// Build the min and max trees of the scores, node i has the children 2i and 2i+1 and score j is the leaf
+  /// size+j. The leaves past the scores never match a search
+  function buildScoreTree(uint256[] memory scoreList) internal pure returns (uint256[] memory minTree, uint256[] memory maxTree) {
+    uint256 scoreSize = scoreList.length;
+    uint256 size = 1;
+    while (size < scoreSize) {
+      size <<= 1;
+    }
+    minTree = new uint256[](size * 2);
+    maxTree = new uint256[](size * 2);
+    for (uint256 i = 0; i < size; ++i) {
+      if (i < scoreSize) {
+        minTree[size + i] = scoreList[i];
+        maxTree[size + i] = scoreList[i];
+      } else {
+        minTree[size + i] = type(uint256).max;
+      }
+    }
+    for (uint256 i = size - 1; i != 0; --i) {
+      minTree[i] = minTree[2 * i] < minTree[2 * i + 1] ? minTree[2 * i] : minTree[2 * i + 1];
+      maxTree[i] = maxTree[2 * i] > maxTree[2 * i + 1] ? maxTree[2 * i] : maxTree[2 * i + 1];
+    }
+  }
+
+  /// Set score j in the trees and fix its ancestors, up to the first one left unchanged
+  function updateScoreTree(uint256[] memory minTree, uint256[] memory maxTree, uint256 j, uint256 score) internal pure {
+    uint256 i = minTree.length / 2 + j;
+    minTree[i] = score;
+    maxTree[i] = score;
+    for (i >>= 1; i != 0; i >>= 1) {
+      uint256 minScore = minTree[2 * i] < minTree[2 * i + 1] ? minTree[2 * i] : minTree[2 * i + 1];
+      uint256 maxScore = maxTree[2 * i] > maxTree[2 * i + 1] ? maxTree[2 * i] : maxTree[2 * i + 1];
+      if (minTree[i] == minScore && maxTree[i] == maxScore) {
+        break;
+      }
+      minTree[i] = minScore;
+      maxTree[i] = maxScore;
+    }
+  }
+
+  /// The first j in [lo, hi) with a score below p, or hi when there is none
+  function findFirstBelow(uint256[] memory minTree, uint256 lo, uint256 hi, uint256 p) internal pure returns (uint256) {
+    uint256 size = minTree.length / 2;
+    uint256 i = size + lo;
+    // move on to the subtree right next to i until one has a score below p
+    while (minTree[i] >= p) {
+      while ((i & 1) == 1) {
+        i >>= 1;
+      }
+      if (i == 0) {
+        return hi;
+      }
+      ++i;
+    }
+    while (i < size) {
+      i <<= 1;
+      if (minTree[i] >= p) {
+        ++i;
+      }
+    }
+    i -= size;
+    return i < hi ? i : hi;
+  }
+
+  /// The last j in (lo, hi] with a score not below p, or lo when there is none
+  function findLastNotBelow(uint256[] memory maxTree, uint256 lo, uint256 hi, uint256 p) internal pure returns (uint256) {
+    uint256 size = maxTree.length / 2;
+    uint256 i = size + hi;
+    // move on to the subtree left next to i until one has a score not below p
+    while (maxTree[i] < p) {
+      while ((i & 1) == 0) {
+        i >>= 1;
+      }
+      if (i == 1) {
+        return lo;
+      }
+      --i;
+    }
+    while (i < size) {
+      i = 2 * i + 1;
+      if (maxTree[i] < p) {
+        --i;
+      }
+    }
+    i -= size;
+    return i > lo ? i : lo;
+  }
+
   function nextRound() internal virtual {
     uint256 roundTimestamp = block.timestamp / SatoshiPlusHelper.ROUND_INTERVAL;
     require(roundTimestamp > roundTag, "not allowed to turn round, wait for more time");
@@ -47,6 +47,10 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   // if the current surplus is not enough to pay the next extra rewards, system reward contract will be called to refill
   uint256 public surplus;
 
+  // key: delegator address
+  // value: the address allowed to claim rewards on behalf of the delegator through claimRewardFor
+  mapping(address => address) public rewardClaimerMap;
+
   struct Asset {
     string  name;
     address agent;
@@ -63,6 +67,7 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   event claimedReward(address indexed delegator, uint256 amount);
   event claimedRelayerReward(address indexed relayer, uint256 amount);
   event received(address indexed from, uint256 amount);
+  event rewardClaimerUpdated(address indexed delegator, address indexed claimer);
 
   modifier onlyPledgeAgent() {
     require(msg.sender == PLEDGE_AGENT_ADDR, "the sender must be pledge agent contract");
@@ -196,19 +201,63 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
   /// Claim reward for delegator
   /// @return rewards Amounts claimed
   function claimReward() external returns (uint256[] memory rewards) {
+    rewards = _claimReward(msg.sender);
+  }
+
+  /// Claim reward for delegator in several calls, for delegators with more BTC stake transactions than
+  /// claimReward can iterate within the block gas limit. Each call collects the BTC rewards of up to count
+  /// transactions, the call which collects the last one claims the rewards of all assets.
+  /// @param start the index of the first BTC stake transaction to collect, 0 or the value returned by the previous call in this round
+  /// @param count the maximum number of BTC stake transactions to collect
+  /// @return next the index to start the next call from
+  /// @return rewards Amounts claimed, empty until all BTC stake transactions are collected
+  function claimRewardRange(uint256 start, uint256 count) external returns (uint256 next, uint256[] memory rewards) {
     address delegator = msg.sender;
-    rewards = _calculateReward(delegator);
+    bool finished;
+    (next, finished) = IBitcoinStake(BTC_STAKE_ADDR).collectRewardRange(delegator, start, count);
+    if (finished) {
+      rewards = _claimReward(delegator);
+    }
+  }
 
-    uint256 reward;
-    for (uint256 i = 0; i < rewards.length; i++) {
-      reward += rewards[i];
+  /// Claim reward for a list of delegators, each of them is the sender or has set the sender as its reward claimer.
+  /// The rewards are sent to the delegators, the agents are loaded and the surplus is settled once for the whole list
+  /// @param delegators List of delegator addresses
+  /// @return rewards Amounts claimed for each delegator
+  function claimRewardFor(address[] calldata delegators) external returns (uint256[] memory rewards) {
+    uint256 delegatorSize = delegators.length;
+    address[] memory agents = _getAgents();
+    rewards = new uint256[](delegatorSize);
+    uint256[] memory assetRewards;
+    int256 floatReward;
+    int256 totalFloatReward;
+    address delegator;
+    for (uint256 i = 0; i < delegatorSize; ++i) {
+      delegator = delegators[i];
+      require(delegator == msg.sender || rewardClaimerMap[delegator] == msg.sender, "not allowed to claim for the delegator");
+      (assetRewards, floatReward) = _collectReward(delegator, agents);
+      for (uint256 j = 0; j < assetRewards.length; ++j) {
+        rewards[i] += assetRewards[j];
+      }
+      totalFloatReward += floatReward;
     }
-    if (reward != 0) {
-      Address.sendValue(payable(delegator), reward);
-      emit claimedReward(delegator, reward);
+    _settleFloatReward(totalFloatReward);
+
+    for (uint256 i = 0; i < delegatorSize; ++i) {
+      if (rewards[i] != 0) {
+        Address.sendValue(payable(delegators[i]), rewards[i]);
+        emit claimedReward(delegators[i], rewards[i]);
+      }
     }
   }
 
+  /// Allow an address to claim rewards on behalf of the sender through claimRewardFor, the rewards are still sent to the sender
+  /// @param claimer the claimer address, address(0) to revoke
+  function setRewardClaimer(address claimer) external {
+    rewardClaimerMap[msg.sender] = claimer;
+    emit rewardClaimerUpdated(msg.sender, claimer);
+  }
+
   /// Claim reward for PledgeAgent
   /// @param delegator delegator address
   /// @return reward Amounts claimed
@@ -223,31 +272,70 @@ contract StakeHub is IStakeHub, System, IParamSubscriber {
     }
   }
 
+  /// Claim reward for delegator and send it to the delegator
+  /// @param delegator delegator address
+  /// @return rewards Amounts claimed
+  function _claimReward(address delegator) internal returns (uint256[] memory rewards) {
+    rewards = _calculateReward(delegator);
+
+    uint256 reward;
+    for (uint256 i = 0; i < rewards.length; i++) {
+      reward += rewards[i];
+    }
+    if (reward != 0) {
+      Address.sendValue(payable(delegator), reward);
+      emit claimedReward(delegator, reward);
+    }
+  }
+
   /// Calculate reward for delegator
   /// @param delegator delegator address
   /// @return rewards Amounts claimed
   function _calculateReward(address delegator) internal returns (uint256[] memory rewards) {
-    uint256 assetSize = assets.length;
+    int256 floatReward;
+    (rewards, floatReward) = _collectReward(delegator, _getAgents());
+    _settleFloatReward(floatReward);
+  }
+
+  /// Claim reward of each asset for delegator from the agents
+  /// @param delegator delegator address
+  /// @param agents List of agent addresses of the assets
+  /// @return rewards Amounts claimed
+  /// @return totalFloatReward Sum of the floating reward amounts
+  function _collectReward(address delegator, address[] memory agents) internal returns (uint256[] memory rewards, int256 totalFloatReward) {
+    uint256 assetSize = agents.length;
     rewards = new uint256[](assetSize);
     int256 floatReward;
     uint256 accStakedCoreAmount;
-    (rewards[0], floatReward, accStakedCoreAmount) = IAgent(assets[0].agent).claimReward(delegator, 0);
+    (rewards[0], floatReward, accStakedCoreAmount) = IAgent(agents[0]).claimReward(delegator, 0);
 
-    uint256 totalReward = rewards[0];
-    int256 totalFloatReward = floatReward;
+    totalFloatReward = floatReward;
     for (uint256 i = 1; i < assetSize; ++i) {
-      (rewards[i], floatReward,) = IAgent(assets[i].agent).claimReward(delegator, accStakedCoreAmount);
-      totalReward += rewards[i];
+      (rewards[i], floatReward,) = IAgent(agents[i]).claimReward(delegator, accStakedCoreAmount);
       totalFloatReward += floatReward;
     }
+  }
 
-    if (totalFloatReward > surplus.toInt256()) {
+  /// Pay floating rewards from the surplus, refill it from the system reward contract if needed
+  /// @param floatReward floating reward amount
+  function _settleFloatReward(int256 floatReward) internal {
+    if (floatReward > surplus.toInt256()) {
       // move 10x from system reward as a buffer for the next claim calls
-      uint256 claimAmount = totalFloatReward.toUint256() * 10;
+      uint256 claimAmount = floatReward.toUint256() * 10;
       ISystemReward(SYSTEM_REWARD_ADDR).claimRewards(payable(STAKE_HUB_ADDR), claimAmount);
       surplus += claimAmount;
     }
-    surplus = (surplus.toInt256() - totalFloatReward).toUint256();
+    surplus = (surplus.toInt256() - floatReward).toUint256();
+  }
+
+  /// Get the agent addresses of the assets
+  /// @return agents List of agent addresses
+  function _getAgents() internal view returns (address[] memory agents) {
+    uint256 assetSize = assets.length;
+    agents = new address[](assetSize);
+    for (uint256 i = 0; i < assetSize; ++i) {
+      agents[i] = assets[i].agent;
+    }
   }
 
   /*********************** Governance ********************************/
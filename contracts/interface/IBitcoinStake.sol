@@ -45,4 +45,12 @@ interface IBitcoinStake {
   /// @return rewardUnclaimed Amount unclaimed
   /// @return accStakedAmount accumulated stake amount (multiplied by days), used for grading calculation
   function claimReward(address delegator) external returns (uint256 reward, uint256 rewardUnclaimed, uint256 accStakedAmount);
+
+  /// Collect rewards of a range of the delegator's stake records without claiming them
+  /// @param delegator the delegator address
+  /// @param start the index of the first record to collect
+  /// @param count the maximum number of records to collect
+  /// @return next the index to start the next call from
+  /// @return finished whether the rewards of all records are collected in this round
+  function collectRewardRange(address delegator, uint256 start, uint256 count) external returns (uint256 next, bool finished);
 }
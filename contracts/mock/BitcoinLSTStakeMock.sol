@@ -55,6 +55,24 @@ contract BitcoinLSTStakeMock is BitcoinLSTStake {
 
     function setAccruedRewardPerBTCMap(uint256 round, uint256 value) external {
         accruedRewardPerBTCMap[round] = value;
+        continuousRewardEndRoundsSeeded = true;
+        // a round below the last indexed one is not indexed, set the rounds in ascending order
+        if (value != 0) {
+            _updateContinuousRewardEndRounds(round);
+        }
+    }
+
+    // as a contract upgraded in place has it, the rounds from before continuousRewardEndRounds are not indexed
+    function setLegacyAccruedRewardPerBTCMap(uint256 round, uint256 value) external {
+        accruedRewardPerBTCMap[round] = value;
+    }
+
+    function getContinuousRewardEndRounds() external view returns (uint256[] memory) {
+        return continuousRewardEndRounds;
+    }
+
+    function setUserStakeInfo(address delegator, uint256 changeRound, uint64 realtimeAmount, uint64 stakedAmount) external {
+        userStakeInfo[delegator] = UserStakeInfo(changeRound, realtimeAmount, stakedAmount);
     }
 
 
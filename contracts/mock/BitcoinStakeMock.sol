@@ -65,6 +65,16 @@ contract BitcoinStakeMock is BitcoinStake {
         delegatorMap[delegator].txids.push(value);
     }
 
+    function setBtcStakeTxs(address delegator, address candidate, uint256 start, uint256 count, uint256 round, uint64 amount, uint32 lockTime) external {
+        bytes32 txid;
+        for (uint256 i = start; i < start + count; i++) {
+            txid = keccak256(abi.encodePacked(delegator, i));
+            btcTxMap[txid] = BtcTx(amount, 0, lockTime - 1, lockTime, 0);
+            receiptMap[txid] = DepositReceipt(candidate, delegator, round);
+            delegatorMap[delegator].txids.push(txid);
+        }
+    }
+
     function getRound2expireInfoMap(uint256 round) external view returns (address[] memory candidateList, uint256[] memory amounts) {
         ExpireInfo storage expireInfo = round2expireInfoMap[round];
         address[] memory candidateList = expireInfo.candidateList;
@@ -37,6 +37,36 @@ contract BtcLightClientMock is BtcLightClient {
         timesTamp = value1;
     }
 
+    // restarts the chain from the given header as init does from INIT_CONSENSUS_STATE_BYTES, the synthetic
+    // header chains of the load tests are not children of the mainnet block the light client starts from
+    function resetInitBlock(bytes memory headerBytes, uint32 blockHeight) public {
+        bytes32 blockHash = doubleShaFlip(headerBytes);
+        uint32 adjustment = blockHeight / DIFFICULTY_ADJUSTMENT_INTERVAL;
+
+        highScore = 1;
+        heaviestBlock = blockHash;
+        initBlockHash = blockHash;
+        adjustmentHashes[adjustment] = blockHash;
+        blockChain[blockHash] = encode(headerBytes, address(0), 1, blockHeight, adjustment, address(0));
+    }
+
+    // stores a header on top of a known parent without checking its proof of work, so that synthetic blocks
+    // can be relayed and checkTxProof verifies real merkle proofs against them
+    function storeMockBlockHeader(bytes memory headerBytes) public {
+        bytes32 blockHash = doubleShaFlip(headerBytes);
+        bytes32 prevHash = flip32Bytes(bytes32(loadInt256(36, headerBytes)));
+        uint256 scorePrevBlock = getScore(prevHash);
+        require(scorePrevBlock != 0, "unknown parent");
+
+        uint32 blockHeight = getHeight(prevHash) + 1;
+        uint256 scoreBlock = scorePrevBlock + 1;
+        blockChain[blockHash] = encode(
+            headerBytes, address(0), scoreBlock, blockHeight, blockHeight / DIFFICULTY_ADJUSTMENT_INTERVAL, address(0));
+        height2HashMap[blockHeight] = blockHash;
+        heaviestBlock = blockHash;
+        highScore = scoreBlock;
+    }
+
     function setMiners(uint roundTimeTag, address candidate, address[] memory rewardAddrs) public {
         RoundPower storage r = roundPowerMap[roundTimeTag];
         bool exist;
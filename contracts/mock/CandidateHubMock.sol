@@ -125,6 +125,79 @@ contract CandidateHubMock is CandidateHub {
         return getValidators(candidateList, scoreList, count);
     }
 
+    /// getValidators with every partition on the score tree, it must match the quickselect on every input
+    function getValidatorsScoreTreeMock(
+        address[] memory candidateList,
+        uint256[] memory scoreList,
+        uint256 count
+    ) public pure returns (address[] memory) {
+        uint256 candidateSize = candidateList.length;
+        if (count >= candidateSize) {
+            return candidateList;
+        }
+        selectOnScoreTree(candidateList, scoreList, count, 0, candidateSize - 1);
+        uint256 d = candidateSize - count;
+        assembly {
+            mstore(candidateList, sub(mload(candidateList), d))
+        }
+        return candidateList;
+    }
+
+    /// getValidators as it was before the score tree, the reference it must match on every input and of the gas
+    /// benchmark
+    function getValidatorsQuickselectMock(
+        address[] memory candidateList,
+        uint256[] memory scoreList,
+        uint256 count
+    ) public pure returns (address[] memory) {
+        uint256 candidateSize = candidateList.length;
+        // quicksort by scores O(nlogk)
+        uint256 l = 0;
+        uint256 r = 0;
+        if (count < candidateSize) {
+            r = candidateSize - 1;
+        } else {
+            count = candidateSize;
+        }
+        while (l < r) {
+            // partition
+            uint256 ll = l;
+            uint256 rr = r;
+            address back = candidateList[ll];
+            uint256 p = scoreList[ll];
+            while (ll < rr) {
+                while (ll < rr && scoreList[rr] < p) {
+                    rr = rr - 1;
+                }
+                candidateList[ll] = candidateList[rr];
+                scoreList[ll] = scoreList[rr];
+                while (ll < rr && scoreList[ll] >= p) {
+                    ll = ll + 1;
+                }
+                candidateList[rr] = candidateList[ll];
+                scoreList[rr] = scoreList[ll];
+            }
+            candidateList[ll] = back;
+            scoreList[ll] = p;
+            uint256 mid = ll;
+            // sub sort
+            if (mid < count) {
+                l = mid + 1;
+            } else if (mid > count) {
+                r = mid - 1;
+            } else {
+                break;
+            }
+        }
+        uint256 d = candidateSize - count;
+        if (d != 0) {
+            assembly {
+                mstore(candidateList, sub(mload(candidateList), d))
+            }
+        }
+        return candidateList;
+    }
+
     function cleanMock() public {
         ISlashIndicator(SLASH_CONTRACT_ADDR).clean();
     }
@@ -0,0 +1,25 @@
+pragma solidity 0.8.4;
+
+contract Multicall {
+    struct Call {
+        address target;
+        bytes callData;
+    }
+
+    struct Result {
+        bool success;
+        bytes returnData;
+    }
+
+    function tryAggregate(Call[] calldata calls) external view returns (Result[] memory results) {
+        results = new Result[](calls.length);
+        for (uint256 i = 0; i < calls.length; i++) {
+            (bool success, bytes memory returnData) = calls[i].target.staticcall(calls[i].callData);
+            results[i] = Result(success, returnData);
+        }
+    }
+
+    function getEthBalance(address addr) external view returns (uint256) {
+        return addr.balance;
+    }
+}
@@ -0,0 +1,186 @@
+import argparse
+import queue
+import sys
+import time
+from hexbytes import HexBytes
+from ..btc_header_chain import load_header_chain, GENESIS_HEIGHT, DIFFICULTY_ADJUSTMENT_INTERVAL
+from ..scenario.scenario_runner import init_worker, BASE_PORT
+from .gas_baseline import check_baseline
+
+BASELINE_NAME = "btc_light_client"
+GAS_KEYS = ["gas_per_header", "max_gas", "reorg_gas", "distribute_gas", "retarget_gas"]
+
+LINEAR_HEADERS = 10000
+REORG_COUNT = 20
+REORG_DEPTH = 6
+REORG_SPACING = 50
+RELAYER_COUNT = 50
+RETARGET_WINDOW = 100
+
+
+class HeaderRelay:
+    # relays synthetic blocks to BtcLightClientMock and records the gas of every header, the light client is
+    # restarted from the genesis of the chain first. the candidate and reward addresses of the coinbase are
+    # picked up by the lightclient precompile of a Core node, a dev node has none, so addMinerPower walks its
+    # CONFIRM_BLOCK parents but records no power
+    def __init__(self, genesis, relayers):
+        from brownie import BtcLightClientMock, RelayerHubMock
+
+        self.light_client = BtcLightClientMock[0]
+        self.light_client.resetInitBlock(genesis.get_header(), genesis.height)
+
+        self.gas_price = self.light_client.storeBlockGasPrice()
+        if self.gas_price == 0:
+            self.gas_price = self.light_client.INIT_STORE_BLOCK_GAS_PRICE()
+
+        self.relayers = relayers
+        for relayer in relayers:
+            if not RelayerHubMock[0].isRelayer(relayer):
+                RelayerHubMock[0].register({'from': relayer, 'value': RelayerHubMock[0].requiredDeposit()})
+
+        # (block, gas used) of every relayed header
+        self.records = []
+        self.elapsed = 0
+
+    def relay(self, block):
+        relayer = self.relayers[len(self.records) % len(self.relayers)]
+
+        start_time = time.perf_counter()
+        tx_receipt = self.light_client.storeBlockHeader(block.get_hex(), {'from': relayer, 'gas_price': self.gas_price})
+        self.elapsed += time.perf_counter() - start_time
+
+        assert 'StoreHeaderFailed' not in tx_receipt.events, f"{block} rejected: {tx_receipt.events['StoreHeaderFailed']}"
+        self.records.append((block, tx_receipt.gas_used))
+        return tx_receipt.gas_used
+
+    def get_tip_height(self):
+        return self.light_client.getChainTipHeight()
+
+    def get_tip_hash(self):
+        return bytes(HexBytes(self.light_client.heaviestBlock()))
+
+    def summarize(self):
+        gas_used = [gas for block, gas in self.records]
+        return {
+            "headers": len(gas_used),
+            "gas_per_header": sum(gas_used) // len(gas_used),
+            "max_gas": max(gas_used),
+            "headers_per_second": round(len(gas_used) / self.elapsed, 1)
+        }
+
+
+def mean(values):
+    return sum(values) // len(values) if len(values) > 0 else 0
+
+
+def bench_linear(accounts, header_count):
+    chain = load_header_chain(header_count)
+    relay = HeaderRelay(chain.get_genesis(), [accounts[0]])
+    for block in chain.get_blocks():
+        relay.relay(block)
+
+    assert relay.get_tip_height() == chain.get_blocks()[-1].height
+    return relay.summarize()
+
+
+def bench_deep_reorg(accounts, reorg_count, reorg_depth):
+    # every fork branches off reorg_depth blocks below the main chain tip. the synthetic blocks add no chain work,
+    # see EASY_BITS, so each fork block takes the tip as it is relayed. the next main chain block takes the tip
+    # back and walks height2HashMap back over the whole fork, up to CONFIRM_BLOCK heights, its gas is the reorg
+    length = (reorg_count + 1) * REORG_SPACING
+    fork_heights = [GENESIS_HEIGHT + (i + 1) * REORG_SPACING for i in range(reorg_count)]
+    chain = load_header_chain(length, forks=[(fork_height, reorg_depth) for fork_height in fork_heights])
+
+    forks = {fork[-1].height + 1: fork for fork in chain.get_forks()}
+    relay = HeaderRelay(chain.get_genesis(), [accounts[0]])
+
+    reorg_gas = []
+    for block in chain.get_blocks():
+        fork = forks.get(block.height)
+        if fork is not None:
+            for fork_block in fork:
+                relay.relay(fork_block)
+                assert relay.get_tip_hash() == fork_block.block_hash, f"{fork_block} did not take the tip"
+
+            reorg_gas.append(relay.relay(block))
+        else:
+            relay.relay(block)
+        assert relay.get_tip_hash() == block.block_hash, f"{block} did not take the tip"
+
+    assert relay.get_tip_height() == chain.get_blocks()[-1].height
+    results = relay.summarize()
+    results["reorg_gas"] = mean(reorg_gas)
+    return results
+
+
+def bench_many_relayers(accounts, relayer_count, header_count):
+    # distributeRelayerReward iterates headerRelayerAddressRecord every roundSize headers
+    chain = load_header_chain(header_count, seed=1)
+    relay = HeaderRelay(chain.get_genesis(), list(accounts[:relayer_count]))
+    round_size = relay.light_client.roundSize()
+
+    distribute_gas = []
+    for i, block in enumerate(chain.get_blocks()):
+        gas_used = relay.relay(block)
+        if (i + 1) % round_size == 0:
+            distribute_gas.append(gas_used)
+
+    results = relay.summarize()
+    results["distribute_gas"] = mean(distribute_gas)
+    return results
+
+
+def bench_retarget_window(accounts, window):
+    # the chain starts window headers before a DIFFICULTY_ADJUSTMENT_INTERVAL boundary and ends window after it
+    chain = load_header_chain(2 * window, seed=2, genesis_height=GENESIS_HEIGHT - window)
+    relay = HeaderRelay(chain.get_genesis(), [accounts[0]])
+
+    retarget_gas = []
+    for block in chain.get_blocks():
+        gas_used = relay.relay(block)
+        if block.height % DIFFICULTY_ADJUSTMENT_INTERVAL == 0:
+            retarget_gas.append(gas_used)
+
+    assert len(retarget_gas) > 0
+    results = relay.summarize()
+    results["retarget_gas"] = mean(retarget_gas)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas and throughput of BtcLightClient.storeBlockHeader")
+    parser.add_argument("--port", type=int, default=BASE_PORT, help="port of the dev node")
+    parser.add_argument("--headers", type=int, default=LINEAR_HEADERS, help="headers of the linear chain")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    ports = queue.Queue()
+    ports.put(args.port)
+    init_worker(ports)
+
+    from brownie import accounts, chain
+    chain.snapshot()
+
+    cases = {
+        "linear": lambda: bench_linear(accounts, args.headers),
+        "deep_reorg": lambda: bench_deep_reorg(accounts, REORG_COUNT, REORG_DEPTH),
+        "many_relayers": lambda: bench_many_relayers(accounts, RELAYER_COUNT, args.headers // 5),
+        "retarget_window": lambda: bench_retarget_window(accounts, RETARGET_WINDOW)
+    }
+
+    results = {}
+    print(f"{'case':>16} {'headers':>8} {'gas/header':>11} {'max gas':>9} {'case gas':>9} {'headers/s':>10}")
+    for name, bench in cases.items():
+        chain.revert()
+        result = bench()
+        results[name] = result
+
+        case_gas = result.get("reorg_gas", result.get("distribute_gas", result.get("retarget_gas", "-")))
+        print(f"{name:>16} {result['headers']:>8} {result['gas_per_header']:>11} {result['max_gas']:>9} "
+              f"{case_gas:>9} {result['headers_per_second']:>10}")
+
+    sys.exit(0 if check_baseline(BASELINE_NAME, results, GAS_KEYS, args.update_baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import argparse
+import queue
+import sys
+from ..scenario.scenario_runner import init_worker, BASE_PORT
+from ..utils import update_system_contract_address
+from .gas_baseline import check_baseline
+
+BASELINE_NAME = "btc_lst_reward"
+GAS_KEYS = ["claim_gas", "distribute_gas"]
+
+IDLE_ROUNDS = [1, 10, 100, 1000]
+STAKE_AMOUNT = 10 ** 8
+HISTORY_REWARD = 10 ** 18
+
+# the lookup of a round without a reward is a binary search over continuousRewardEndRounds, the gas of a
+# claim must not grow with the number of idle rounds by more than a few storage reads
+FLAT_GAS_TOLERANCE = 5000
+
+
+def bench_idle_rounds(accounts, idle_rounds):
+    # BitcoinLSTStake gets its last reward in base_round + 1, which is also the round a holder last changed
+    # its balance in, then no reward is distributed for idle_rounds rounds. both the claim and the next
+    # distribution look up the accrued reward of the last round
+    from brownie import BitcoinLSTStakeMock
+
+    btc_lst_stake = BitcoinLSTStakeMock[0]
+    update_system_contract_address(btc_lst_stake, btc_agent=accounts[0])
+
+    base_round = btc_lst_stake.roundTag()
+    btc_lst_stake.setInitRound(base_round)
+    btc_lst_stake.setAccruedRewardPerBTCMap(base_round + 1, HISTORY_REWARD)
+    btc_lst_stake.setUserStakeInfo(accounts[1], base_round + 1, STAKE_AMOUNT, STAKE_AMOUNT)
+    btc_lst_stake.setRoundTag(base_round + 2 + idle_rounds)
+
+    tx_receipt = btc_lst_stake.claimReward(accounts[1])
+    reward = tx_receipt.return_value[0]
+    assert reward == STAKE_AMOUNT * HISTORY_REWARD // 10 ** 8, f"Unexpected reward {reward}"
+
+    distribute_receipt = btc_lst_stake.distributeReward([], [])
+
+    return {
+        "idle_rounds": idle_rounds,
+        "claim_gas": tx_receipt.gas_used,
+        "distribute_gas": distribute_receipt.gas_used
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas of BitcoinLSTStake reward lookups after idle rounds")
+    parser.add_argument("--port", type=int, default=BASE_PORT, help="port of the dev node")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    ports = queue.Queue()
+    ports.put(args.port)
+    init_worker(ports)
+
+    from brownie import accounts, chain
+    chain.snapshot()
+
+    results = {}
+    print(f"{'idle rounds':>12} {'claim gas':>10} {'distribute gas':>15}")
+    for idle_rounds in IDLE_ROUNDS:
+        chain.revert()
+        result = bench_idle_rounds(accounts, idle_rounds)
+        results[f"idle_{idle_rounds}"] = result
+        print(f"{idle_rounds:>12} {result['claim_gas']:>10} {result['distribute_gas']:>15}")
+
+    claim_gas = [result["claim_gas"] for result in results.values()]
+    flat = max(claim_gas) - min(claim_gas) <= FLAT_GAS_TOLERANCE
+    if not flat:
+        print(f"Claim gas grows with idle rounds: {min(claim_gas)} -> {max(claim_gas)}")
+
+    baseline_ok = check_baseline(BASELINE_NAME, results, GAS_KEYS, args.update_baseline)
+    sys.exit(0 if flat and baseline_ok else 1)
+
+
+if __name__ == "__main__":
+    main()
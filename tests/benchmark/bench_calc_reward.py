@@ -0,0 +1,62 @@
+import contextlib
+import io
+import random
+import time
+from ..calc_reward import parse_delegation, set_delegate, set_btc_lst_delegate
+from ..calc_reward_batch import BatchDelegation, parse_delegation_batch
+from ..constant import *
+
+AGENT_COUNT = 21
+DELEGATOR_COUNTS = [1000, 10000, 50000]
+BLOCK_REWARD = 3 * 10 ** 18
+STATE_MAP = {'core_lp': 1}
+
+
+def make_delegation(delegator_count, rng):
+    # every delegator stakes core, and a part of them power, btc and btc lst, on random agents
+    agents = [{"address": f"v{i}", "active": True, "coin": [], "power": [], "btc": []} for i in range(AGENT_COUNT)]
+    btc_lst_stake = {}
+    for i in range(delegator_count):
+        delegator = f"d{i}"
+        agents[rng.randrange(AGENT_COUNT)]["coin"].append(
+            set_delegate(delegator, rng.randint(1, 10 ** 6) * 10 ** 18, 0))
+        if rng.random() < 0.2:
+            agents[rng.randrange(AGENT_COUNT)]["power"].append(set_delegate(delegator, rng.randint(1, 100)))
+        if rng.random() < 0.5:
+            agents[rng.randrange(AGENT_COUNT)]["btc"].append(
+                set_delegate(delegator, rng.randint(1, 10 ** 4) * 10 ** 6, 0, rng.choice([30, 150, 400])))
+        if rng.random() < 0.2:
+            btc_lst_stake[delegator] = set_btc_lst_delegate(rng.randint(1, 10 ** 4) * 10 ** 6)
+
+    return agents, btc_lst_stake
+
+
+def main():
+    rng = random.Random(0)
+    print(f"agents: {AGENT_COUNT}, block reward: {BLOCK_REWARD}, state: {STATE_MAP}")
+    print(f"{'delegators':>10} {'parse_delegation(s)':>20} {'columns(s)':>11} {'batch(s)':>9} {'speedup':>8}")
+
+    for delegator_count in DELEGATOR_COUNTS:
+        agents, btc_lst_stake = make_delegation(delegator_count, rng)
+
+        # parse_delegation prints every reward, the output is not part of the measurement
+        start_time = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            expected = parse_delegation(agents, BLOCK_REWARD, btc_lst_stake, dict(STATE_MAP))
+        old_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        delegation = BatchDelegation.from_agents(agents, btc_lst_stake)
+        column_time = time.perf_counter() - start_time
+
+        start_time = time.perf_counter()
+        batch_reward = parse_delegation_batch(delegation, BLOCK_REWARD, dict(STATE_MAP))
+        new_time = time.perf_counter() - start_time
+
+        assert expected[2] == batch_reward.to_dicts()[2], f"{delegator_count}: account rewards differ"
+        print(f"{delegator_count:>10} {old_time:>20.3f} {column_time:>11.3f} {new_time:>9.3f} "
+              f"{old_time / new_time:>7.1f}x")
+
+
+if __name__ == '__main__':
+    main()
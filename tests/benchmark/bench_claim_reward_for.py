@@ -0,0 +1,106 @@
+import argparse
+import queue
+import sys
+from ..scenario.scenario_runner import init_worker, BASE_PORT
+from .gas_baseline import check_baseline
+
+BASELINE_NAME = "claim_reward_for"
+GAS_KEYS = ["single_gas_per_delegator", "batch_gas_per_delegator"]
+
+DELEGATOR_COUNTS = [10, 100, 1000]
+BATCH_SIZE = 100
+CANDIDATE_COUNT = 3
+DELEGATE_VALUE = 10 ** 18
+
+
+def setup_delegators(accounts, delegator_count, claimer):
+    # every delegator stakes CORE on a candidate and lets claimer claim for it, two rounds later all of them
+    # have rewards of CoreAgent to claim and nothing else, the same work for both claim paths
+    from brownie import StakeHubMock, SystemRewardMock
+    from ..common import register_candidate, turn_round
+    from ..delegate import delegate_coin_success
+
+    SystemRewardMock[0].setOperator(StakeHubMock[0].address)
+
+    consensuses = [register_candidate(operator=operator) for operator in accounts[1:1 + CANDIDATE_COUNT]]
+    operators = accounts[1:1 + CANDIDATE_COUNT]
+    turn_round()
+
+    delegators = []
+    for i in range(delegator_count):
+        delegator = accounts.add()
+        accounts[0].transfer(delegator, DELEGATE_VALUE * 2)
+        delegate_coin_success(operators[i % CANDIDATE_COUNT], delegator, DELEGATE_VALUE)
+        StakeHubMock[0].setRewardClaimer(claimer, {'from': delegator})
+        delegators.append(delegator)
+
+    turn_round(consensuses, round_count=2)
+    return delegators
+
+
+def bench_single(delegators):
+    from brownie import StakeHubMock
+
+    gas_used = 0
+    rewards = []
+    for delegator in delegators:
+        tx_receipt = StakeHubMock[0].claimReward({'from': delegator})
+        gas_used += tx_receipt.gas_used
+        rewards.append(sum(tx_receipt.return_value))
+
+    return gas_used, rewards
+
+
+def bench_batch(delegators, claimer, batch_size):
+    from brownie import StakeHubMock
+
+    gas_used = 0
+    rewards = []
+    for start in range(0, len(delegators), batch_size):
+        tx_receipt = StakeHubMock[0].claimRewardFor(delegators[start:start + batch_size], {'from': claimer})
+        gas_used += tx_receipt.gas_used
+        rewards += tx_receipt.return_value
+
+    return gas_used, rewards
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas per delegator of StakeHub.claimRewardFor against claimReward")
+    parser.add_argument("--port", type=int, default=BASE_PORT, help="port of the dev node")
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE, help="delegators per claimRewardFor call")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    ports = queue.Queue()
+    ports.put(args.port)
+    init_worker(ports)
+
+    from brownie import accounts, chain
+    chain.snapshot()
+    claimer = accounts[0]
+
+    results = {}
+    print(f"{'delegators':>10} {'single gas':>11} {'batch gas':>10} {'saving':>7}")
+    for delegator_count in DELEGATOR_COUNTS:
+        # both paths start from the deployed contracts and claim the same rewards from fresh delegators
+        chain.revert()
+        single_gas, single_rewards = bench_single(setup_delegators(accounts, delegator_count, claimer))
+        chain.revert()
+        batch_gas, batch_rewards = bench_batch(setup_delegators(accounts, delegator_count, claimer), claimer,
+                                               args.batch_size)
+        assert single_rewards == batch_rewards, f"{delegator_count}: rewards differ"
+
+        result = {
+            "delegators": delegator_count,
+            "single_gas_per_delegator": single_gas // delegator_count,
+            "batch_gas_per_delegator": batch_gas // delegator_count
+        }
+        results[f"delegators_{delegator_count}"] = result
+        print(f"{delegator_count:>10} {result['single_gas_per_delegator']:>11} {result['batch_gas_per_delegator']:>10} "
+              f"{1 - batch_gas / single_gas:>6.1%}")
+
+    sys.exit(0 if check_baseline(BASELINE_NAME, results, GAS_KEYS, args.update_baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
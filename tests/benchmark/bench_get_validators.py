@@ -0,0 +1,92 @@
+import argparse
+import queue
+import random
+import sys
+from ..scenario.scenario_runner import init_worker, BASE_PORT
+from ..scenario.top_k import select_top_k
+from ..utils import random_address
+from .gas_baseline import check_baseline
+
+BASELINE_NAME = "get_validators"
+GAS_KEYS = ["gas"]
+
+CANDIDATE_COUNTS = [1000, 2000]
+LAYOUTS = ["sorted", "reverse", "all-equal", "few-distinct", "random"]
+VALIDATOR_COUNT = 21
+
+
+def make_scores(layout, count, rng):
+    if layout == "random":
+        return [rng.randrange(10 ** 24) for i in range(count)]
+    if layout == "sorted":
+        return list(range(count))
+    if layout == "reverse":
+        return list(range(count, 0, -1))
+    if layout == "few-distinct":
+        return [rng.randrange(4) * 10 ** 20 for i in range(count)]
+    if layout == "all-equal":
+        return [10 ** 20] * count
+
+    assert False, f"Unknown layout {layout}"
+
+
+def estimate_gas(method, candidates, scores):
+    # the quickselect runs out of gas on the layouts it is quadratic on
+    try:
+        return method.estimate_gas(candidates, scores, VALIDATOR_COUNT)
+    except Exception:
+        return None
+
+
+def bench_layout(layout, candidate_count, rng):
+    # getValidators against the quickselect it was before the score tree on the same candidates, both are pure and
+    # only estimated. it must return the validators of select_top_k in the same order
+    from brownie import CandidateHubMock
+
+    candidate_hub = CandidateHubMock[0]
+    candidates = [random_address() for i in range(candidate_count)]
+    scores = make_scores(layout, candidate_count, rng)
+
+    gas = estimate_gas(candidate_hub.getValidatorsMock, candidates, scores)
+    if gas is not None:
+        validators = candidate_hub.getValidatorsMock(candidates, scores, VALIDATOR_COUNT)
+        indexes = select_top_k(list(range(candidate_count)), VALIDATOR_COUNT, key=lambda i: scores[i])
+        assert list(validators) == [candidates[i] for i in indexes], f"{layout} {candidate_count}: validators differ"
+
+    return {
+        "candidates": candidate_count,
+        "gas": gas,
+        "quickselect_gas": estimate_gas(candidate_hub.getValidatorsQuickselectMock, candidates, scores)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas of CandidateHub.getValidators by the layout of the scores")
+    parser.add_argument("--port", type=int, default=BASE_PORT, help="port of the dev node")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    ports = queue.Queue()
+    ports.put(args.port)
+    init_worker(ports)
+
+    from brownie import chain
+    chain.snapshot()
+
+    results = {}
+    print(f"{'candidates':>10} {'layout':>14} {'gas':>10} {'quickselect gas':>16}")
+    for candidate_count in CANDIDATE_COUNTS:
+        for layout in LAYOUTS:
+            chain.revert()
+            result = bench_layout(layout, candidate_count, random.Random(candidate_count))
+            results[f"{layout}_{candidate_count}"] = result
+
+            gas, quickselect_gas = [result[key] if result[key] is not None else "out of gas"
+                                    for key in ["gas", "quickselect_gas"]]
+            print(f"{candidate_count:>10} {layout:>14} {gas:>10} {quickselect_gas:>16}")
+
+    sys.exit(0 if check_baseline(BASELINE_NAME, results, GAS_KEYS, args.update_baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+import shutil
+import tempfile
+import time
+from eth_account import Account
+from bitcoin.wallet import CBitcoinSecret
+from bitcoin.core.key import CPubKey
+from ..scenario.key_pool import KeyPool
+
+KEY_COUNTS = [1000, 10000]
+SEED = 0
+
+
+# the per key derivation of AccountMgr and Payment before the pool, kept as the baseline
+def derive_one_by_one(pool):
+    for secret in pool.secrets:
+        secret = secret.to_bytes(32, 'big')
+        Account.from_key(secret).address
+        CPubKey(CBitcoinSecret.from_secret_bytes(secret).pub)
+
+
+def hand_out(pool, count):
+    for _ in range(count):
+        pool.next_key()
+        pool.next_address()
+
+
+def elapsed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    print(f"{'keys':>6} {'one-by-one(s)':>14} {'cold pool(s)':>13} {'cached pool(s)':>15} {'hand out(ms)':>13}")
+
+    for key_count in KEY_COUNTS:
+        cache_dir = tempfile.mkdtemp()
+        try:
+            cold_time, pool = elapsed(KeyPool, "bench", SEED, key_count, cache_dir)
+            cached_time, cached_pool = elapsed(KeyPool, "bench", SEED, key_count, cache_dir)
+            assert cached_pool.public_keys == pool.public_keys
+
+            old_time, _ = elapsed(derive_one_by_one, pool)
+            hand_out_time, _ = elapsed(hand_out, cached_pool, key_count // 2)
+        finally:
+            shutil.rmtree(cache_dir)
+
+        print(f"{key_count:>6} {old_time:>14.3f} {cold_time:>13.3f} {cached_time:>15.3f} "
+              f"{hand_out_time * 1000:>13.3f}")
+
+
+if __name__ == "__main__":
+    main()
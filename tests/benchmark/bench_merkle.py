@@ -0,0 +1,75 @@
+import random
+import time
+from ..btc_merkle import MerkleTree, double_sha256, verify_merkle_proof
+
+# a full mainnet block carries 3k ~ 5k transactions
+TXID_COUNTS = [1000, 4000, 8000]
+BASELINE_SAMPLES = 50
+
+
+# the tree rebuilt for every proof, as test_check_tx did before MerkleTree, kept as the baseline
+def build_merkle_tree_from_txids(txids):
+    merkle_tree = list(txids)
+    size = len(txids)
+    j = 0
+    while size > 1:
+        for i in range(0, size, 2):
+            i2 = min(i + 1, size - 1)
+            merkle_tree.append(double_sha256(merkle_tree[j + i] + merkle_tree[j + i2]))
+        j += size
+        size = (size + 1) // 2
+    return merkle_tree
+
+
+def get_intermediate_nodes(txids, tx_index):
+    merkle_tree = build_merkle_tree_from_txids(txids)
+    intermediate_nodes = []
+    size = len(txids)
+    offset = 0
+    node_index = tx_index
+    while size > 1:
+        if tx_index % 2 == 0:
+            intermediate_nodes.append(merkle_tree[node_index + 1 if tx_index + 1 < size else node_index])
+        else:
+            intermediate_nodes.append(merkle_tree[node_index - 1])
+        tx_index >>= 1
+        offset += size
+        node_index = tx_index + offset
+        size = (size + 1) // 2
+    return intermediate_nodes
+
+
+def elapsed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return time.perf_counter() - start, result
+
+
+def main():
+    rng = random.Random(0)
+    print(f"baseline proofs are timed on {BASELINE_SAMPLES} indexes and scaled to the whole block")
+    print(f"{'txids':>6} {'rebuild per proof(s)':>21} {'build(ms)':>10} {'get_proof all(ms)':>18} "
+          f"{'all proofs(ms)':>15} {'speedup':>8}")
+
+    for txid_count in TXID_COUNTS:
+        txids = [rng.randbytes(32) for _ in range(txid_count)]
+        samples = rng.sample(range(txid_count), BASELINE_SAMPLES)
+
+        sample_time, old_proofs = elapsed(lambda: [get_intermediate_nodes(txids, i) for i in samples])
+        old_time = sample_time * txid_count / BASELINE_SAMPLES
+
+        build_time, tree = elapsed(MerkleTree, txids)
+        proof_time, _ = elapsed(lambda: [tree.get_proof(i) for i in range(txid_count)])
+        all_time, proofs = elapsed(tree.get_all_proofs)
+
+        root = tree.get_root()
+        assert [proofs[i] for i in samples] == old_proofs
+        assert all(verify_merkle_proof(txids[i], proofs[i], i, root) for i in range(txid_count))
+
+        new_time = build_time + all_time
+        print(f"{txid_count:>6} {old_time:>21.3f} {build_time * 1000:>10.3f} {proof_time * 1000:>18.3f} "
+              f"{all_time * 1000:>15.3f} {old_time / new_time:>7.0f}x")
+
+
+if __name__ == "__main__":
+    main()
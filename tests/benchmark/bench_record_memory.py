@@ -0,0 +1,67 @@
+import tracemalloc
+from abc import ABC
+from ..scenario.bitcoin_tx import StakeTx, LSTStakeTx, LSTUnstakeTx
+from ..scenario.chain_state import Candidate
+from ..scenario.delegator_stake_state import RedeemRequest, RedeemProofTx
+from ..scenario.payment import BtcLSTLockWallet
+from ..scenario.stake_asset import CoreRoundReward, BtcRoundReward
+
+RECORD_CLASSES = [
+    Candidate, StakeTx, LSTStakeTx, LSTUnstakeTx, RedeemRequest, RedeemProofTx, CoreRoundReward, BtcRoundReward,
+    BtcLSTLockWallet
+]
+INSTANCE_COUNT = 100000
+
+
+def get_slot_names(cls):
+    names = []
+    for klass in reversed(cls.__mro__):
+        names.extend(klass.__dict__.get("__slots__", ()))
+    return names
+
+
+def without_slots(cls):
+    # the same class with a per-instance __dict__, as the records were before they were slotted
+    if cls in (object, ABC):
+        return cls
+
+    slot_names = cls.__dict__.get("__slots__", ())
+    namespace = {
+        key: value for key, value in cls.__dict__.items()
+        if key not in slot_names and key not in ("__slots__", "__dict__", "__weakref__")
+    }
+    bases = tuple(without_slots(base) for base in cls.__bases__)
+    return type(cls)(cls.__name__, bases, namespace)
+
+
+def measure(cls, slot_names):
+    # the fields are set to shared values, so only the records themselves are counted
+    tracemalloc.start()
+    records = []
+    for i in range(INSTANCE_COUNT):
+        record = cls.__new__(cls)
+        for name in slot_names:
+            setattr(record, name, 0)
+        records.append(record)
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del records
+    return size / INSTANCE_COUNT
+
+
+def main():
+    print(f"instances: {INSTANCE_COUNT}, bytes per record including the list slot")
+    print(f"{'record':>18} {'fields':>7} {'__dict__':>9} {'__slots__':>10} {'saved':>7}")
+
+    for cls in RECORD_CLASSES:
+        slot_names = get_slot_names(cls)
+        assert not hasattr(cls.__new__(cls), "__dict__"), f"{cls.__name__} has a __dict__"
+
+        old_size = measure(without_slots(cls), slot_names)
+        new_size = measure(cls, slot_names)
+        print(f"{cls.__name__:>18} {len(slot_names):>7} {old_size:>9.0f} {new_size:>10.0f} "
+              f"{1 - new_size / old_size:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,85 @@
+import random
+import time
+import tracemalloc
+from ..scenario.candidate_stake_state import CandidateStakeState
+from ..scenario.column_table import ColumnTable
+from ..scenario.delegator_stake_state import DELEGATOR_AMOUNT_FIELDS, DELEGATOR_ROUND_FIELDS
+
+DELEGATOR_COUNTS = [10000, 100000]
+ASSET_NAMES = ["CORE", "HASHPOWER", "BTC"]
+
+
+def make_delegators(count):
+    return [f"0x{i:040x}" for i in range(count)]
+
+
+def fill_dicts(delegators, rng):
+    # the layout before ColumnTable: one dict of python ints per field
+    fields = {field: {} for field in DELEGATOR_AMOUNT_FIELDS + DELEGATOR_ROUND_FIELDS}
+    for delegator in delegators:
+        for field, values in fields.items():
+            values[delegator] = rng.randrange(10 ** 24)
+    return fields
+
+
+def fill_table(delegators, rng):
+    table = ColumnTable(DELEGATOR_AMOUNT_FIELDS, DELEGATOR_ROUND_FIELDS)
+    for delegator in delegators:
+        for field in DELEGATOR_AMOUNT_FIELDS:
+            table.set(field, delegator, rng.randrange(10 ** 24))
+        for field in DELEGATOR_ROUND_FIELDS:
+            table.set(field, delegator, rng.randrange(10 ** 4))
+    return table
+
+
+def fill_candidate_state(delegators, rng):
+    stake_state = CandidateStakeState()
+    for delegator in delegators:
+        for asset_name in ASSET_NAMES:
+            stake_state.add_delegator_realtime_amount(asset_name, delegator, rng.randrange(10 ** 24))
+            stake_state.sync_delegator_stake_amount(asset_name, delegator)
+            stake_state.update_delegator_transferred_amount(asset_name, delegator, rng.randrange(10 ** 24))
+            stake_state.update_delegator_change_round(asset_name, delegator, rng.randrange(1, 10 ** 4))
+    return stake_state
+
+
+def fill_candidate_dicts(delegators, rng):
+    fields = [{asset_name: {} for asset_name in ASSET_NAMES} for i in range(4)]
+    for delegator in delegators:
+        for asset_name in ASSET_NAMES:
+            for field in fields:
+                field[asset_name][delegator] = rng.randrange(10 ** 24)
+    return fields
+
+
+def measure(fill, delegators):
+    # the delegator addresses are shared by both layouts and are not counted
+    rng = random.Random(0)
+    tracemalloc.start()
+    start_time = time.perf_counter()
+    state = fill(delegators, rng)
+    elapsed = time.perf_counter() - start_time
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del state
+    return size, elapsed
+
+
+def main():
+    print(f"{'state':>10} {'delegators':>10} {'dicts(MB)':>10} {'columns(MB)':>12} {'ratio':>7} "
+          f"{'dicts(s)':>9} {'columns(s)':>11}")
+
+    for delegator_count in DELEGATOR_COUNTS:
+        delegators = make_delegators(delegator_count)
+        for name, old_fill, new_fill in [
+            ["delegator", fill_dicts, fill_table],
+            ["candidate", fill_candidate_dicts, fill_candidate_state]
+        ]:
+            old_size, old_time = measure(old_fill, delegators)
+            new_size, new_time = measure(new_fill, delegators)
+            print(f"{name:>10} {delegator_count:>10} {old_size / 2 ** 20:>10.1f} {new_size / 2 ** 20:>12.1f} "
+                  f"{old_size / new_size:>6.1f}x {old_time:>9.2f} {new_time:>11.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,131 @@
+import random
+import sys
+import timeit
+from ..scenario.top_k import select_top_k
+
+VALIDATOR_COUNT = 21
+CANDIDATE_COUNTS = [30, 300, 3000]
+REPEAT = 20
+
+
+# the recursive quickselect used by ChainHandler before select_top_k, kept as the baseline
+def partion(items, count, key):
+    if len(items) <= count:
+        return items
+
+    count = min(len(items), count)
+    partion_range(items, 0, len(items) - 1, count, key)
+    return items[:count]
+
+
+def partion_range(items, left, right, count, key):
+    assert left <= right, f"Invalid range=[{left, {right} }]"
+
+    if count == 0 or right - left + 1 <= count:
+        return
+
+    l = left
+    r = right
+
+    pivot = left
+    pivot_item = items[pivot]
+    value = key(pivot_item)
+
+    while left < right:
+        while left < right:
+            if key(items[right]) < value:
+                right -= 1
+            else:
+                items[left] = items[right]
+                left += 1
+                break
+
+        while left < right:
+            if key(items[left]) >= value:
+                left += 1
+            else:
+                items[right] = items[left]
+                right -= 1
+                break
+
+    items[left] = pivot_item
+    left_count = left - l + 1
+
+    if left_count == count:
+        return
+
+    if left_count > count:
+        partion_range(items, l, left - 1, count, key)
+    elif left_count < count:
+        partion_range(items, left + 1, r, count - left_count, key)
+
+
+class Item:
+    def __init__(self, idx, score):
+        self.idx = idx
+        self.score = score
+
+    def get_total_score(self):
+        return self.score
+
+
+def make_scores(layout, count, rng):
+    if layout == "random":
+        return [rng.randrange(10 ** 24) for i in range(count)]
+    if layout == "sorted":
+        return list(range(count))
+    if layout == "reverse":
+        return list(range(count, 0, -1))
+    if layout == "few-distinct":
+        return [rng.randrange(4) * 10 ** 20 for i in range(count)]
+    if layout == "all-equal":
+        return [10 ** 20] * count
+
+    assert False, f"Unknown layout {layout}"
+
+
+def bench(func, items, repeat):
+    def run():
+        func(list(items), VALIDATOR_COUNT, key=lambda item: item.get_total_score())
+
+    try:
+        return min(timeit.repeat(run, number=1, repeat=repeat))
+    except RecursionError:
+        return None
+
+
+def main():
+    rng = random.Random(0)
+    print(f"recursion limit: {sys.getrecursionlimit()}, validator count: {VALIDATOR_COUNT}")
+    print(f"{'candidates':>10} {'layout':>14} {'partion(ms)':>12} {'select_top_k(ms)':>17} {'speedup':>8}")
+
+    for candidate_count in CANDIDATE_COUNTS:
+        for layout in ["random", "sorted", "reverse", "few-distinct", "all-equal"]:
+            scores = make_scores(layout, candidate_count, rng)
+            items = [Item(i, score) for i, score in enumerate(scores)]
+
+            key = lambda item: item.get_total_score()
+            expected = None
+            try:
+                expected = [item.idx for item in partion(list(items), VALIDATOR_COUNT, key)]
+            except RecursionError:
+                pass
+
+            selected = [item.idx for item in select_top_k(items, VALIDATOR_COUNT, key)]
+            assert expected is None or expected == selected, f"{candidate_count} {layout}: {expected} != {selected}"
+
+            old_time = bench(partion, items, REPEAT)
+            new_time = bench(select_top_k, items, REPEAT)
+
+            if old_time is None:
+                old_text = "RecursionError"
+                speedup_text = "-"
+            else:
+                old_text = f"{old_time * 1000:.3f}"
+                speedup_text = f"{old_time / new_time:.2f}x"
+
+            print(f"{candidate_count:>10} {layout:>14} {old_text:>12} {new_time * 1000:>17.3f} {speedup_text:>8}")
+
+
+if __name__ == '__main__':
+    main()
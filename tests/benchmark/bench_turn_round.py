@@ -0,0 +1,93 @@
+import argparse
+import queue
+import random
+import sys
+from ..scenario.scenario_runner import init_worker, BASE_PORT
+from .gas_baseline import check_baseline
+
+BASELINE_NAME = "turn_round"
+GAS_KEYS = ["first_gas", "steady_gas", "changed_gas"]
+
+CANDIDATE_COUNTS = [21, 100, 500]
+VALIDATOR_COUNT = 21
+DELEGATE_VALUE = 10 ** 18
+CHANGED_RATIO = 0.1
+
+
+def register_candidates(accounts, candidate_count):
+    # candidate_count new operators, each registered with the required margin
+    from brownie import CandidateHubMock
+    from ..common import register_candidate
+
+    margin = CandidateHubMock[0].requiredMargin()
+    operators = []
+    for _ in range(candidate_count):
+        operator = accounts.add()
+        accounts[0].transfer(operator, margin + DELEGATE_VALUE)
+        register_candidate(operator=operator, margin=margin)
+        operators.append(operator)
+
+    return operators
+
+
+def delegate_coins(accounts, operators, rng):
+    from ..delegate import delegate_coin_success
+
+    for operator in operators:
+        delegate_coin_success(operator, accounts[1], DELEGATE_VALUE * rng.randint(1, 1000))
+
+
+def bench_turn_round(accounts, candidate_count, rng):
+    # the first turn round after registration pushes the score arrays of every candidate, the steady one has no
+    # stake change and the last one follows new delegations on CHANGED_RATIO of the candidates
+    from brownie import CandidateHubMock
+    from ..common import turn_round
+
+    candidate_hub = CandidateHubMock[0]
+    candidate_hub.setControlRoundTimeTag(True)
+    candidate_hub.setValidatorCount(VALIDATOR_COUNT)
+
+    operators = register_candidates(accounts, candidate_count)
+    delegate_coins(accounts, operators, rng)
+    first_gas = turn_round().gas_used
+    turn_round()
+
+    steady_gas = turn_round().gas_used
+
+    delegate_coins(accounts, rng.sample(operators, max(int(candidate_count * CHANGED_RATIO), 1)), rng)
+    changed_gas = turn_round().gas_used
+
+    return {
+        "candidates": candidate_count,
+        "first_gas": first_gas,
+        "steady_gas": steady_gas,
+        "changed_gas": changed_gas
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Gas of CandidateHub.turnRound by the number of candidates")
+    parser.add_argument("--port", type=int, default=BASE_PORT, help="port of the dev node")
+    parser.add_argument("--update-baseline", action="store_true", help="store the results as the new baseline")
+    args = parser.parse_args()
+
+    ports = queue.Queue()
+    ports.put(args.port)
+    init_worker(ports)
+
+    from brownie import accounts, chain
+    chain.snapshot()
+
+    results = {}
+    print(f"{'candidates':>10} {'first gas':>10} {'steady gas':>11} {'changed gas':>12}")
+    for candidate_count in CANDIDATE_COUNTS:
+        chain.revert()
+        result = bench_turn_round(accounts, candidate_count, random.Random(candidate_count))
+        results[f"candidates_{candidate_count}"] = result
+        print(f"{candidate_count:>10} {result['first_gas']:>10} {result['steady_gas']:>11} {result['changed_gas']:>12}")
+
+    sys.exit(0 if check_baseline(BASELINE_NAME, results, GAS_KEYS, args.update_baseline) else 1)
+
+
+if __name__ == "__main__":
+    main()
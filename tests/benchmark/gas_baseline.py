@@ -0,0 +1,77 @@
+import os
+import json
+
+BASELINE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline")
+
+# the gas of a deterministic chain only moves when the contracts do, a small tolerance covers the compiler
+GAS_TOLERANCE = 0.01
+
+
+def get_baseline_file(name):
+    return os.path.join(BASELINE_DIR, f"{name}.json")
+
+
+def load_baseline(name):
+    baseline_file = get_baseline_file(name)
+    if not os.path.exists(baseline_file):
+        return None
+
+    with open(baseline_file, 'r') as f:
+        return json.load(f)
+
+
+def dump_baseline(name, results):
+    os.makedirs(BASELINE_DIR, exist_ok=True)
+    with open(get_baseline_file(name), 'w') as f:
+        json.dump(results, f, indent=4, sort_keys=True)
+        f.write("\n")
+
+
+def find_regressions(baseline, results, gas_keys):
+    # (case, key, baseline value, value) of every gas figure above the baseline by more than GAS_TOLERANCE.
+    # throughput depends on the machine and is reported, never compared
+    regressions = []
+    for case, values in results.items():
+        baseline_values = baseline.get(case)
+        if baseline_values is None:
+            continue
+
+        for key in gas_keys:
+            # None is a case that ran out of gas, it only regresses from a value
+            if key not in values or baseline_values.get(key) is None:
+                continue
+
+            if values[key] is None:
+                regressions.append((case, key, baseline_values[key], values[key]))
+                continue
+
+            if values[key] > baseline_values[key] * (1 + GAS_TOLERANCE):
+                regressions.append((case, key, baseline_values[key], values[key]))
+
+    return regressions
+
+
+def check_baseline(name, results, gas_keys, update=False):
+    # compares the results with the baseline committed under BASELINE_DIR, update=True stores them instead.
+    # returns False when a gas figure regressed or there is no baseline to compare with
+    if update:
+        dump_baseline(name, results)
+        print(f"Baseline written to {get_baseline_file(name)}")
+        return True
+
+    baseline = load_baseline(name)
+    if baseline is None:
+        print(f"No baseline at {get_baseline_file(name)}, run with --update-baseline and commit it")
+        return False
+
+    regressions = find_regressions(baseline, results, gas_keys)
+    for case, key, baseline_value, value in regressions:
+        if value is None:
+            print(f"Regression {case}.{key}: {baseline_value} -> out of gas")
+            continue
+        print(f"Regression {case}.{key}: {baseline_value} -> {value} (+{(value / baseline_value - 1) * 100:.2f}%)")
+
+    if len(regressions) == 0:
+        print(f"No gas regression against {get_baseline_file(name)}")
+
+    return len(regressions) == 0
@@ -0,0 +1,275 @@
+import os
+import json
+import random
+import struct
+import hashlib
+from bitcoin.core import CMutableTransaction, CMutableTxIn, CMutableTxOut, COutPoint
+from bitcoin.core.script import CScript, OP_RETURN, OP_DUP, OP_HASH160, OP_EQUALVERIFY, OP_CHECKSIG
+
+DIFFICULTY_ADJUSTMENT_INTERVAL = 2016
+TARGET_TIMESPAN = 14 * 24 * 60 * 60
+TARGET_TIMESPAN_DIV_4 = TARGET_TIMESPAN // 4
+TARGET_TIMESPAN_MUL_4 = TARGET_TIMESPAN * 4
+UINT256_MASK = (1 << 256) - 1
+
+# a regtest-like target of 2^255, every other hash is a valid proof of work. mining to a target the light client
+# scores as chain work takes billions of hashes a block, so the synthetic chains take two degenerate paths of
+# BtcLightClient.checkProofOfWork, the tests and benchmarks built on them must not rely on either:
+# - retargets are not checked. the 256-bit product of a target of 2^255 and an even timespan wraps to 0, the
+#   retargeted bits are then 0 and the light client accepts the unchanged bits, so a chain keeps its difficulty
+#   across DIFFICULTY_ADJUSTMENT_INTERVAL boundaries like regtest does
+# - a block adds no chain work, every block has the score of the genesis and a header relayed on top of any known
+#   block takes the tip, as the light client lets a block as heavy as the tip replace it
+EASY_BITS = 0x21008000
+MAX_WORK_TARGET = 0xFFFF << 208
+
+BLOCK_VERSION = 0x20000000
+BLOCK_INTERVAL = 600
+COINBASE_VALUE = 625000000
+CORE_MAGIC = b"CORE"
+CORE_VERSION = 1
+
+# a multiple of DIFFICULTY_ADJUSTMENT_INTERVAL above the mainnet heights of btc_block_data
+GENESIS_HEIGHT = 400 * DIFFICULTY_ADJUSTMENT_INTERVAL
+GENESIS_TIME = 1700000000
+
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "btc_headers")
+# part of the cache file name, bumped whenever the blocks of the same arguments change
+CACHE_VERSION = 3
+
+
+def double_sha256(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+def target_from_bits(bits):
+    size = bits >> 24
+    word = bits & 0x00ffffff
+    if size <= 3:
+        return word >> (8 * (3 - size))
+
+    return word << (8 * (size - 3))
+
+
+def to_compact_bits(value):
+    size = (value.bit_length() + 7) >> 3
+    if size <= 3:
+        compact = (value & 0xffffff) << (8 * (3 - size))
+    else:
+        compact = (value >> (8 * (size - 3))) & 0xffffff
+
+    if compact & 0x00800000:
+        compact >>= 8
+        size += 1
+
+    return compact | (size << 24)
+
+
+def block_work(bits):
+    # what a block adds to the score of its chain in BtcLightClient.checkProofOfWork, 0 at EASY_BITS
+    return MAX_WORK_TARGET // target_from_bits(bits)
+
+
+def retarget_bits(prev_bits, actual_timespan):
+    # the bits BtcLightClient.checkProofOfWork expects at a DIFFICULTY_ADJUSTMENT_INTERVAL boundary, the
+    # product is computed in 256 bits as the contract does
+    actual_timespan = min(max(actual_timespan, TARGET_TIMESPAN_DIV_4), TARGET_TIMESPAN_MUL_4)
+    new_target = ((actual_timespan * target_from_bits(prev_bits)) & UINT256_MASK) // TARGET_TIMESPAN
+    return to_compact_bits(new_target)
+
+
+class SyntheticBlock:
+    __slots__ = ("height", "block_hash", "prev_hash", "time", "bits", "candidate", "reward_addr", "block_bytes")
+
+    def __init__(self, height, block_hash, prev_hash, time, bits, candidate, reward_addr, block_bytes):
+        self.height = height
+        # display byte order, the key of BtcLightClient.blockChain
+        self.block_hash = block_hash
+        self.prev_hash = prev_hash
+        self.time = time
+        self.bits = bits
+        self.candidate = candidate
+        self.reward_addr = reward_addr
+        # the 80-byte header followed by the coinbase transaction
+        self.block_bytes = block_bytes
+
+    def __repr__(self):
+        return f"SyntheticBlock(height={self.height}, hash={self.block_hash.hex()})"
+
+    def get_header(self):
+        return self.block_bytes[:80]
+
+    def get_hex(self):
+        return '0x' + self.block_bytes.hex()
+
+    def to_json(self):
+        return [
+            self.height, self.block_hash.hex(), self.prev_hash.hex(), self.time, self.bits,
+            self.candidate.hex(), self.reward_addr.hex(), self.block_bytes.hex()
+        ]
+
+    @classmethod
+    def from_json(cls, data):
+        height, block_hash, prev_hash, time, bits, candidate, reward_addr, block_bytes = data
+        return cls(height, bytes.fromhex(block_hash), bytes.fromhex(prev_hash), time, bits,
+                   bytes.fromhex(candidate), bytes.fromhex(reward_addr), bytes.fromhex(block_bytes))
+
+
+class HeaderChainGenerator:
+    # mines BTC blocks with a valid proof of work at EASY_BITS, each is a header and a coinbase whose OP_RETURN
+    # output carries the candidate and reward addresses of Core's hash power delegation. the blocks follow the
+    # difficulty rules of BtcLightClient.checkProofOfWork and can be relayed to it once the light client is
+    # reset to the genesis of the generator, see BtcLightClientMock.resetInitBlock
+    def __init__(self, seed=0, genesis_height=GENESIS_HEIGHT, genesis_time=GENESIS_TIME, candidates=None):
+        self.random = random.Random(seed)
+
+        if candidates is None:
+            candidates = [self.random.randbytes(20) for _ in range(8)]
+        self.candidates = candidates
+
+        # block hash => block
+        self.blocks = {}
+        self.genesis = self.__mine_block(genesis_height, bytes(32), genesis_time, EASY_BITS)
+
+    def get_genesis(self):
+        return self.genesis
+
+    def get_block(self, block_hash):
+        return self.blocks[block_hash]
+
+    def get_ancestor(self, block, height):
+        while block.height > height:
+            block = self.blocks[block.prev_hash]
+
+        return block
+
+    def mine_branch(self, parent, count):
+        # count blocks on top of parent, a fork when parent already has a child
+        branch = []
+        for _ in range(count):
+            height = parent.height + 1
+            time = parent.time + BLOCK_INTERVAL + self.random.randrange(-BLOCK_INTERVAL // 5, BLOCK_INTERVAL // 5, 2)
+            parent = self.__mine_block(height, parent.block_hash, time, self.__get_bits(parent, height))
+            branch.append(parent)
+
+        return branch
+
+    def __get_bits(self, parent, height):
+        if height % DIFFICULTY_ADJUSTMENT_INTERVAL != 0:
+            return parent.bits
+
+        period_start_height = max(
+            (parent.height // DIFFICULTY_ADJUSTMENT_INTERVAL) * DIFFICULTY_ADJUSTMENT_INTERVAL,
+            self.genesis.height
+        )
+        period_start = self.get_ancestor(parent, period_start_height)
+        new_bits = retarget_bits(parent.bits, parent.time - period_start.time)
+        if new_bits == 0:
+            return parent.bits
+
+        return new_bits
+
+    def __create_coinbase(self, height, candidate, reward_addr):
+        return CMutableTransaction(
+            [CMutableTxIn(COutPoint(), CScript([height, self.random.randrange(1 << 32)]))],
+            [
+                CMutableTxOut(COINBASE_VALUE, CScript([OP_DUP, OP_HASH160, reward_addr, OP_EQUALVERIFY, OP_CHECKSIG])),
+                CMutableTxOut(0, CScript([OP_RETURN, CORE_MAGIC + bytes([CORE_VERSION]) + candidate + reward_addr]))
+            ]
+        )
+
+    def __mine_block(self, height, prev_hash, time, bits):
+        candidate = self.candidates[height % len(self.candidates)]
+        reward_addr = self.random.randbytes(20)
+        coinbase = self.__create_coinbase(height, candidate, reward_addr)
+
+        # the first 64 bytes of the header do not depend on the nonce, their sha256 state is reused
+        header_prefix = struct.pack("<I", BLOCK_VERSION) + prev_hash[::-1] + coinbase.GetTxid() + \
+            struct.pack("<II", time, bits)
+        midstate = hashlib.sha256(header_prefix[:64])
+        header_tail = header_prefix[64:]
+
+        target = target_from_bits(bits)
+        nonce = 0
+        while True:
+            nonce_bytes = struct.pack("<I", nonce)
+            h = midstate.copy()
+            h.update(header_tail + nonce_bytes)
+            digest = hashlib.sha256(h.digest()).digest()
+            if int.from_bytes(digest, 'little') <= target:
+                break
+            nonce += 1
+
+        block_bytes = header_prefix + nonce_bytes + b"\x01" + coinbase.serialize()
+        block = SyntheticBlock(height, digest[::-1], prev_hash, time, bits, candidate, reward_addr, block_bytes)
+        self.blocks[block.block_hash] = block
+        return block
+
+
+class HeaderChain:
+    # a main chain of synthetic blocks on top of a genesis, and forks branching off it
+    def __init__(self, genesis, blocks, forks):
+        self.genesis = genesis
+        self.blocks = blocks
+        # each fork is a list of blocks, the first one is a child of a main chain block
+        self.forks = forks
+
+    def get_genesis(self):
+        return self.genesis
+
+    def get_blocks(self):
+        return self.blocks
+
+    def get_forks(self):
+        return self.forks
+
+    def to_json(self):
+        return {
+            "genesis": self.genesis.to_json(),
+            "blocks": [block.to_json() for block in self.blocks],
+            "forks": [[block.to_json() for block in fork] for fork in self.forks]
+        }
+
+    @classmethod
+    def from_json(cls, data):
+        return cls(
+            SyntheticBlock.from_json(data["genesis"]),
+            [SyntheticBlock.from_json(block) for block in data["blocks"]],
+            [[SyntheticBlock.from_json(block) for block in fork] for fork in data["forks"]]
+        )
+
+
+def generate_header_chain(length, seed=0, genesis_height=GENESIS_HEIGHT, forks=(), candidates=None):
+    # forks: (fork height, fork length) pairs, a fork branches off the main chain block below the fork height
+    generator = HeaderChainGenerator(seed, genesis_height, candidates=candidates)
+    blocks = generator.mine_branch(generator.get_genesis(), length)
+
+    fork_blocks = []
+    for fork_height, fork_length in forks:
+        assert genesis_height < fork_height <= genesis_height + length, f"Invalid fork height {fork_height}"
+        parent = generator.get_ancestor(blocks[-1], fork_height - 1)
+        fork_blocks.append(generator.mine_branch(parent, fork_length))
+
+    return HeaderChain(generator.get_genesis(), blocks, fork_blocks)
+
+
+def load_header_chain(length, seed=0, genesis_height=GENESIS_HEIGHT, forks=(), cache_dir=DEFAULT_CACHE_DIR):
+    # generate_header_chain behind a cache file keyed by the arguments
+    fork_key = "-".join(f"{fork_height}x{fork_length}" for fork_height, fork_length in forks)
+    cache_file = None
+    if cache_dir is not None:
+        cache_file = os.path.join(cache_dir, f"chain_v{CACHE_VERSION}_{seed}_{genesis_height}_{length}_{fork_key or 'linear'}.json")
+        if os.path.exists(cache_file):
+            with open(cache_file, 'r') as f:
+                return HeaderChain.from_json(json.load(f))
+
+    chain = generate_header_chain(length, seed, genesis_height, forks)
+
+    if cache_file is not None:
+        os.makedirs(cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump(chain.to_json(), f)
+        os.replace(tmp_file, cache_file)
+
+    return chain
@@ -0,0 +1,99 @@
+import hashlib
+
+NODE_SIZE = 32
+PAIR_SIZE = 2 * NODE_SIZE
+
+
+def double_sha256(data):
+    return hashlib.sha256(hashlib.sha256(data).digest()).digest()
+
+
+class MerkleTree:
+    # bitcoin merkle tree of 32-byte leaves (txids in internal byte order), the last node of an odd level is
+    # paired with itself. it is built once, every level is kept in one contiguous buffer padded to an even
+    # node count, so a parent is the double sha256 of a 64-byte memoryview slice and the sibling of node i
+    # is node i ^ 1. a proof has the same layout as the nodes of BtcLightClient.checkTxProof
+    def __init__(self, leaves):
+        assert len(leaves) > 0, f"Empty merkle tree"
+
+        level = bytearray()
+        for leaf in leaves:
+            assert len(leaf) == NODE_SIZE, f"Invalid merkle leaf {leaf.hex()}"
+            level += leaf
+
+        self.leaf_count = len(leaves)
+        self.levels = []
+
+        while len(level) > NODE_SIZE:
+            if len(level) % PAIR_SIZE != 0:
+                level += level[-NODE_SIZE:]
+            self.levels.append(level)
+
+            view = memoryview(level)
+            parent_level = bytearray()
+            for offset in range(0, len(level), PAIR_SIZE):
+                parent_level += double_sha256(view[offset:offset + PAIR_SIZE])
+            view.release()
+
+            level = parent_level
+
+        self.root = bytes(level)
+
+    def get_leaf_count(self):
+        return self.leaf_count
+
+    def get_depth(self):
+        return len(self.levels)
+
+    def get_root(self):
+        return self.root
+
+    def get_leaf(self, index):
+        if len(self.levels) == 0:
+            return self.root
+
+        offset = index * NODE_SIZE
+        return bytes(self.levels[0][offset:offset + NODE_SIZE])
+
+    def get_proof(self, index):
+        assert 0 <= index < self.leaf_count, f"Merkle leaf index out of range {index}"
+
+        proof = []
+        for level in self.levels:
+            offset = (index ^ 1) * NODE_SIZE
+            proof.append(bytes(level[offset:offset + NODE_SIZE]))
+            index >>= 1
+
+        return proof
+
+    def get_all_proofs(self):
+        # the sibling of every node is sliced once, the proofs of all leaves share them
+        siblings = []
+        for level in self.levels:
+            nodes = [bytes(level[offset:offset + NODE_SIZE]) for offset in range(0, len(level), NODE_SIZE)]
+            for i in range(0, len(nodes), 2):
+                nodes[i], nodes[i + 1] = nodes[i + 1], nodes[i]
+            siblings.append(nodes)
+
+        proofs = []
+        for index in range(self.leaf_count):
+            proofs.append([nodes[index >> depth] for depth, nodes in enumerate(siblings)])
+
+        return proofs
+
+
+def get_merkle_root(leaves):
+    return MerkleTree(leaves).get_root()
+
+
+def verify_merkle_proof(leaf, proof, index, root):
+    # the same walk as BtcLightClient.checkTxProof: the low bit of the index tells the side of the node
+    current = leaf
+    for node in proof:
+        if index & 1:
+            current = double_sha256(node + current)
+        else:
+            current = double_sha256(current + node)
+        index >>= 1
+
+    return current == root
@@ -0,0 +1,387 @@
+from collections import defaultdict
+
+import numpy as np
+
+from tests.calc_reward import Discount
+from tests.constant import *
+from tests.utils import get_asset_weight
+
+INT64_MAX = np.iinfo(np.int64).max
+
+REWARD_UNIT_AMOUNTS = {
+    'coin': Utils.CORE_STAKE_DECIMAL,
+    'power': 1,
+    'btc': Utils.BTC_DECIMAL
+}
+
+
+def max_abs(column):
+    if len(column) == 0:
+        return 0
+    return max(int(column.max()), -int(column.min()))
+
+
+def to_column(values):
+    # int64 when every value fits, otherwise an object column of python ints, so that floor division stays exact
+    column = np.array(values, dtype=object) if len(values) > 0 else np.zeros(0, dtype=np.int64)
+    return fit_column(column)
+
+
+def fit_column(column):
+    if column.dtype == object and max_abs(column) <= INT64_MAX:
+        return column.astype(np.int64)
+    return column
+
+
+def mul_div(a, b, d=1):
+    # a * b // d element-wise with the floor division semantics of python ints
+    if max_abs(np.asarray(a).reshape(-1)) * max_abs(np.asarray(b).reshape(-1)) > INT64_MAX:
+        a = np.asarray(a).astype(object)
+    return fit_column(np.asarray(a * b // d))
+
+
+def total_of(column):
+    # exact sum, an int64 sum wraps around silently
+    if max_abs(column) * len(column) > INT64_MAX:
+        column = column.astype(object)
+    return int(column.sum())
+
+
+def sum_by(index, values, size):
+    # values summed by index, np.bincount would go through float64
+    total = np.zeros(size, dtype=values.dtype)
+    if max_abs(values) * len(values) > INT64_MAX:
+        total = total.astype(object)
+    np.add.at(total, index, values)
+    return fit_column(total)
+
+
+def rate_by_threshold(levels, rates, default):
+    # the rate of the first threshold in the dict order that the level reaches, as get_tlp_rate and get_lp_rate
+    conditions = [levels >= threshold for threshold in rates.keys()]
+    return np.select(conditions, list(rates.values()), default=default)
+
+
+class StakeTable:
+    # the stake rows of one asset, one row per delegation: agent index, delegator index, amount,
+    # undelegated amount and stake duration (days)
+    def __init__(self, agent_ids, delegator_ids, values, undelegate_amounts, stake_durations):
+        self.agent_ids = np.asarray(agent_ids, dtype=np.int64)
+        self.delegator_ids = np.asarray(delegator_ids, dtype=np.int64)
+        self.values = to_column(values)
+        self.undelegate_amounts = to_column(undelegate_amounts)
+        self.stake_durations = np.asarray(stake_durations, dtype=np.int64)
+
+    def get_row_count(self):
+        return len(self.agent_ids)
+
+    def get_stake_amounts(self):
+        return fit_column(self.values - self.undelegate_amounts)
+
+
+class BatchDelegation:
+    # columnar form of the agents and btc_lst_stake arguments of calc_reward.parse_delegation
+    def __init__(self, agent_addrs, delegator_addrs, stake_tables, btc_lst_delegate_amounts, btc_lst_redeem_amounts,
+                 btc_lst_delegator_ids):
+        self.agent_addrs = agent_addrs
+        self.delegator_addrs = delegator_addrs
+        # coin, power, btc => StakeTable
+        self.stake_tables = stake_tables
+        self.btc_lst_delegator_ids = np.asarray(btc_lst_delegator_ids, dtype=np.int64)
+        self.btc_lst_delegate_amounts = to_column(btc_lst_delegate_amounts)
+        self.btc_lst_redeem_amounts = to_column(btc_lst_redeem_amounts)
+
+    @classmethod
+    def from_agents(cls, agents, btc_lst_stake=None):
+        if btc_lst_stake is None:
+            btc_lst_stake = {}
+
+        delegator_ids = {}
+
+        def get_delegator_id(delegator):
+            if delegator not in delegator_ids:
+                delegator_ids[delegator] = len(delegator_ids)
+            return delegator_ids[delegator]
+
+        btc_lst_ids = [get_delegator_id(delegator) for delegator in btc_lst_stake]
+        btc_lst_delegate_amounts = [amount['delegate_amount'] for amount in btc_lst_stake.values()]
+        btc_lst_redeem_amounts = [amount['redeem_amount'] for amount in btc_lst_stake.values()]
+
+        stake_tables = {}
+        for asset in ['coin', 'power', 'btc']:
+            rows = [[], [], [], [], []]
+            for agent_id, agent in enumerate(agents):
+                for item in agent.get(asset, []):
+                    rows[0].append(agent_id)
+                    rows[1].append(get_delegator_id(item['address']))
+                    rows[2].append(item['value'])
+                    rows[3].append(item['undelegate_amount'])
+                    rows[4].append(item['stake_duration'])
+            stake_tables[asset] = StakeTable(*rows)
+
+        return cls(
+            [agent['address'] for agent in agents],
+            list(delegator_ids.keys()),
+            stake_tables,
+            btc_lst_delegate_amounts,
+            btc_lst_redeem_amounts,
+            btc_lst_ids
+        )
+
+    def get_agent_count(self):
+        return len(self.agent_addrs)
+
+    def get_delegator_count(self):
+        return len(self.delegator_addrs)
+
+
+class BatchReward:
+    # per-delegator columns of the rewards, see to_dicts for the parse_delegation results
+    def __init__(self, delegation):
+        self.delegation = delegation
+        # asset => reward of every delegator, index is the delegator id
+        self.delegator_rewards = {}
+        # asset => stake amount of every delegator as recorded in the delegator_map of parse_delegation
+        self.delegator_amounts = {}
+        # asset => delegator ids in the order parse_delegation first meets them
+        self.delegator_orders = {}
+        # btc_lst => unit reward, coin/power/btc => unit reward of every agent
+        self.asset_unit_rewards = {}
+        self.agent_asset_amounts = {}
+        self.bonus = defaultdict(int)
+
+    def get_account_rewards(self):
+        total = np.zeros(self.delegation.get_delegator_count(), dtype=object)
+        claimed = np.zeros(self.delegation.get_delegator_count(), dtype=bool)
+        for asset, rewards in self.delegator_rewards.items():
+            total += rewards.astype(object)
+            claimed[self.delegator_orders[asset]] = True
+        return total, claimed
+
+    def to_dicts(self):
+        # the same results as parse_delegation: delegator_asset_reward, bonus, account_rewards, asset_unit_reward_map
+        delegator_addrs = self.delegation.delegator_addrs
+
+        delegator_asset_reward = defaultdict(dict)
+        for asset, order in self.delegator_orders.items():
+            rewards = self.delegator_rewards[asset]
+            delegator_asset_reward[asset] = {delegator_addrs[i]: int(rewards[i]) for i in order}
+
+        total, claimed = self.get_account_rewards()
+        account_rewards = {delegator_addrs[i]: int(total[i]) for i in np.flatnonzero(claimed)}
+
+        asset_unit_reward_map = {'btc_lst': self.asset_unit_rewards['btc_lst']}
+        for asset in ['coin', 'power', 'btc']:
+            unit_rewards = self.asset_unit_rewards[asset]
+            asset_unit_reward_map[asset] = {
+                addr: int(unit_rewards[i]) for i, addr in enumerate(self.delegation.agent_addrs)
+            }
+
+        return delegator_asset_reward, self.bonus, account_rewards, asset_unit_reward_map
+
+
+def first_occurrence_order(delegator_ids):
+    unique_ids, first_rows = np.unique(delegator_ids, return_index=True)
+    return unique_ids[np.argsort(first_rows, kind='stable')]
+
+
+def calc_stake_counts(delegation):
+    agent_count = delegation.get_agent_count()
+
+    agent_asset_amounts = {}
+    stake_count = {}
+    for asset in ['coin', 'power', 'btc']:
+        table = delegation.stake_tables[asset]
+        agent_asset_amounts[asset] = sum_by(table.agent_ids, table.values, agent_count)
+        stake_count[asset] = total_of(agent_asset_amounts[asset])
+
+    # btc lst is split evenly among the validators and counted as btc
+    btc_lst_amount = total_of(delegation.btc_lst_delegate_amounts)
+    single_agent_btc_lst = btc_lst_amount // agent_count
+    agent_asset_amounts['btc'] = fit_column(agent_asset_amounts['btc'] + single_agent_btc_lst)
+    agent_asset_amounts['btc_lst'] = np.full(agent_count, single_agent_btc_lst, dtype=object)
+    stake_count['btc'] += single_agent_btc_lst * agent_count
+
+    return agent_asset_amounts, stake_count, btc_lst_amount
+
+
+def calc_factors(stake_count, reward_cap):
+    factor_map = {}
+    for asset in ['coin', 'power', 'btc']:
+        factor = 1
+        if asset != 'coin' and stake_count['coin'] > 0 and stake_count[asset] > 0:
+            factor = stake_count['coin'] * reward_cap[asset] // reward_cap['coin'] // stake_count[asset]
+        factor_map[asset] = factor
+    return factor_map
+
+
+def calc_agent_rewards(agent_asset_amounts, factor_map, total_reward):
+    # reward of each asset on each agent, proportional to the score of the asset
+    scores = sum(agent_asset_amounts[asset].astype(object) * factor_map[asset] for asset in factor_map)
+
+    agent_rewards = {}
+    for asset in factor_map:
+        amounts = agent_asset_amounts[asset].astype(object)
+        staked = amounts != 0
+        rewards = np.zeros(len(amounts), dtype=object)
+        rewards[staked] = total_reward * (amounts[staked] * factor_map[asset]) // scores[staked]
+        agent_rewards[asset] = rewards
+
+    # the btc reward is shared with btc lst by amount
+    btc_amounts = agent_asset_amounts['btc'].astype(object)
+    lst_amounts = agent_asset_amounts['btc_lst']
+    staked = btc_amounts != 0
+    btc_lst_rewards = np.zeros(len(btc_amounts), dtype=object)
+    btc_lst_rewards[staked] = agent_rewards['btc'][staked] * lst_amounts[staked] // btc_amounts[staked]
+    agent_rewards['btc'] = agent_rewards['btc'] - btc_lst_rewards
+    agent_rewards['btc_lst'] = btc_lst_rewards
+    agent_asset_amounts['btc'] = fit_column(btc_amounts - lst_amounts)
+
+    return agent_rewards
+
+
+def calc_unit_rewards(agent_asset_amounts, agent_rewards, btc_lst_amount):
+    asset_unit_rewards = {'btc_lst': 0}
+    if btc_lst_amount != 0:
+        asset_unit_rewards['btc_lst'] = int(agent_rewards['btc_lst'].sum()) * Utils.BTC_DECIMAL // btc_lst_amount
+
+    for asset, unit_amount in REWARD_UNIT_AMOUNTS.items():
+        amounts = agent_asset_amounts[asset].astype(object)
+        staked = amounts != 0
+        unit_rewards = np.zeros(len(amounts), dtype=object)
+        unit_rewards[staked] = agent_rewards[asset][staked] * unit_amount // amounts[staked]
+        asset_unit_rewards[asset] = fit_column(unit_rewards)
+
+    return asset_unit_rewards
+
+
+def calc_discounted_rewards(rewards, discounts):
+    actual_rewards = mul_div(rewards, discounts, Utils.DENOMINATOR)
+    return actual_rewards, fit_column(rewards - actual_rewards)
+
+
+def calc_core_lp_discount(batch_reward, compensation_reward):
+    # the btc rewards are scaled by the ratio of core staked by the same delegator, the reward pool pays the
+    # extra rewards and is topped up from the system reward when it runs short, so the pool is a running sum
+    order = batch_reward.delegator_orders.get('btc')
+    if order is None or len(order) == 0:
+        return
+
+    rewards = batch_reward.delegator_rewards['btc'][order].astype(object)
+    btc_amounts = batch_reward.delegator_amounts['btc'][order]
+    coin_amounts = batch_reward.delegator_amounts['coin'][order] if 'coin' in batch_reward.delegator_amounts else \
+        np.zeros(len(order), dtype=np.int64)
+
+    assert np.all(btc_amounts != 0), f"Zero btc amount of a rewarded delegator"
+    levels = (coin_amounts.astype(np.float64) * get_asset_weight('btc')) // \
+             (btc_amounts.astype(np.float64) * get_asset_weight('coin'))
+    discounts = rate_by_threshold(levels, Discount.lp_rates, Utils.DENOMINATOR)
+    actual_rewards = rewards * discounts // Utils.DENOMINATOR
+
+    extra_rewards = np.where(discounts >= Utils.DENOMINATOR, actual_rewards - rewards, 0)
+    deltas = np.where(rewards > actual_rewards, rewards - actual_rewards, 0) - extra_rewards
+
+    pool = compensation_reward['reward_pool']
+    start = 0
+    while start < len(order):
+        pools_before = pool + np.concatenate(([0], np.cumsum(deltas[start:])[:-1])).astype(object)
+        top_ups = np.flatnonzero(extra_rewards[start:] > pools_before)
+        if len(top_ups) == 0:
+            pool += int(deltas[start:].sum())
+            break
+
+        i = start + int(top_ups[0])
+        pool = int(pools_before[i - start]) + extra_rewards[i] * 10 + int(deltas[i])
+        start = i + 1
+
+    compensation_reward['reward_pool'] = int(pool)
+    batch_reward.bonus['reward_pool'] = int(pool)
+
+    btc_rewards = batch_reward.delegator_rewards['btc'].astype(object)
+    btc_rewards[order] = actual_rewards
+    batch_reward.delegator_rewards['btc'] = btc_rewards
+
+
+def parse_delegation_batch(delegation, block_reward, state_map=None, compensation_reward=None, reward_cap=None):
+    # the batched counterpart of calc_reward.parse_delegation, every per-delegation step is a column operation
+    if compensation_reward is None:
+        compensation_reward = {
+            'reward_pool': 0,
+            'system_reward': 100000000
+        }
+    states = {
+        'percentage': Discount.percentage,
+        'core_lp': 0,
+        'btc_lst_gradeActive': 1,
+        'btc_gradeActive': 1
+    }
+    if state_map is not None:
+        states.update(state_map)
+    if reward_cap is None:
+        reward_cap = {
+            'coin': HardCap.CORE_HARD_CAP,
+            'power': HardCap.POWER_HARD_CAP,
+            'btc': HardCap.BTC_HARD_CAP
+        }
+
+    delegator_count = delegation.get_delegator_count()
+    batch_reward = BatchReward(delegation)
+
+    agent_asset_amounts, stake_count, btc_lst_amount = calc_stake_counts(delegation)
+    factor_map = calc_factors(stake_count, reward_cap)
+    agent_rewards = calc_agent_rewards(agent_asset_amounts, factor_map, block_reward)
+    asset_unit_rewards = calc_unit_rewards(agent_asset_amounts, agent_rewards, btc_lst_amount)
+    batch_reward.asset_unit_rewards = asset_unit_rewards
+    batch_reward.agent_asset_amounts = agent_asset_amounts
+
+    total_bonus = 0
+
+    # btc lst
+    if len(delegation.btc_lst_delegator_ids) > 0:
+        ids = delegation.btc_lst_delegator_ids
+        stake_amounts = fit_column(delegation.btc_lst_delegate_amounts - delegation.btc_lst_redeem_amounts)
+        rewards = mul_div(stake_amounts, asset_unit_rewards['btc_lst'], Utils.BTC_DECIMAL)
+        if states['btc_lst_gradeActive']:
+            rewards, unclaimed = calc_discounted_rewards(rewards, states['percentage'])
+            total_bonus += total_of(unclaimed)
+        batch_reward.delegator_amounts['btc_lst'] = sum_by(ids, stake_amounts, delegator_count)
+        batch_reward.delegator_rewards['btc_lst'] = sum_by(ids, rewards, delegator_count)
+        batch_reward.delegator_orders['btc_lst'] = first_occurrence_order(ids)
+
+    # coin, power and btc delegations of all agents
+    for asset in ['coin', 'power', 'btc']:
+        table = delegation.stake_tables[asset]
+        if table.get_row_count() == 0:
+            continue
+
+        unit_rewards = asset_unit_rewards[asset][table.agent_ids]
+        if asset == 'power':
+            recorded_amounts = table.values
+            rewards = mul_div(unit_rewards, table.values)
+        elif asset == 'coin':
+            recorded_amounts = table.get_stake_amounts()
+            rewards = mul_div(unit_rewards, recorded_amounts, Utils.CORE_STAKE_DECIMAL)
+        else:
+            recorded_amounts = table.values
+            rewards = mul_div(unit_rewards, table.get_stake_amounts(), Utils.BTC_DECIMAL)
+            # staking duration discount
+            short_terms = table.stake_durations < Utils.YEAR
+            if states['btc_gradeActive'] and np.any(short_terms):
+                durations = np.where(short_terms, table.stake_durations // Utils.MONTH, 0)
+                discounts = rate_by_threshold(durations, Discount.tlp_rates, Utils.DENOMINATOR)
+                discounts = np.where(short_terms, discounts, Utils.DENOMINATOR)
+                rewards, unclaimed = calc_discounted_rewards(rewards, discounts)
+                total_bonus += total_of(unclaimed)
+
+        batch_reward.delegator_amounts[asset] = sum_by(table.delegator_ids, recorded_amounts, delegator_count)
+        batch_reward.delegator_rewards[asset] = sum_by(table.delegator_ids, rewards, delegator_count)
+        batch_reward.delegator_orders[asset] = first_occurrence_order(table.delegator_ids)
+
+    compensation_reward['reward_pool'] += total_bonus
+
+    if states['core_lp']:
+        calc_core_lp_discount(batch_reward, compensation_reward)
+
+    batch_reward.bonus['btc'] = batch_reward.bonus.get('reward_pool')
+    batch_reward.bonus['total_bonus'] = batch_reward.bonus.get('reward_pool')
+    return batch_reward
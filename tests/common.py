@@ -1,6 +1,82 @@
 from brownie import *
+from eth_abi import encode
+from web3 import Web3
 from .utils import random_address
 
+INIT = "init"
+DEVELOPMENT_INIT = "developmentInit"
+
+
+def get_system_contracts():
+    # the system contracts in the order updateContractAddr takes their addresses, each with what is called right
+    # after it is deployed. the ones with None are initialized by setup_system_contracts once the addresses are set.
+    # the containers exist once the project is loaded, which may come after this module is imported
+    return {
+        ValidatorSetMock: DEVELOPMENT_INIT,
+        SlashIndicatorMock: DEVELOPMENT_INIT,
+        SystemRewardMock: None,
+        BtcLightClientMock: DEVELOPMENT_INIT,
+        RelayerHubMock: DEVELOPMENT_INIT,
+        CandidateHubMock: DEVELOPMENT_INIT,
+        GovHubMock: DEVELOPMENT_INIT,
+        PledgeAgentMock: DEVELOPMENT_INIT,
+        Burn: INIT,
+        Foundation: None,
+        StakeHubMock: None,
+        BitcoinStakeMock: None,
+        BitcoinAgentMock: INIT,
+        BitcoinLSTStakeMock: None,
+        CoreAgentMock: DEVELOPMENT_INIT,
+        HashPowerAgentMock: INIT,
+        BitcoinLSTToken: INIT
+    }
+
+
+def deploy_system_contract(deployer, container, development=True):
+    if container == PledgeAgentMock:
+        # the libraries PledgeAgent links to
+        deployer.deploy(BitcoinHelper)
+        deployer.deploy(TypedMemView)
+        deployer.deploy(SafeCast)
+
+    c = deployer.deploy(container)
+    init = get_system_contracts()[container]
+    if init is not None:
+        c.init()
+    if init == DEVELOPMENT_INIT and development:
+        c.developmentInit()
+    return c
+
+
+def setup_system_contracts(contracts, development=True):
+    # contracts: container => the deployed system contract, every container of get_system_contracts included
+    contract_list = [contracts[container] for container in get_system_contracts()]
+    args = encode(['address'] * len(contract_list), [c.address for c in contract_list])
+
+    for c in contract_list:
+        getattr(c, "updateContractAddr")(args)
+
+    contracts[CandidateHubMock].setControlRoundTimeTag(True)
+    accounts[99].transfer(contracts[GovHubMock].address, Web3.to_wei(100000, 'ether'))
+    # init after set system contract
+    contracts[SystemRewardMock].init()
+    contracts[BitcoinStakeMock].init()
+    contracts[BitcoinLSTStakeMock].init()
+    contracts[StakeHubMock].init()
+
+    if development:
+        contracts[BitcoinStakeMock].developmentInit()
+        contracts[BitcoinLSTStakeMock].developmentInit()
+        contracts[StakeHubMock].developmentInit()
+
+
+def deploy_system_contracts(deployer, development=True):
+    contracts = {
+        container: deploy_system_contract(deployer, container, development) for container in get_system_contracts()
+    }
+    setup_system_contracts(contracts, development)
+    return contracts
+
 
 def register_candidate(consensus=None, fee_address=None, operator=None, commission=500, margin=None) -> str:
     if consensus is None:
@@ -1,7 +1,6 @@
 import pytest
-from eth_abi import encode
 from brownie import *
-from web3 import Web3
+from .common import deploy_system_contract, setup_system_contracts
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -31,135 +30,87 @@ def library_set_up(accounts):
 
 @pytest.fixture(scope="module")
 def candidate_hub(accounts):
-    c = accounts[0].deploy(CandidateHubMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], CandidateHubMock)
 
 
 @pytest.fixture(scope="module")
 def btc_light_client(accounts):
-    c = accounts[0].deploy(BtcLightClientMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], BtcLightClientMock)
 
 
 @pytest.fixture(scope="module")
 def gov_hub(accounts):
-    c = accounts[0].deploy(GovHubMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], GovHubMock)
 
 
 @pytest.fixture(scope="module")
 def relay_hub(accounts):
-    c = accounts[0].deploy(RelayerHubMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-
-    return c
+    return deploy_system_contract(accounts[0], RelayerHubMock)
 
 
 @pytest.fixture(scope="module")
 def slash_indicator(accounts):
-    c = accounts[0].deploy(SlashIndicatorMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], SlashIndicatorMock)
 
 
 @pytest.fixture(scope="module")
 def system_reward(accounts):
-    return accounts[0].deploy(SystemRewardMock)
+    return deploy_system_contract(accounts[0], SystemRewardMock)
 
 
 @pytest.fixture(scope="module")
 def validator_set(accounts):
-    c = accounts[0].deploy(ValidatorSetMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], ValidatorSetMock)
 
 
 @pytest.fixture(scope="module")
 def pledge_agent(accounts):
-    accounts[0].deploy(BitcoinHelper)
-    accounts[0].deploy(TypedMemView)
-    accounts[0].deploy(SafeCast)
-    c = accounts[0].deploy(PledgeAgentMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], PledgeAgentMock)
 
 
 @pytest.fixture(scope="module")
 def burn(accounts):
-    c = accounts[0].deploy(Burn)
-    c.init()
-    return c
+    return deploy_system_contract(accounts[0], Burn)
 
 
 @pytest.fixture(scope="module")
 def core_agent(accounts):
-    c = accounts[0].deploy(CoreAgentMock)
-    c.init()
-    if is_development:
-        c.developmentInit()
-    return c
+    return deploy_system_contract(accounts[0], CoreAgentMock)
 
 
 @pytest.fixture(scope="module")
 def foundation(accounts):
-    c = accounts[0].deploy(Foundation)
-    return c
+    return deploy_system_contract(accounts[0], Foundation)
 
 
 @pytest.fixture(scope="module")
 def stake_hub(accounts):
-    c = accounts[0].deploy(StakeHubMock)
-    return c
+    return deploy_system_contract(accounts[0], StakeHubMock)
 
 
 @pytest.fixture(scope="module")
 def btc_stake(accounts):
-    c = accounts[0].deploy(BitcoinStakeMock)
-    return c
+    return deploy_system_contract(accounts[0], BitcoinStakeMock)
 
 
 @pytest.fixture(scope="module")
 def btc_agent(accounts):
-    c = accounts[0].deploy(BitcoinAgentMock)
-    c.init()
-    return c
+    return deploy_system_contract(accounts[0], BitcoinAgentMock)
 
 
 @pytest.fixture(scope="module")
 def btc_lst_stake(accounts):
-    c = accounts[0].deploy(BitcoinLSTStakeMock)
-    return c
+    return deploy_system_contract(accounts[0], BitcoinLSTStakeMock)
 
 
 @pytest.fixture(scope="module")
 def lst_token(accounts):
-    c = accounts[0].deploy(BitcoinLSTToken)
-    c.init()
-    return c
+    return deploy_system_contract(accounts[0], BitcoinLSTToken)
 
 
 @pytest.fixture(scope="module")
 def hash_power_agent(accounts):
-    c = accounts[0].deploy(HashPowerAgentMock)
-    c.init()
-    return c
+    return deploy_system_contract(accounts[0], HashPowerAgentMock)
 
 
 # test contract
@@ -189,28 +140,25 @@ def set_system_contract_address(
         hash_power_agent,
         lst_token
 ):
-    contracts = [
-        validator_set, slash_indicator, system_reward, btc_light_client, relay_hub, candidate_hub, gov_hub,
-        pledge_agent, burn, foundation, stake_hub, btc_stake, btc_agent, btc_lst_stake, core_agent, hash_power_agent,
-        lst_token
-    ]
-    args = encode(['address'] * len(contracts), [c.address for c in contracts])
-
-    for c in contracts:
-        getattr(c, "updateContractAddr")(args)
-
-    candidate_hub.setControlRoundTimeTag(True)
-    accounts[99].transfer(gov_hub.address, Web3.to_wei(100000, 'ether'))
-    # init after set system contract
-    system_reward.init()
-    btc_stake.init()
-    btc_lst_stake.init()
-    stake_hub.init()
-
-    if is_development:
-        btc_stake.developmentInit()
-        btc_lst_stake.developmentInit()
-        stake_hub.developmentInit()
+    setup_system_contracts({
+        ValidatorSetMock: validator_set,
+        SlashIndicatorMock: slash_indicator,
+        SystemRewardMock: system_reward,
+        BtcLightClientMock: btc_light_client,
+        RelayerHubMock: relay_hub,
+        CandidateHubMock: candidate_hub,
+        GovHubMock: gov_hub,
+        PledgeAgentMock: pledge_agent,
+        Burn: burn,
+        Foundation: foundation,
+        StakeHubMock: stake_hub,
+        BitcoinStakeMock: btc_stake,
+        BitcoinAgentMock: btc_agent,
+        BitcoinLSTStakeMock: btc_lst_stake,
+        CoreAgentMock: core_agent,
+        HashPowerAgentMock: hash_power_agent,
+        BitcoinLSTToken: lst_token
+    })
 
 
 @pytest.fixture(scope="module")
@@ -1,7 +1,14 @@
 from brownie import *
 import random
-from eth_account import Account
 from . import constants
+from .key_pool import KeyPool
+
+
+class ModelAccount(str):
+    # an address of a model-only run, there is no node to resolve it to a brownie account
+    @property
+    def address(self):
+        return str(self)
 
 
 class AccountMgr:
@@ -31,6 +38,14 @@ class AccountMgr:
 
     __inited = False
 
+    # the addresses come from a captured parameter source instead of the node
+    __model_only = False
+
+    # sponsors are drawn from it, seeded by init_account_mgr
+    __random = random.Random()
+
+    # consensus/fee addresses are handed out from it in order, seeded by init_account_mgr
+    __key_pool = None
 
     @classmethod
     def __clear(cls):
@@ -43,11 +58,12 @@ class AccountMgr:
         cls.__addr_to_name_table = {}
         cls.__backup_random_addr_table = {}
         cls.__inited = False
+        cls.__model_only = False
 
 
     @classmethod
     def __gen_random_addr(cls):
-        addr = Account.create(str(random.random())).address
+        addr = cls.__key_pool.next_address()
         if cls.__addr_to_name_table.get(addr) is None:
             return addr
 
@@ -69,11 +85,38 @@ class AccountMgr:
         cls.__addr_to_name_table[addr] = name
 
     @classmethod
-    def init_account_mgr(cls):
+    def init_account_mgr(cls, seed=None, param_source=None):
         if cls.__inited:
             cls.__clear()
 
         cls.__inited = True
+        cls.__random = random.Random(seed)
+        cls.__key_pool = KeyPool("account", seed, 2 * constants.OPERATOR_ADDR_COUNT)
+
+        if param_source is not None and param_source.is_model_only():
+            cls.__model_only = True
+            account_list = [ModelAccount(addr) for addr in param_source.get_accounts()]
+            contract_addr_table = {
+                name: ModelAccount(addr) for name, addr in param_source.get_contracts().items()
+            }
+        else:
+            account_list = accounts
+            contract_addr_table = {
+                "ValidatorSet": ValidatorSetMock[0],
+                "CandidateHub": CandidateHubMock[0],
+                "StakeHub": StakeHubMock[0],
+                "CoreAgent": CoreAgentMock[0],
+                "HashPowerAgent": HashPowerAgentMock[0],
+                "BitcoinAgent": BitcoinAgentMock[0],
+                "BitcoinStake": BitcoinStakeMock[0],
+                "BitcoinLSTStake": BitcoinLSTStakeMock[0],
+                "GovHub": GovHubMock[0],
+                "RelayerHub": RelayerHubMock[0],
+                "SlashIndicator": SlashIndicatorMock[0],
+                "Burn": Burn[0],
+                "Foundation": Foundation[0],
+                "SystemReward": SystemRewardMock[0]
+            }
 
         ## Divide the 100 addresses in accounts as follows，because these accounts require funding initially
         # accounts[0]~accounts[29] are allocated to the candidate operator
@@ -84,39 +127,24 @@ class AccountMgr:
         # init delegator accounts
         for i in range(constants.DELEGATOR_ADDR_COUNT):
             name = f"U{i}"
-            account = accounts[i + constants.DELEGATOR_ADDR_FROM_IDX]
+            account = account_list[i + constants.DELEGATOR_ADDR_FROM_IDX]
             cls.__delegator_addr_table[name] = account
             cls.__add_to_name_table(account, name)
 
         # backup random addresses
         for i in range(constants.BACKUP_ADDR_COUNT):
-            account = accounts[i + constants.BACKUP_ADDR_FROM_IDX].address
+            account = account_list[i + constants.BACKUP_ADDR_FROM_IDX].address
             cls.__backup_random_addr_table[account] = False
 
         # init sponsors
         for i in range(constants.SPONSOR_ADDR_COUNT):
             name = f"S{i}"
-            account = accounts[i + constants.SPONSOR_ADDR_FROM_IDX]
+            account = account_list[i + constants.SPONSOR_ADDR_FROM_IDX]
             cls.__sponsor_addr_table[name] = account
             cls.__add_to_name_table(account, name)
 
         # init contracts
-        cls.__contract_addr_table = {
-            "ValidatorSet": ValidatorSetMock[0],
-            "CandidateHub": CandidateHubMock[0],
-            "StakeHub": StakeHubMock[0],
-            "CoreAgent": CoreAgentMock[0],
-            "HashPowerAgent": HashPowerAgentMock[0],
-            "BitcoinAgent": BitcoinAgentMock[0],
-            "BitcoinStake": BitcoinStakeMock[0],
-            "BitcoinLSTStake": BitcoinLSTStakeMock[0],
-            "GovHub": GovHubMock[0],
-            "RelayerHub": RelayerHubMock[0],
-            "SlashIndicator": SlashIndicatorMock[0],
-            "Burn": Burn[0],
-            "Foundation": Foundation[0],
-            "SystemReward": SystemRewardMock[0]
-        }
+        cls.__contract_addr_table = contract_addr_table
 
         for name, addr in cls.__contract_addr_table.items():
             cls.__add_to_name_table(addr, name)
@@ -124,7 +152,7 @@ class AccountMgr:
         # init operator addresses, consensus addresses and fee addresses
         for i in range(constants.OPERATOR_ADDR_COUNT):
             operator_name = f"P{i}"
-            account = accounts[i + constants.OPERATOR_ADDR_FROM_IDX]
+            account = account_list[i + constants.OPERATOR_ADDR_FROM_IDX]
             cls.__operator_addr_table[operator_name] = account
             cls.__add_to_name_table(account, operator_name)
 
@@ -138,9 +166,31 @@ class AccountMgr:
             cls.__fee_addr_table[fee_addr_name] = fee_addr
             cls.__add_to_name_table(fee_addr, fee_addr_name)
 
+    @classmethod
+    def get_random_state(cls):
+        # the state of the draws made while the tasks are executed, saved by ChainSnapshot
+        return cls.__random.getstate(), cls.__key_pool.get_cursor()
+
+    @classmethod
+    def set_random_state(cls, state):
+        random_state, cursor = state
+        cls.__random.setstate(random_state)
+        cls.__key_pool.set_cursor(cursor)
+
+    @classmethod
+    def is_model_only(cls):
+        return cls.__model_only
+
+    @classmethod
+    def to_account(cls, addr):
+        if cls.__model_only:
+            return ModelAccount(addr)
+
+        return accounts.at(addr, force=True)
+
     @classmethod
     def random_get_sponsor(cls):
-        return random.choice(list(cls.__sponsor_addr_table.keys()))
+        return cls.__random.choice(list(cls.__sponsor_addr_table.keys()))
 
     @classmethod
     def get_contract_addr(cls, name):
@@ -6,6 +6,10 @@ from . import constants
 
 
 class BitcoinTx(ABC):
+    __slots__ = ("tx", "txid", "lock_output_payment", "lock_output_script_pubkey", "lock_output_redeem_script",
+        "op_return", "delegator", "relayer", "amount", "fee", "lock_output_index", "round", "block_time",
+        "block_number")
+
     def __init__(self):
         self.tx = None
         self.txid = None
@@ -150,6 +154,8 @@ class BitcoinTx(ABC):
 
 
 class StakeTx(BitcoinTx):
+    __slots__ = ("delegatee", "lock_time", "removed")
+
     def __init__(self, delegator, delegatee, amount, payment_type, **kwargs):
         super().__init__()
 
@@ -196,6 +202,8 @@ class StakeTx(BitcoinTx):
 
 
 class LSTStakeTx(BitcoinTx):
+    __slots__ = ()
+
     def __init__(self, delegator, amount, payment_type, **kwargs):
         super().__init__()
 
@@ -220,6 +228,8 @@ class LSTStakeTx(BitcoinTx):
 
 
 class LSTUnstakeTx(BitcoinTx):
+    __slots__ = ("output_payments", "vin", "change_output_index")
+
     def __init__(self, utxos, amount, payment, wallet):
         super().__init__()
         self.output_payments = []
@@ -1,3 +1,9 @@
+from .column_table import ColumnTable
+
+DELEGATOR_AMOUNT_FIELDS = ["stake_amount", "realtime_amount", "transferred_amount"]
+DELEGATOR_ROUND_FIELDS = ["change_round"]
+
+
 class CandidateStakeState:
     def __init__(self):
         # (asset name => realtime amount)
@@ -18,17 +24,14 @@ class CandidateStakeState:
         # e.g. (CORE => [core stake amount])  (BTC => [btc stake amount, btc lst stake amount])
         self.round_stake_amounts = {}
 
-        # (asset name=>(delegator=>round))
-        self.delegator_stake_change_rounds = {}
-
-        # (asset name=>(delegator=>amount))
-        self.delegator_stake_amounts = {}
+        # (asset name => factor) the asset factor the score was calculated with
+        self.score_factors = {}
 
-        # (asset name=>(delegator=>realtime amount))
-        self.delegator_stake_realtime_amounts = {}
+        # (asset name => True) the realtime amount changed after the round stake amount list was calculated
+        self.dirty_assets = {}
 
-        # (asset name=>(delegator=>transferred amount))
-        self.delegator_stake_transffered_amounts = {}
+        # (asset name=>ColumnTable) per delegator: change round, stake amount, realtime amount, transferred amount
+        self.delegator_tables = {}
 
         # round => powers
         self.round_powers = {}
@@ -41,6 +44,15 @@ class CandidateStakeState:
         self.realtime_amounts[asset_name] = self.get_realtime_amount(asset_name) + delta_amount
         assert self.realtime_amounts[asset_name] >= 0
 
+        if delta_amount != 0:
+            self.dirty_assets[asset_name] = True
+
+    def is_dirty(self, asset_name):
+        if self.round_stake_amounts.get(asset_name) is None:
+            return True
+
+        return self.dirty_assets.get(asset_name, False)
+
     def get_stake_amount(self, asset_name):
         return self.amounts.get(asset_name, 0)
 
@@ -52,61 +64,49 @@ class CandidateStakeState:
         self.amounts[asset_name] = self.realtime_amounts.get(asset_name, 0)
 
     ############### delegator asset state ####################
-    def get_delegator_change_round(self, asset_name, delegator):
-        if self.delegator_stake_change_rounds.get(asset_name) is None:
+    def get_delegator_table(self, asset_name):
+        table = self.delegator_tables.get(asset_name)
+        if table is None:
+            table = ColumnTable(DELEGATOR_AMOUNT_FIELDS, DELEGATOR_ROUND_FIELDS)
+            self.delegator_tables[asset_name] = table
+
+        return table
+
+    def get_delegator_field(self, asset_name, field, delegator):
+        table = self.delegator_tables.get(asset_name)
+        if table is None:
             return 0
 
-        return self.delegator_stake_change_rounds[asset_name].get(delegator, 0)
+        return table.get(field, delegator)
 
-    def update_delegator_change_round(self, asset_name, delegator, round):
-        if self.delegator_stake_change_rounds.get(asset_name) is None:
-            self.delegator_stake_change_rounds[asset_name] = {}
+    def get_delegator_change_round(self, asset_name, delegator):
+        return self.get_delegator_field(asset_name, "change_round", delegator)
 
+    def update_delegator_change_round(self, asset_name, delegator, round):
         assert round == 0 or round > self.get_delegator_change_round(asset_name, delegator)
-        self.delegator_stake_change_rounds[asset_name][delegator] = round
+        self.get_delegator_table(asset_name).set("change_round", delegator, round)
 
     def get_delegator_realtime_amount(self, asset_name, delegator):
-        if self.delegator_stake_realtime_amounts.get(asset_name) is None:
-            return 0
-
-        return self.delegator_stake_realtime_amounts[asset_name].get(delegator, 0)
+        return self.get_delegator_field(asset_name, "realtime_amount", delegator)
 
     def add_delegator_realtime_amount(self, asset_name, delegator, delta_amount):
-        if self.delegator_stake_realtime_amounts.get(asset_name) is None:
-            self.delegator_stake_realtime_amounts[asset_name] = {}
-
-        self.delegator_stake_realtime_amounts[asset_name][delegator] = \
-            self.get_delegator_realtime_amount(asset_name, delegator) + delta_amount
-
-        assert self.delegator_stake_realtime_amounts[asset_name][delegator] >= 0
+        self.get_delegator_table(asset_name).add("realtime_amount", delegator, delta_amount)
 
     def get_delegator_stake_amount(self, asset_name, delegator):
-        if self.delegator_stake_amounts.get(asset_name) is None:
-            return 0
-
-        return self.delegator_stake_amounts[asset_name].get(delegator, 0)
+        return self.get_delegator_field(asset_name, "stake_amount", delegator)
 
     def sync_delegator_stake_amount(self, asset_name, delegator):
-        if self.delegator_stake_amounts.get(asset_name) is None:
-            self.delegator_stake_amounts[asset_name] = {}
-
-        self.delegator_stake_amounts[asset_name][delegator] = \
+        self.get_delegator_table(asset_name).set(
+            "stake_amount",
+            delegator,
             self.get_delegator_realtime_amount(asset_name, delegator)
+        )
 
     def add_delegator_stake_amount(self, asset_name, delegator, delta_amount):
-        if self.delegator_stake_amounts.get(asset_name) is None:
-            self.delegator_stake_amounts[asset_name] = {}
-
-        self.delegator_stake_amounts[asset_name][delegator] = \
-            self.get_delegator_stake_amount(asset_name, delegator) + delta_amount
-
-        assert self.delegator_stake_amounts[asset_name][delegator] >= 0
+        self.get_delegator_table(asset_name).add("stake_amount", delegator, delta_amount)
 
     def get_delegator_transferred_amount(self, asset_name, delegator):
-        if self.delegator_stake_transffered_amounts.get(asset_name) is None:
-            return 0
-
-        return self.delegator_stake_transffered_amounts[asset_name].get(delegator, 0)
+        return self.get_delegator_field(asset_name, "transferred_amount", delegator)
 
     def add_delegator_transferred_amount(self, asset_name, delegator, delta_amount):
         new_amount = self.get_delegator_transferred_amount(asset_name, delegator) + delta_amount
@@ -114,10 +114,7 @@ class CandidateStakeState:
 
     def update_delegator_transferred_amount(self, asset_name, delegator, amount):
         assert amount >= 0
-        if self.delegator_stake_transffered_amounts.get(asset_name) is None:
-            self.delegator_stake_transffered_amounts[asset_name] = {}
-
-        self.delegator_stake_transffered_amounts[asset_name][delegator] = amount
+        self.get_delegator_table(asset_name).set("transferred_amount", delegator, amount)
 
     def set_round_powers(self, power_round, miners):
         assert self.round_powers.get(power_round) is None
@@ -135,13 +132,18 @@ class CandidateStakeState:
     # @param  asset_amount_list is a list, e.g. asset_name=BTC, asset_amounts=[btc realtime amount, btc lst realtime amount]
     def init_round_stake_amount_list(self, asset_name, asset_amount_list):
         self.round_stake_amounts[asset_name] = asset_amount_list
+        self.dirty_assets.pop(asset_name, None)
 
     def get_round_stake_amount_list(self, asset_name):
         return self.round_stake_amounts.get(asset_name, [])
 
+    def is_score_expired(self, asset_name, asset_factor):
+        return self.score_factors.get(asset_name) != asset_factor
+
     def update_score(self, asset_name, asset_factor):
         asset_amount_list = self.get_round_stake_amount_list(asset_name)
         self.scores[asset_name] = sum(asset_amount_list) * asset_factor
+        self.score_factors[asset_name] = asset_factor
 
     def get_score(self, asset_name):
         return self.scores.get(asset_name, 0)
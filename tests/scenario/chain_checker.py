@@ -1,7 +1,9 @@
 from brownie import *
+from contextlib import contextmanager
 from .payment import BtcLSTLockWallet
 from .delegator_stake_state import RedeemRequest
 from .account_mgr import AccountMgr
+from . import profiler
 
 addr_to_name = AccountMgr.addr_to_name
 
@@ -15,12 +17,66 @@ class ChainChecker:
         self.chain = chain
         self.task = task
 
+        # on-chain reads collected inside a batch, (target, calldata) => [contract, method, args, [callback]]
+        self.pending_reads = None
+
+    ############# batched on-chain reads ###################
+    @contextmanager
+    def batch(self):
+        assert self.pending_reads is None, f"Nested batch"
+        self.pending_reads = {}
+        try:
+            with profiler.checking():
+                yield
+                self.flush()
+        finally:
+            self.pending_reads = None
+
+    def flush(self):
+        reads = list(self.pending_reads.values())
+        self.pending_reads = {}
+        if len(reads) == 0:
+            return
+
+        calls = [(read[0].address, getattr(read[0], read[1]).encode_input(*read[2])) for read in reads]
+        results = self.chain.get_multicall().tryAggregate(calls)
+        assert len(results) == len(reads)
+
+        for read, result in zip(reads, results):
+            contract, method, args, callbacks = read
+            success, return_data = result
+            assert success, f"{method}({args}) failed in multicall"
+
+            val_on_chain = getattr(contract, method).decode_output(return_data)
+            for callback in callbacks:
+                callback(val_on_chain)
+
+    def read_on_chain(self, contract, method, args, callback):
+        if self.pending_reads is None:
+            callback(getattr(contract, method)(*args))
+            return
+
+        # the same read requested by several checks is sent once
+        calldata = getattr(contract, method).encode_input(*args)
+        key = (contract.address, calldata)
+        if self.pending_reads.get(key) is None:
+            self.pending_reads[key] = [contract, method, args, []]
+
+        self.pending_reads[key][3].append(callback)
+
+    def expect_on_chain(self, key, val_off_chain, contract, method, args, index=None):
+        def callback(val_on_chain):
+            if index is not None:
+                val_on_chain = val_on_chain[index]
+
+            assert_result(key, val_off_chain, val_on_chain)
+
+        self.read_on_chain(contract, method, args, callback)
+
+    ############# checks ###################
+
     def check_current_round(self):
-        assert_result(
-            "round",
-            self.chain.get_round(),
-            self.chain.get_round_on_chain()
-        )
+        self.expect_on_chain("round", self.chain.get_round(), CandidateHubMock[0], "roundTag", [])
 
     def check_candidate_statuses(self):
         candidates = self.chain.get_candidates()
@@ -106,27 +162,33 @@ class ChainChecker:
 
     def check_validator_income(self, consensus_addr):
         income = self.chain.get_validator_income(consensus_addr)
-        income_on_chain = self.chain.get_validator_income_on_chain(consensus_addr)
-
-        assert_result("income", income, income_on_chain)
+        self.expect_on_chain("income", income, ValidatorSetMock[0], "getIncoming", [consensus_addr])
 
     def check_total_income(self):
         total_income = self.chain.get_total_income()
-        total_income_on_chain = self.chain.get_total_income_on_chain()
-
-        assert_result("total_income", total_income, total_income_on_chain)
+        self.expect_on_chain("total_income", total_income, ValidatorSetMock[0], "totalInCome", [])
 
     def check_balance(self, addr):
         balance = self.chain.get_balance(addr)
-        balance_on_chain = self.chain.get_balance_on_chain(addr)
-
-        assert_result(f"{addr_to_name(addr)}_balance", balance, balance_on_chain)
+        address = addr if isinstance(addr, str) else addr.address
+
+        self.expect_on_chain(
+            f"{addr_to_name(addr)}_balance",
+            balance,
+            self.chain.get_multicall(),
+            "getEthBalance",
+            [address]
+        )
 
     def check_btc_lst_balance(self, addr):
         btc_lst_balance = self.chain.get_btc_lst_balance(addr)
-        btc_lst_balance_on_chain = self.chain.get_btc_lst_balance_on_chain(addr)
-
-        assert_result(f"{addr_to_name(addr)}_btc_lst_balance", btc_lst_balance, btc_lst_balance_on_chain)
+        self.expect_on_chain(
+            f"{addr_to_name(addr)}_btc_lst_balance",
+            btc_lst_balance,
+            BitcoinLSTToken[0],
+            "balanceOf",
+            [addr]
+        )
 
     def check_candidate(self, operator_addr):
         candidate = self.chain.get_candidate(operator_addr)
@@ -155,9 +217,13 @@ class ChainChecker:
         candidate = self.chain.get_candidate(operator_addr)
         jailed_round = candidate.get_jailed_round()
 
-        jailed_round_on_chain = self.chain.get_jailed_round_on_chain(operator_addr)
-
-        assert_result(f"{addr_to_name(operator_addr)}_jailed_round", jailed_round, jailed_round_on_chain)
+        self.expect_on_chain(
+            f"{addr_to_name(operator_addr)}_jailed_round",
+            jailed_round,
+            CandidateHubMock[0],
+            "jailMap",
+            [operator_addr]
+        )
 
     def check_delegator_core_realtime_amount(self, delegator, delegatee):
         candidate = self.chain.get_candidate(delegatee)
@@ -167,13 +233,13 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         realtime_amount = candidate_stake_state.get_delegator_realtime_amount(core_asset_name, delegator)
 
-        tuple_data = self.chain.get_delegator_core_stake_state_on_chain(delegator, delegatee)
-        realtime_amount_on_chain = tuple_data[1]
-
-        assert_result(
+        self.expect_on_chain(
             f"{addr_to_name(delegator)}_{addr_to_name(delegatee)}_realtime_amount",
             realtime_amount,
-            realtime_amount_on_chain
+            CoreAgentMock[0],
+            "getDelegator",
+            [delegatee, delegator],
+            index=1
         )
 
     def check_delegator_core_stake_amount(self, delegator, delegatee):
@@ -184,13 +250,13 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         stake_amount = candidate_stake_state.get_delegator_stake_amount(core_asset_name, delegator)
 
-        tuple_data = self.chain.get_delegator_core_stake_state_on_chain(delegator, delegatee)
-        stake_amount_on_chain = tuple_data[0]
-
-        assert_result(
+        self.expect_on_chain(
             f"{addr_to_name(delegator)}_{addr_to_name(delegatee)}_stake_amount",
             stake_amount,
-            stake_amount_on_chain
+            CoreAgentMock[0],
+            "getDelegator",
+            [delegatee, delegator],
+            index=0
         )
 
     def check_candidate_core_realtime_amount(self, delegatee):
@@ -201,10 +267,7 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         realtime_amount = candidate_stake_state.get_realtime_amount(core_asset_name)
 
-        tuple_data = self.chain.get_candidate_core_stake_state_on_chain(delegatee)
-        realtime_amount_on_chain = tuple_data[1]
-
-        assert_result("realtime_amount", realtime_amount, realtime_amount_on_chain)
+        self.expect_on_chain("realtime_amount", realtime_amount, CoreAgentMock[0], "candidateMap", [delegatee], index=1)
 
     def check_candidate_core_stake_amount(self, delegatee):
         candidate = self.chain.get_candidate(delegatee)
@@ -213,10 +276,7 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         amount = candidate.get_stake_state().get_stake_amount(core_asset_name)
 
-        tuple_data = self.chain.get_candidate_core_stake_state_on_chain(delegatee)
-        amount_on_chain = tuple_data[0]
-
-        assert_result("amount", amount, amount_on_chain)
+        self.expect_on_chain("amount", amount, CoreAgentMock[0], "candidateMap", [delegatee], index=0)
 
     def check_candidate_btc_stake_amount(self, delegatee):
         candidate = self.chain.get_candidate(delegatee)
@@ -224,15 +284,19 @@ class ChainChecker:
 
         btc_asset_name = self.chain.get_btc_asset().get_name()
         amount = candidate.get_stake_state().get_stake_amount(btc_asset_name)
-        amount_on_chain = self.chain.get_btc_stake_amount_on_chain(delegatee)
 
-        assert_result(f"{addr_to_name(delegatee)}_btc_stake_amount", amount, amount_on_chain)
+        self.expect_on_chain(
+            f"{addr_to_name(delegatee)}_btc_stake_amount",
+            amount,
+            BitcoinStakeMock[0],
+            "candidateMap",
+            [delegatee],
+            index=0
+        )
 
     def check_btc_lst_total_stake_amount(self):
         amount = self.chain.get_delegator_stake_state().get_btc_lst_total_stake_amount()
-        amount_on_chain = self.chain.get_btc_lst_total_stake_amount_on_chain()
-
-        assert_result("amount", amount, amount_on_chain)
+        self.expect_on_chain("amount", amount, BitcoinLSTStakeMock[0], "stakedAmount", [])
 
     def check_delegator_core_change_round(self, delegator, delegatee):
         candidate = self.chain.get_candidate(delegatee)
@@ -242,13 +306,13 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         change_round = candidate_stake_state.get_delegator_change_round(core_asset_name, delegator)
 
-        tuple_data = self.chain.get_delegator_core_stake_state_on_chain(delegator, delegatee)
-        change_round_on_chain = tuple_data[3]
-
-        assert_result(
+        self.expect_on_chain(
             f"{addr_to_name(delegator)}_{addr_to_name(delegatee)}_change_round",
             change_round,
-            change_round_on_chain
+            CoreAgentMock[0],
+            "getDelegator",
+            [delegatee, delegator],
+            index=3
         )
 
     def check_delegator_core_transferred_amount(self, delegator, delegatee):
@@ -257,21 +321,19 @@ class ChainChecker:
         core_asset_name = self.chain.get_core_asset().get_name()
         transferred_amount = candidate_stake_state.get_delegator_transferred_amount(core_asset_name, delegator)
 
-        tuple_data = self.chain.get_delegator_core_stake_state_on_chain(delegator, delegatee)
-        transferred_amount_on_chain = tuple_data[2]
-
-        assert_result(
+        self.expect_on_chain(
             f"{addr_to_name(delegator)}_{addr_to_name(delegatee)}_transferred_amount",
             transferred_amount,
-            transferred_amount_on_chain
+            CoreAgentMock[0],
+            "getDelegator",
+            [delegatee, delegator],
+            index=2
         )
 
     def check_delegator_core_total_amount(self, delegator):
         delegator_stake_state = self.chain.get_delegator_stake_state()
         total_amount = delegator_stake_state.get_core_amount(delegator)
-        total_amount_on_chain = self.chain.get_core_stake_total_amount_on_chain(delegator)
-
-        assert_result("total_amount", total_amount, total_amount_on_chain)
+        self.expect_on_chain("total_amount", total_amount, CoreAgentMock[0], "delegatorMap", [delegator])
 
     def check_delegator_core_stake_nodes(self, delegator):
         delegator_stake_state = self.chain.get_delegator_stake_state()
@@ -288,34 +350,57 @@ class ChainChecker:
 
     def check_core_history_reward(self, delegator):
         reward = self.chain.get_delegator_stake_state().get_core_history_reward(delegator)
-        reward_on_chain = self.chain.get_core_history_reward_on_chain(delegator)
-
-        assert_result(addr_to_name(delegator) + "_core_history_reward", reward, reward_on_chain)
+        self.expect_on_chain(
+            addr_to_name(delegator) + "_core_history_reward",
+            reward,
+            CoreAgentMock[0],
+            "rewardMap",
+            [delegator],
+            index=0
+        )
 
     def check_btc_lst_history_reward(self, delegator):
         reward = self.chain.get_delegator_stake_state().get_btc_lst_history_reward(delegator)
-        reward_on_chain = self.chain.get_btc_lst_history_reward_on_chain(delegator)
-
-        assert_result(addr_to_name(delegator) + "_btc_lst_history_reward", reward, reward_on_chain)
+        self.expect_on_chain(
+            addr_to_name(delegator) + "_btc_lst_history_reward",
+            reward,
+            BitcoinLSTStakeMock[0],
+            "rewardMap",
+            [delegator],
+            index=0
+        )
 
     def check_btc_stake_history_reward(self, delegator):
         claimable_reward = self.chain.get_delegator_stake_state().get_btc_stake_history_reward(delegator)
         unclaimable_reward = self.chain.get_delegator_stake_state().get_btc_stake_history_unclaimable_reward(delegator)
 
-        reward_on_chain = self.chain.get_btc_stake_history_reward_on_chain(delegator)
-        claimable_reward_on_chain = reward_on_chain[0]
-        unclaimable_reward_on_chain = reward_on_chain[1]
-
-        assert_result(addr_to_name(delegator) + "_btc_stake_claimable_reward", claimable_reward,
-                      claimable_reward_on_chain)
-        assert_result(addr_to_name(delegator) + "_btc_stake_unclaimable_reward", unclaimable_reward,
-                      unclaimable_reward_on_chain)
+        self.expect_on_chain(
+            addr_to_name(delegator) + "_btc_stake_claimable_reward",
+            claimable_reward,
+            BitcoinStakeMock[0],
+            "rewardMap",
+            [delegator],
+            index=0
+        )
+        self.expect_on_chain(
+            addr_to_name(delegator) + "_btc_stake_unclaimable_reward",
+            unclaimable_reward,
+            BitcoinStakeMock[0],
+            "rewardMap",
+            [delegator],
+            index=1
+        )
 
     def check_power_history_reward(self, delegator):
         reward = self.chain.get_delegator_stake_state().get_power_history_reward(delegator)
-        reward_on_chain = self.chain.get_power_history_reward_on_chain(delegator)
-
-        assert_result(addr_to_name(delegator) + "_power_history_reward", reward, reward_on_chain)
+        self.expect_on_chain(
+            addr_to_name(delegator) + "_power_history_reward",
+            reward,
+            HashPowerAgentMock[0],
+            "rewardMap",
+            [delegator],
+            index=0
+        )
 
     def check_history_reward(self, delegator):
         self.check_core_history_reward(delegator)
@@ -362,42 +447,39 @@ class ChainChecker:
     def check_btc_lst_total_realtime_amount(self):
         realtime_amount = \
             self.chain.get_delegator_stake_state().get_btc_lst_total_realtime_amount()
-        realtime_amount_on_chain = self.chain.get_btc_lst_total_realtime_amount_on_chain()
-
-        assert_result("realtime_amount", realtime_amount, realtime_amount_on_chain)
+        self.expect_on_chain("realtime_amount", realtime_amount, BitcoinLSTStakeMock[0], "realtimeAmount", [])
 
     def check_delegator_btc_lst_change_round(self, delegator):
-        tuple_data = self.chain.get_btc_lst_stake_info_on_chain(delegator)
-        change_round_on_chain = tuple_data[0]
-
         change_round = \
             self.chain.get_delegator_stake_state().get_btc_lst_change_round(delegator)
 
-        assert_result("change_round", change_round, change_round_on_chain)
+        self.expect_on_chain("change_round", change_round, BitcoinLSTStakeMock[0], "userStakeInfo", [delegator],
+                             index=0)
 
     def check_delegator_btc_lst_history_reward(self, delegator):
         history_reward = self.chain.get_delegator_stake_state().get_btc_lst_history_reward(delegator)
-        history_reward_on_chain = self.chain.get_btc_lst_history_reward_on_chain(delegator)
-
-        assert_result(f"{addr_to_name(delegator)}_history_reward", history_reward, history_reward_on_chain)
+        self.expect_on_chain(
+            f"{addr_to_name(delegator)}_history_reward",
+            history_reward,
+            BitcoinLSTStakeMock[0],
+            "rewardMap",
+            [delegator],
+            index=0
+        )
 
     def check_delegator_btc_lst_realtime_amount(self, delegator):
-        tuple_data = self.chain.get_btc_lst_stake_info_on_chain(delegator)
-        realtime_amount_on_chain = tuple_data[1]
-
         realtime_amount = \
             self.chain.get_delegator_stake_state().get_btc_lst_realtime_amount(delegator)
 
-        assert_result("realtime_amount", realtime_amount, realtime_amount_on_chain)
+        self.expect_on_chain("realtime_amount", realtime_amount, BitcoinLSTStakeMock[0], "userStakeInfo", [delegator],
+                             index=1)
 
     def check_delegator_btc_lst_stake_amount(self, delegator):
-        tuple_data = self.chain.get_btc_lst_stake_info_on_chain(delegator)
-        stake_amount_on_chain = tuple_data[2]
-
         stake_amount = \
             self.chain.get_delegator_stake_state().get_btc_lst_stake_amount(delegator)
 
-        assert_result("stake_amount", stake_amount, stake_amount_on_chain)
+        self.expect_on_chain("stake_amount", stake_amount, BitcoinLSTStakeMock[0], "userStakeInfo", [delegator],
+                             index=2)
 
     def check_btc_stake_tx(self, txid, log=False):
         tuple_data = self.chain.get_btc_stake_tx_on_chain(txid)
@@ -436,9 +518,14 @@ class ChainChecker:
 
     def check_btc_stake_realtime_amount(self, delegatee):
         realtime_amount = self.chain.get_btc_stake_realtime_amount(delegatee)
-        realtime_amount_on_chain = self.chain.get_btc_stake_realtime_amount_on_chain(delegatee)
-
-        assert_result(f"{addr_to_name(delegatee)}_realtime_amount", realtime_amount, realtime_amount_on_chain)
+        self.expect_on_chain(
+            f"{addr_to_name(delegatee)}_realtime_amount",
+            realtime_amount,
+            BitcoinStakeMock[0],
+            "candidateMap",
+            [delegatee],
+            index=1
+        )
 
     def check_delegator_btc_realtime_amount(self, delegator):
         # cannot check, delegatorMap on chain is private
@@ -466,11 +553,7 @@ class ChainChecker:
 
     def check_total_unclaimed_reward(self):
         unclaim_reward = self.chain.get_total_unclaimed_reward()
-        unclaim_reward_on_chain = self.chain.get_total_unclaimed_reward_on_chain()
-
-        print(f"total_unclaimed_reward off_chain={unclaim_reward}, on_chain={unclaim_reward_on_chain}")
-
-        assert_result("total_unclaim_reward", unclaim_reward, unclaim_reward_on_chain)
+        self.expect_on_chain("total_unclaim_reward", unclaim_reward, StakeHubMock[0], "surplus", [])
 
     def check_wallet(self, payment):
         delegator_stake_state = self.chain.get_delegator_stake_state()
@@ -1,93 +1,12 @@
 from brownie import *
-from itertools import islice
 from . import chain_state
 from . import constants
 from .payment import BtcLSTLockWallet
 from .account_mgr import AccountMgr
+from .top_k import select_top_k
 
 addr_to_name = AccountMgr.addr_to_name
-
-
-def partion(items, count, key):
-    assert isinstance(items, list)
-
-    ## for debug
-    # print("################################################")
-    # availableCandidates_on_chain, scores_on_chain = CandidateHubMock[0].getAvailableCandidates()
-    # print(f"available_candidates_on_chain: count={len(availableCandidates_on_chain)}")
-    # i = 0
-    # for candidate in availableCandidates_on_chain:
-    #     print(f"    {addr_to_name(candidate)} {candidate} {scores_on_chain[i]}")
-    #     i+=1
-
-    # validators_on_chain = ValidatorSetMock[0].getValidatorOps()
-    # print(f"validators_on_chain:count={len(validators_on_chain)}")
-    # for validator in validators_on_chain:
-    #     print(f"    {addr_to_name(validator)} {validator}")
-
-    # print(f"available_candidates_off_chain:count={len(items)}")
-    # for item in items:
-    #     print(f"    {addr_to_name(item.get_operator_addr())} item={item}")
-
-    if len(items) <= count:
-        print(f"available candidate partition: {len(items)}, {count}")
-        return items
-
-    count = min(len(items), count)
-    partion_range(items, 0, len(items) - 1, count, key)
-
-    # print(f"validator_off_chain:count={count}")
-    # for item in items[:count]:
-    #     print(f"    {addr_to_name(item.get_operator_addr())} item={item}")
-    # print("################################################")
-
-    return items[:count]
-
-
-def partion_range(items, left, right, count, key):
-    assert left <= right, f"Invalid range=[{left, {right} }]"
-
-    # print(f"partion_range left={left}, right={right}, count={count}")
-    # for item in items:
-    #     print(f"before {addr_to_name(item.get_operator_addr())} item={item}")
-
-    if count == 0 or right - left + 1 <= count:
-        return
-
-    l = left
-    r = right
-
-    pivot = left
-    pivot_item = items[pivot]
-    value = key(pivot_item)
-
-    while left < right:
-        while left < right:
-            if key(items[right]) < value:
-                right -= 1
-            else:
-                items[left] = items[right]
-                left += 1
-                break
-
-        while left < right:
-            if key(items[left]) >= value:
-                left += 1
-            else:
-                items[right] = items[left]
-                right -= 1
-                break
-
-    items[left] = pivot_item
-    left_count = left - l + 1
-
-    if left_count == count:
-        return
-
-    if left_count > count:
-        partion_range(items, l, left - 1, count, key)
-    elif left_count < count:
-        partion_range(items, left + 1, r, count - left_count, key)
+get_contract_addr = AccountMgr.get_contract_addr
 
 
 class ChainHandler:
@@ -118,7 +37,7 @@ class ChainHandler:
 
             self.chain.add_total_income(-incentive_amount)
 
-            self.chain.add_balance(ValidatorSetMock[0], -incentive_amount)
+            self.chain.add_balance(get_contract_addr("ValidatorSet"), -incentive_amount)
             self.chain.pay_to_system_reward(incentive_amount)
 
             # distribute to validator fee addr
@@ -126,13 +45,13 @@ class ChainHandler:
             validator.add_income(-commission_amount)
 
             self.chain.add_total_income(-commission_amount)
-            self.chain.add_balance(ValidatorSetMock[0], -commission_amount)
+            self.chain.add_balance(get_contract_addr("ValidatorSet"), -commission_amount)
             self.chain.add_balance(validator.get_fee_addr(), commission_amount)
 
             remain_reward += validator.get_income()
 
         # distribute it to the stake hub
-        self.chain.add_balance(ValidatorSetMock[0], -remain_reward)
+        self.chain.add_balance(get_contract_addr("ValidatorSet"), -remain_reward)
         self.distribute_reward_to_stake_hub(remain_reward)
 
     def distribute_reward_to_stake_hub(self, remain_reward):
@@ -145,8 +64,12 @@ class ChainHandler:
         assets = self.chain.get_assets()
         validators = self.chain.get_validators()
         round = self.chain.get_round()
+        # (operator addr => [income, distributed reward])
+        distributed_rewards = {
+            operator_addr: [validator.get_income(), 0] for operator_addr, validator in validators.items()
+        }
         for asset in assets:
-            for validator in validators.values():
+            for operator_addr, validator in validators.items():
                 total_score = validator.get_stake_state().get_total_score()
                 asset_score = validator.get_stake_state().get_score(asset.get_name())
 
@@ -159,9 +82,11 @@ class ChainHandler:
                         burn_amount += income
                         validator.add_income(-income)
                         self.chain.add_total_income(-income)
+                        distributed_rewards[operator_addr][1] += income
                     asset_reward = 0
                 else:
                     asset_reward = income * asset_score // total_score
+                    distributed_rewards[operator_addr][1] += asset_reward
 
                 # set reward for each asset
                 validator.get_stake_state().set_reward(asset.get_name(), asset_reward)
@@ -175,6 +100,10 @@ class ChainHandler:
             # distribute asset reward
             asset.distribute_reward(validators, self.chain.get_delegator_stake_state(), round)
 
+        self.chain.set_distributed_rewards(
+            {operator_addr: tuple(rewards) for operator_addr, rewards in distributed_rewards.items()}
+        )
+
         # check income of each validator and total_income is 0
         for validator in validators.values():
             validator.update_income(0)
@@ -183,7 +112,7 @@ class ChainHandler:
             print(f"total income != 0, dust is {self.chain.get_total_income()}")
             self.chain.update_total_income(0)
 
-        self.chain.add_balance(StakeHubMock[0], remain_reward - burn_amount)
+        self.chain.add_balance(get_contract_addr("StakeHub"), remain_reward - burn_amount)
         self.chain.pay_to_system_reward(burn_amount)
 
     def update_validator_set(self):
@@ -230,14 +159,23 @@ class ChainHandler:
         # clear expired data
         self.clean_up()
 
+        # candidates with a changed asset score, their total score is updated
+        rescored_candidates = {}
+
         for asset in assets:
-            # calculate the total staked amount of the current asset
+            # calculate the total staked amount of the current asset,
+            # the amount lists are only recalculated for the candidates whose stake changed
             total_amount = 0
             for candidate in available_candidates.values():
-                amount_list = asset.calc_candidate_stake_amount_list(candidate, delegator_stake_state,
-                                                                     self.chain.get_round())
-                candidate.get_stake_state().init_round_stake_amount_list(asset.get_name(), amount_list)
-                total_amount += sum(amount_list)
+                stake_state = candidate.get_stake_state()
+                if asset.is_stake_amount_list_changed(candidate, delegator_stake_state, self.chain.get_round()):
+                    amount_list = asset.calc_candidate_stake_amount_list(candidate, delegator_stake_state,
+                                                                         self.chain.get_round())
+                    if amount_list != stake_state.get_round_stake_amount_list(asset.get_name()):
+                        rescored_candidates[candidate.get_operator_addr()] = candidate
+                    stake_state.init_round_stake_amount_list(asset.get_name(), amount_list)
+
+                total_amount += sum(stake_state.get_round_stake_amount_list(asset.get_name()))
 
             # update the total aoount of the asset
             asset.set_total_amount(total_amount)
@@ -246,18 +184,24 @@ class ChainHandler:
             asset.update_factor(core_asset)
             print(f"update_candidates_score:{asset.get_name()}:{total_amount}, {asset.get_factor()}")
 
-            # update the asset score for each candidate
+            # update the asset score of the candidates whose amount list or asset factor changed
             for candidate in available_candidates.values():
-                candidate.get_stake_state().update_score(asset.get_name(), asset.get_factor())
+                stake_state = candidate.get_stake_state()
+                if rescored_candidates.get(candidate.get_operator_addr()) is None and \
+                        not stake_state.is_score_expired(asset.get_name(), asset.get_factor()):
+                    continue
+
+                stake_state.update_score(asset.get_name(), asset.get_factor())
+                rescored_candidates[candidate.get_operator_addr()] = candidate
 
         # clear tmp data, used to calc btc lst avg amounts
         delegator_stake_state.unset_lst_validator_count()
 
-        # update the total asset score for each candidate
-        for candidate in available_candidates.values():
+        # update the total asset score for each rescored candidate
+        for candidate in rescored_candidates.values():
             candidate.get_stake_state().update_total_score()
 
-        validators = partion(
+        validators = select_top_k(
             list(available_candidates.values()),
             self.chain.get_validator_count(),
             key=lambda item: item.get_total_score()
@@ -372,8 +316,8 @@ class ChainHandler:
 
         if slash_amount > 0:
             validator.add_margin_amount(-slash_amount)
-            self.chain.add_balance(CandidateHubMock[0], -slash_amount)
-            self.chain.add_balance(SystemRewardMock[0], slash_amount)
+            self.chain.add_balance(get_contract_addr("CandidateHub"), -slash_amount)
+            self.chain.add_balance(get_contract_addr("SystemReward"), slash_amount)
 
         # update candidate status
         remain_amount = margin - slash_amount
@@ -412,7 +356,7 @@ class ChainHandler:
             candidate.set_latest_slash_block(old_candidate.get_latest_slash_block())
 
         self.chain.add_candidate(candidate)
-        self.chain.add_balance(CandidateHubMock[0], margin)
+        self.chain.add_balance(get_contract_addr("CandidateHub"), margin)
         self.chain.add_balance(operator_addr, -margin)
 
     def remove_candidate(self, operator_addr):
@@ -423,15 +367,15 @@ class ChainHandler:
         deduct_amount = min(margin, dues)
         refund_amount = margin - deduct_amount
 
-        self.chain.add_balance(SystemRewardMock[0], deduct_amount)
+        self.chain.add_balance(get_contract_addr("SystemReward"), deduct_amount)
         self.chain.add_balance(operator_addr, refund_amount)
-        self.chain.add_balance(CandidateHubMock[0], -margin)
+        self.chain.add_balance(get_contract_addr("CandidateHub"), -margin)
 
         self.chain.remove_candidate(operator_addr)
 
     def add_margin(self, operator_addr, amount):
         self.chain.add_balance(operator_addr, -amount)
-        self.chain.add_balance(CandidateHubMock[0], amount)
+        self.chain.add_balance(get_contract_addr("CandidateHub"), amount)
 
         candidate = self.chain.get_candidate(operator_addr)
         candidate.add_margin_amount(amount)
@@ -453,7 +397,7 @@ class ChainHandler:
 
         full_reward = tx_fee + self.chain.get_block_reward()
 
-        balance = self.chain.get_balance(ValidatorSetMock[0])
+        balance = self.chain.get_balance(get_contract_addr("ValidatorSet"))
         if balance - self.chain.get_total_income() < full_reward:
             real_reward = tx_fee
             assert False, f"Why can't the full reward be received"
@@ -463,7 +407,7 @@ class ChainHandler:
         assert real_reward > 0
 
         # update validator set balance
-        self.chain.add_balance(ValidatorSetMock[0], tx_fee)
+        self.chain.add_balance(get_contract_addr("ValidatorSet"), tx_fee)
 
         # update validatorset total income
         self.chain.add_total_income(real_reward)
@@ -509,7 +453,7 @@ class ChainHandler:
         print(f"final total_unclaimed_reward = {self.chain.get_total_unclaimed_reward()}")
 
         self.chain.add_balance(delegator, total_claimable_reward)
-        self.chain.add_balance(StakeHubMock[0], -total_claimable_reward)
+        self.chain.add_balance(get_contract_addr("StakeHub"), -total_claimable_reward)
         # ## for debug
         # arr, arr2 = StakeHubMock[0].getDataArr()
         # print(f"STAKEHUB Debug on chain: {arr}, {arr2}")
@@ -533,7 +477,7 @@ class ChainHandler:
         if total_float_reward > float_reward_pool:
             supplementary_amount = total_float_reward * 10
             actual_supplementary_amount = \
-                self.chain.claim_system_reward(StakeHubMock[0], supplementary_amount)
+                self.chain.claim_system_reward(get_contract_addr("StakeHub"), supplementary_amount)
 
             # maybe actual_supplementary_amount < supplementary_amount
             self.chain.add_total_unclaimed_reward(actual_supplementary_amount)
@@ -608,7 +552,7 @@ class ChainHandler:
 
         # update balance
         self.chain.add_balance(delegator, -amount)
-        self.chain.add_balance(CoreAgentMock[0], amount)
+        self.chain.add_balance(get_contract_addr("CoreAgent"), amount)
 
     def undelegate_core(self, delegator, delegatee, amount, is_transfer=False):
         candidate = self.chain.get_candidate(delegatee)
@@ -660,7 +604,7 @@ class ChainHandler:
 
         # update balance
         self.chain.add_balance(delegator, amount)
-        self.chain.add_balance(CoreAgentMock[0], -amount)
+        self.chain.add_balance(get_contract_addr("CoreAgent"), -amount)
         if not is_transfer:
             self._deduct_transferred_amount_from_staked_candidates(delegator, amount - min(amount, stake_amount))
 
@@ -0,0 +1,152 @@
+import importlib.metadata
+import io
+import pickle
+import random
+from brownie import *
+from brownie.network.account import PublicKeyAccount
+from brownie.network.contract import ProjectContract
+from bitcoin.core.serialize import Serializable
+from bitcoin.core.key import CPubKey
+from bitcoin.wallet import CBitcoinAddress
+from ecdsa import SigningKey, SECP256k1
+from .account_mgr import AccountMgr
+from .payment import Payment
+
+
+def evm_snapshot():
+    # brownie keeps a single snapshot id which is already used by the test isolation fixtures,
+    # so the node snapshots are taken through the rpc directly
+    return web3.provider.make_request("evm_snapshot", [])["result"]
+
+
+# the brownie releases whose private Chain state evm_revert was checked against
+SUPPORTED_BROWNIE_VERSIONS = ["1.20"]
+
+
+def check_brownie_version(version):
+    major_minor = ".".join(version.split(".")[:2])
+    assert major_minor in SUPPORTED_BROWNIE_VERSIONS, \
+        f"evm_revert is not checked against brownie {version}, see SUPPORTED_BROWNIE_VERSIONS"
+
+
+def evm_revert(snapshot_id):
+    # the public chain.revert() only reverts to the single snapshot of the test isolation fixtures, so this is
+    # the one place that reaches into brownie's private Chain state. chain._revert reverts the node and brings
+    # the state brownie caches (block height, tx history, the time offset) back to it. the undo buffer refers
+    # to node snapshots taken after snapshot_id, which are gone
+    check_brownie_version(importlib.metadata.version("eth-brownie"))
+    chain._undo_buffer.clear()
+    chain._redo_buffer.clear()
+    chain._current_id = chain._revert(snapshot_id)
+
+
+def get_random_state():
+    # every rng seeded by init_random_sources, the rng of the SpvRelay is saved with the ChainState
+    return random.getstate(), AccountMgr.get_random_state(), Payment.get_random_state()
+
+
+def set_random_state(state):
+    random_state, account_mgr_state, payment_state = state
+    random.setstate(random_state)
+    AccountMgr.set_random_state(account_mgr_state)
+    Payment.set_random_state(payment_state)
+
+
+def find_contract(name, address):
+    container = project.get_loaded_projects()[0][name]
+    for contract in container:
+        if contract.address == address:
+            return contract
+
+    assert False, f"Contract {name} at {address} is not deployed"
+
+
+class StatePickler(pickle.Pickler):
+    # brownie objects hold the rpc connection, and some bitcoin objects hold ctypes handles or locks,
+    # all of them are saved by value and rebuilt on load
+    def persistent_id(self, obj):
+        if isinstance(obj, ProjectContract):
+            return "contract", obj._name, obj.address
+
+        if isinstance(obj, PublicKeyAccount):
+            return "account", obj.address
+
+        if isinstance(obj, Serializable):
+            return "btc_serializable", obj.__class__, obj.serialize()
+
+        if isinstance(obj, CPubKey):
+            return "btc_pubkey", bytes(obj)
+
+        if isinstance(obj, CBitcoinAddress):
+            return "btc_addr", str(obj)
+
+        if isinstance(obj, SigningKey):
+            return "signing_key", obj.to_string()
+
+        return None
+
+
+class StateUnpickler(pickle.Unpickler):
+    def persistent_load(self, pid):
+        tag = pid[0]
+        if tag == "contract":
+            return find_contract(pid[1], pid[2])
+
+        if tag == "account":
+            return accounts.at(pid[1], force=True)
+
+        if tag == "btc_serializable":
+            return pid[1].deserialize(pid[2])
+
+        if tag == "btc_pubkey":
+            return CPubKey(pid[1])
+
+        if tag == "btc_addr":
+            return CBitcoinAddress(pid[1])
+
+        if tag == "signing_key":
+            return SigningKey.from_string(pid[1], curve=SECP256k1)
+
+        raise pickle.UnpicklingError(f"Unsupported persistent id {tag}")
+
+
+def dump_state(chain):
+    buffer = io.BytesIO()
+    StatePickler(buffer, pickle.HIGHEST_PROTOCOL).dump(chain)
+    return buffer.getvalue()
+
+
+def load_state(data):
+    return StateUnpickler(io.BytesIO(data)).load()
+
+
+# pairs the node state with the off-chain ChainState (DelegatorStakeState included) and the random sources at
+# a round boundary. a snapshot is held in memory and by the node only, it does not outlive the process or a
+# restart of the node. it is taken after the tasks of a round, so only rounds with tasks can be resumed from,
+# the rounds without any are passed by the TurnRound task of the next round with tasks
+class ChainSnapshot:
+    def __init__(self, advanced_round, chain):
+        self.advanced_round = advanced_round
+        self.round = chain.get_round()
+        self.state = dump_state(chain)
+        self.random_state = get_random_state()
+        self.snapshot_id = evm_snapshot()
+
+    def __repr__(self):
+        return f"ChainSnapshot(advanced_round={self.advanced_round},round={self.round},size={len(self.state)})"
+
+    def get_advanced_round(self):
+        return self.advanced_round
+
+    def get_round(self):
+        return self.round
+
+    def restore(self):
+        evm_revert(self.snapshot_id)
+        # a node snapshot is consumed by evm_revert, take a new one so the snapshot can be restored again
+        self.snapshot_id = evm_snapshot()
+        set_random_state(self.random_state)
+
+        chain = load_state(self.state)
+        assert chain.get_round() == self.round
+        return chain
@@ -4,6 +4,11 @@ from . import stake_asset
 from . import constants
 from .candidate_stake_state import CandidateStakeState
 from .delegator_stake_state import DelegatorStakeState
+from .account_mgr import AccountMgr
+from .param_source import OnChainParamSource
+
+get_contract_addr = AccountMgr.get_contract_addr
+to_account = AccountMgr.to_account
 
 
 class NodeStatus(Enum):
@@ -15,6 +20,11 @@ class NodeStatus(Enum):
 
 
 class Candidate:
+    # records of the scenario entities are slotted, a long scenario creates a lot of them
+    __slots__ = ("income", "jailed_round", "operator", "slash_count", "latest_slash_block", "removed",
+        "operator_addr", "consensus_addr", "fee_addr", "commission", "margin", "status",
+        "commission_last_change_round", "commission_last_round_value", "stake_state", "commission_in_use")
+
     def __init__(self, tuple_data=None):
         self.income = 0
         self.jailed_round = 0
@@ -31,9 +41,9 @@ class Candidate:
 
         assert len(tuple_data) == 8
 
-        self.operator_addr = accounts.at(tuple_data[0], force=True)
-        self.consensus_addr = accounts.at(tuple_data[1], force=True)
-        self.fee_addr = accounts.at(tuple_data[2], force=True)
+        self.operator_addr = to_account(tuple_data[0])
+        self.consensus_addr = to_account(tuple_data[1])
+        self.fee_addr = to_account(tuple_data[2])
         self.commission = tuple_data[3]
         self.margin = tuple_data[4]
         self.status = tuple_data[5]
@@ -249,8 +259,12 @@ class Candidate:
 
 
 class ChainState:
-    def __init__(self, round):
+    def __init__(self, round, param_source=None):
         self.round = round
+        # the parameters the model starts from, read from the contracts unless a captured source is given
+        self.param_source = param_source if param_source is not None else OnChainParamSource()
+        # the model-only run counts the blocks itself, one per transaction
+        self.block_number = 0
         self.core_asset = None
         self.power_asset = None
         self.btc_asset = None
@@ -268,12 +282,17 @@ class ChainState:
         self.is_burn_out_of_cap = False
         self.burn_cap = 0
         self.total_unclaimed_reward = 0
+        # (operator addr => (income, distributed reward)) of the validators in the last reward distribution
+        self.distributed_rewards = {}
 
-        self.delegator_stake_state = DelegatorStakeState()
+        self.delegator_stake_state = DelegatorStakeState(self.param_source)
 
         # store BTC transactions shared between tasks
         self.shared_btc_txs = {}
 
+        # relays the blocks of the staked BTC transactions when the scenario runs with real SPV proofs
+        self.spv_relay = None
+
         self.init_required_margin()
         self.init_validator_count()
         self.init_candidates()
@@ -284,23 +303,24 @@ class ChainState:
         self.init_btc_asset()
         self.init_incentive_params()
         self.init_slash_threshold()
+        self.init_block_number()
+        self.init_multicall()
 
     ############# initialization ########################
     def init_balance(self, addr):
         if self.balances.get(addr) is None:
-            self.balances[addr] = self.get_balance_on_chain(addr)
+            self.balances[addr] = self.param_source.get_balance(addr)
 
     def init_btc_lst_balance(self, addr):
         if self.btc_lst_balances.get(addr) is None:
-            self.btc_lst_balances[addr] = self.get_btc_lst_balance_on_chain(addr)
+            self.btc_lst_balances[addr] = self.param_source.get_btc_lst_balance(addr)
 
     def init_required_margin(self):
-        self.candidate_required_margin = \
-            CandidateHubMock[0].requiredMargin()
-        self.candidate_dues = CandidateHubMock[0].dues()
+        self.candidate_required_margin = self.param_source.get("required_margin")
+        self.candidate_dues = self.param_source.get("dues")
 
     def init_candidates(self):
-        operator_addr_list = CandidateHubMock[0].getCandidates()
+        operator_addr_list = self.param_source.get("candidates")
         assert len(operator_addr_list) == 0, f"{operator_addr_list}"
         self.candidates = {}
 
@@ -308,11 +328,8 @@ class ChainState:
         assert self.validators is None
         self.validators = {}
 
-        operator_addr_list = ValidatorSetMock[0].getValidatorOps()
-
         status = NodeStatus.CANDIDATE.value | NodeStatus.VALIDATOR.value
-        for i in range(len(operator_addr_list)):
-            tuple_data = ValidatorSetMock[0].currentValidatorSet(i)
+        for tuple_data in self.param_source.get("validators"):
             reorg_tuple_data = [
                 tuple_data[0],
                 tuple_data[1],
@@ -328,41 +345,71 @@ class ChainState:
 
     def init_block_reward(self):
         if self.block_reward == 0:
-            self.block_reward = ValidatorSetMock[0].blockReward()
+            self.block_reward = self.param_source.get("block_reward")
+
+        self.subsidy_reduce_interval = self.param_source.get("subsidy_reduce_interval")
+        self.reduce_factor = self.param_source.get("reduce_factor")
 
     def init_core_asset(self):
-        self.core_asset = stake_asset.CoreAsset()
+        self.core_asset = stake_asset.CoreAsset(self.param_source)
         print(f"core asset init state: {self.core_asset}")
 
     def init_power_asset(self):
-        self.power_asset = stake_asset.PowerAsset()
+        self.power_asset = stake_asset.PowerAsset(self.param_source)
         print(f"power asset init state: {self.power_asset}")
 
     def init_btc_asset(self):
-        self.btc_asset = stake_asset.BtcAsset()
+        self.btc_asset = stake_asset.BtcAsset(self.param_source)
         print(f"btc asset init state: {self.btc_asset}")
 
     def init_validator_count(self):
-        self.validator_count = CandidateHubMock[0].validatorCount()
+        self.validator_count = self.param_source.get("validator_count")
         print(f"validator_count: {self.validator_count}")
 
     def init_incentive_params(self):
-        self.incentive_percent = ValidatorSetMock[0].blockRewardIncentivePercent()
-        self.incentive_balance_cap = SystemRewardMock[0].incentiveBalanceCap()
-        self.is_burn_out_of_cap = SystemRewardMock[0].isBurn()
-        self.burn_cap = Burn[0].burnCap()
+        self.incentive_percent = self.param_source.get("incentive_percent")
+        self.incentive_balance_cap = self.param_source.get("incentive_balance_cap")
+        self.is_burn_out_of_cap = self.param_source.get("is_burn")
+        self.burn_cap = self.param_source.get("burn_cap")
 
     def init_slash_threshold(self):
-        contract = SlashIndicatorMock[0]
-        self.felony_threshold = contract.felonyThreshold()
-        self.misdemeanor_threshold = contract.misdemeanorThreshold()
-        self.felony_deposit = contract.felonyDeposit()
-        self.felony_round = contract.felonyRound()
-        self.reward_for_report_double_sign = contract.rewardForReportDoubleSign()
+        self.felony_threshold = self.param_source.get("felony_threshold")
+        self.misdemeanor_threshold = self.param_source.get("misdemeanor_threshold")
+        self.felony_deposit = self.param_source.get("felony_deposit")
+        self.felony_round = self.param_source.get("felony_round")
+        self.reward_for_report_double_sign = self.param_source.get("reward_for_report_double_sign")
+
+    def init_block_number(self):
+        self.block_number = self.param_source.get("block_number")
+
+    def init_multicall(self):
+        self.multicall = None
+        if self.is_model_only():
+            return
+
+        # batches the on-chain reads of ChainChecker, deployed by a sponsor whose balance is not tracked
+        self.multicall = Multicall.deploy({'from': accounts[constants.SPONSOR_ADDR_FROM_IDX]})
 
     ############# end initialization ########################
 
     ############## getter and setter #########################
+    def is_model_only(self):
+        return self.param_source.is_model_only()
+
+    def get_param_source(self):
+        return self.param_source
+
+    def set_spv_relay(self, spv_relay):
+        self.spv_relay = spv_relay
+
+    def get_spv_relay(self):
+        return self.spv_relay
+
+    def mine_block(self):
+        # the model-only run has no node, every simulated transaction is mined in a block of its own
+        self.block_number += 1
+        return self.block_number
+
     def get_balance(self, addr):
         return self.balances.get(addr, 0)
 
@@ -488,6 +535,12 @@ class ChainState:
         self.total_unclaimed_reward += delta_amount
         assert self.total_unclaimed_reward >= 0
 
+    def get_distributed_rewards(self):
+        return self.distributed_rewards
+
+    def set_distributed_rewards(self, distributed_rewards):
+        self.distributed_rewards = distributed_rewards
+
     def get_incentive_percent(self):
         return self.incentive_percent
 
@@ -496,10 +549,8 @@ class ChainState:
 
     def update_block_reward(self, block_number):
         assert self.block_reward > 0
-        reduce_interval = ValidatorSetMock[0].SUBSIDY_REDUCE_INTERVAL()
-        reduce_factor = ValidatorSetMock[0].REDUCE_FACTOR()
-        if block_number % reduce_interval == 0:
-            self.block_reward = self.block_reward * reduce_factor // constants.PERCENT_DECIMALS
+        if block_number % self.subsidy_reduce_interval == 0:
+            self.block_reward = self.block_reward * self.reduce_factor // constants.PERCENT_DECIMALS
 
     def get_total_income(self):
         return self.total_income
@@ -546,6 +597,9 @@ class ChainState:
     def get_candidate_required_margin(self):
         return self.candidate_required_margin
 
+    def get_multicall(self):
+        return self.multicall
+
     ############## getter and setter ########################
 
     ############### on-chain state getter #####################
@@ -684,27 +738,26 @@ class ChainState:
             return
 
         # print(f"Pay to systemreward:{amount}")
-        old_balance = self.get_balance(SystemRewardMock[0])
+        old_balance = self.get_balance(get_contract_addr("SystemReward"))
         if old_balance + amount <= self.incentive_balance_cap:
-            self.add_balance(SystemRewardMock[0], amount)
+            self.add_balance(get_contract_addr("SystemReward"), amount)
             return
 
-        self.update_balance(SystemRewardMock[0], self.incentive_balance_cap)
+        self.update_balance(get_contract_addr("SystemReward"), self.incentive_balance_cap)
         out_of_cap_amount = old_balance + amount - self.incentive_balance_cap
         if self.is_burn_out_of_cap:
             refund_amount = self.pay_to_burn(out_of_cap_amount)
-            self.add_balance(SystemRewardMock[0], refund_amount)
+            self.add_balance(get_contract_addr("SystemReward"), refund_amount)
         else:
-            self.add_balance(Foundation[0], out_of_cap_amount)
+            self.add_balance(get_contract_addr("Foundation"), out_of_cap_amount)
 
     def claim_system_reward(self, receiver, amount):
-        balance = self.get_balance(SystemRewardMock[0])
+        balance = self.get_balance(get_contract_addr("SystemReward"))
         assert amount <= balance, f"insufficient balance"
-        print(
-            f"SystemReward balance off_chain={balance}, on_chain={self.get_balance_on_chain(SystemRewardMock[0])}, expect claim={amount}")
+        print(f"SystemReward balance off_chain={balance}, expect claim={amount}")
         amount = min(balance, amount)
         self.add_balance(receiver, amount)
-        self.add_balance(SystemRewardMock[0], -amount)
+        self.add_balance(get_contract_addr("SystemReward"), -amount)
 
         assert amount >= 0
         return amount
@@ -713,9 +766,9 @@ class ChainState:
         if amount == 0:
             return 0
 
-        old_balance = self.get_balance(Burn[0])
+        old_balance = self.get_balance(get_contract_addr("Burn"))
         if old_balance + amount <= self.burn_cap:
-            self.add_balance(Burn[0], amount)
+            self.add_balance(get_contract_addr("Burn"), amount)
             return 0
 
         out_of_cap_amount = old_balance + amount - self.burn_cap
@@ -724,7 +777,7 @@ class ChainState:
         else:
             refund_amount = out_of_cap_amount
 
-        self.update_balance(Burn[0], self.burn_cap)
+        self.update_balance(get_contract_addr("Burn"), self.burn_cap)
 
         return refund_amount
 
@@ -0,0 +1,106 @@
+from array import array
+
+WORD_BITS = 64
+WORD_MASK = (1 << WORD_BITS) - 1
+MAX_AMOUNT = (1 << (2 * WORD_BITS)) - 1
+
+
+class AmountColumn:
+    # non-negative amounts up to 128 bits, kept as two unsigned 64-bit words, 16 bytes per row
+    def __init__(self):
+        self.high_words = array('Q')
+        self.low_words = array('Q')
+
+    def append_row(self):
+        self.high_words.append(0)
+        self.low_words.append(0)
+
+    def get(self, row):
+        return (self.high_words[row] << WORD_BITS) | self.low_words[row]
+
+    def set(self, row, value):
+        assert 0 <= value <= MAX_AMOUNT, f"Amount out of range {value}"
+        self.high_words[row] = value >> WORD_BITS
+        self.low_words[row] = value & WORD_MASK
+
+    def copy_from(self, other):
+        self.high_words = array('Q', other.high_words)
+        self.low_words = array('Q', other.low_words)
+
+
+class RoundColumn:
+    # rounds and other small signed integers, 8 bytes per row
+    def __init__(self):
+        self.values = array('q')
+
+    def append_row(self):
+        self.values.append(0)
+
+    def get(self, row):
+        return self.values[row]
+
+    def set(self, row, value):
+        self.values[row] = value
+
+    def copy_from(self, other):
+        self.values = array('q', other.values)
+
+
+class ColumnTable:
+    # per-address fields stored column by column: every address is interned once to a row,
+    # and each field is an array indexed by the row, instead of one dict of python ints per field.
+    # an address without a row reads 0 in every field. the memory is traded for time: at 100k delegators
+    # bench_stake_state_memory measures the writes of DelegatorStakeState about 1.7x and of CandidateStakeState
+    # about 2.6x to 2.9x slower than the dicts.
+    # the saving is 2.4x to 3.6x, short of the order of magnitude that was asked for. the columns are already
+    # typed arrays, what is left is the address => row dict, which costs about as much per row as all the
+    # columns together and is needed to look up a delegator by address
+    def __init__(self, amount_fields, round_fields=()):
+        # (address => row)
+        self.rows = {}
+        # (field => column)
+        self.columns = {}
+
+        for field in amount_fields:
+            self.columns[field] = AmountColumn()
+
+        for field in round_fields:
+            self.columns[field] = RoundColumn()
+
+    def __len__(self):
+        return len(self.rows)
+
+    def get_keys(self):
+        return self.rows.keys()
+
+    def get_row(self, key):
+        return self.rows.get(key)
+
+    def intern(self, key):
+        row = self.rows.get(key)
+        if row is None:
+            row = len(self.rows)
+            self.rows[key] = row
+            for column in self.columns.values():
+                column.append_row()
+
+        return row
+
+    def get(self, field, key):
+        row = self.rows.get(key)
+        if row is None:
+            return 0
+
+        return self.columns[field].get(row)
+
+    def set(self, field, key, value):
+        self.columns[field].set(self.intern(key), value)
+
+    def add(self, field, key, delta_value):
+        value = self.get(field, key) + delta_value
+        self.set(field, key, value)
+        return value
+
+    def copy_column(self, from_field, to_field):
+        # bulk copy of a whole field, e.g. the realtime amounts of all addresses into the stake amounts
+        self.columns[to_field].copy_from(self.columns[from_field])
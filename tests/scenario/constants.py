@@ -54,3 +54,6 @@ MAX_BTC_LST_STAKE_GRADE_PERCENT = 10 ** 5
 MAX_CANDIDATE_COMMISSION = 300
 
 BITCOIN_TX_SYMBOL_PREFIX = "tx_"
+
+# the block height of the fake btc tx proofs accepted by BtcLightClientMock.setCheckResult
+FAKE_BTC_BLOCK_HEIGHT = 100
@@ -2,9 +2,28 @@ from brownie import *
 from .payment import BtcLSTLockWallet
 import random
 from . import constants
+from .column_table import ColumnTable
+
+DELEGATOR_AMOUNT_FIELDS = [
+    "core_amount",
+    "btc_lst_stake_amount",
+    "btc_lst_realtime_amount",
+    "core_history_reward",
+    "core_history_accured_stake_amount",
+    "btc_lst_history_reward",
+    "btc_lst_history_accured_stake_amount",
+    "btc_stake_history_reward",
+    "btc_stake_history_unclaimable_reward",
+    "btc_stake_history_accured_stake_amount",
+    "power_history_reward",
+    "power_history_accured_stake_amount"
+]
+DELEGATOR_ROUND_FIELDS = ["btc_lst_change_round"]
 
 
 class RedeemRequest:
+    __slots__ = ("hash", "payment_type", "amount")
+
     def __init__(self, hash, payment_type, amount):
         self.hash = hash
         self.payment_type = payment_type
@@ -33,6 +52,8 @@ class RedeemRequest:
 
 
 class RedeemProofTx:
+    __slots__ = ("txid", "change_output_index", "change_output_amount", "block_number", "spent")
+
     def __init__(self):
         self.txid = None
         self.change_output_index = 0
@@ -75,9 +96,10 @@ class RedeemProofTx:
 
 
 class DelegatorStakeState:
-    def __init__(self):
-        # (delegator addr=>amount)
-        self.core_amounts = {}
+    def __init__(self, param_source):
+        # per delegator: core amount, btc lst amounts and change round, history rewards and accured stake amounts
+        self.delegator_table = ColumnTable(DELEGATOR_AMOUNT_FIELDS, DELEGATOR_ROUND_FIELDS)
+
         # (delegator addr=>candidate addr list)
         self.core_stake_candidates = {}
 
@@ -94,25 +116,6 @@ class DelegatorStakeState:
         self.btc_lst_total_realtime_amount = 0
         self.utxo_fee = 0
 
-        # btc lst user info
-        self.delegator_btc_lst_change_round = {}
-        self.delegator_btc_lst_stake_amount = {}
-        self.delegator_btc_lst_realtime_amount = {}
-
-        # history reward
-        self.delegator_core_history_reward = {}
-        self.delegator_core_history_accured_stake_amount = {}
-
-        self.delegator_btc_lst_history_reward = {}
-        self.delegator_btc_lst_history_accured_stake_amount = {}
-
-        self.delegator_btc_stake_history_reward = {}
-        self.delegator_btc_stake_history_unclaimable_reward = {}
-        self.delegator_btc_stake_history_accured_stake_amount = {}
-
-        self.delegator_power_history_reward = {}
-        self.delegator_power_history_accured_stake_amount = {}
-
         # (delegator=>[(relayer1,amount1),(relayer2,amount2)])
         self.debts = {}
 
@@ -139,22 +142,22 @@ class DelegatorStakeState:
         # redeem proof txs
         self.redeem_proof_txs = {}
 
-        self.init_data_on_chain()
+        self.init_data_on_chain(param_source)
 
-    def init_data_on_chain(self):
-        self.core_stake_grade_flag = BitcoinAgentMock[0].gradeActive()
-        self.core_stake_grades = BitcoinAgentMock[0].getGrades()
+    def init_data_on_chain(self, param_source):
+        self.core_stake_grade_flag = param_source.get("core_stake_grade_flag")
+        self.core_stake_grades = param_source.get("core_stake_grades")
 
-        self.btc_stake_grade_flag = BitcoinStakeMock[0].gradeActive()
-        self.btc_stake_grades = BitcoinStakeMock[0].getGrades()
+        self.btc_stake_grade_flag = param_source.get("btc_stake_grade_flag")
+        self.btc_stake_grades = param_source.get("btc_stake_grades")
 
         self.btc_lst_stake_grade_flag = True
-        self.btc_lst_stake_percent = BitcoinAgentMock[0].lstGradePercentage()
+        self.btc_lst_stake_percent = param_source.get("btc_lst_stake_grade_percent")
 
         if self.btc_lst_stake_grade_flag:
             assert self.btc_lst_stake_percent > 0
 
-        self.utxo_fee = BitcoinLSTStakeMock[0].utxoFee()
+        self.utxo_fee = param_source.get("utxo_fee")
 
     def update_core_stake_grade_flag(self, grade_flag):
         self.core_stake_grade_flag = grade_flag
@@ -246,11 +249,10 @@ class DelegatorStakeState:
         return self.btc_lst_total_realtime_amount // self.lst_validator_count
 
     def get_core_amount(self, delegator):
-        return self.core_amounts.get(delegator, 0)
+        return self.delegator_table.get("core_amount", delegator)
 
     def add_core_amount(self, delegator, delta_amount):
-        self.core_amounts[delegator] = self.core_amounts.get(delegator, 0) + delta_amount
-        assert self.core_amounts[delegator] >= 0
+        self.delegator_table.add("core_amount", delegator, delta_amount)
 
     def get_core_stake_candidates(self, delegator):
         return self.core_stake_candidates.get(delegator, {})
@@ -300,148 +302,117 @@ class DelegatorStakeState:
         assert self.btc_lst_total_realtime_amount >= 0
 
     def get_btc_lst_change_round(self, delegator):
-        return self.delegator_btc_lst_change_round.get(delegator, 0)
+        return self.delegator_table.get("btc_lst_change_round", delegator)
 
     def update_btc_lst_change_round(self, delegator, round):
         assert round >= self.get_btc_lst_change_round(delegator)
-        self.delegator_btc_lst_change_round[delegator] = round
+        self.delegator_table.set("btc_lst_change_round", delegator, round)
 
     def get_btc_lst_stake_amount(self, delegator):
-        return self.delegator_btc_lst_stake_amount.get(delegator, 0)
+        return self.delegator_table.get("btc_lst_stake_amount", delegator)
 
     def get_btc_lst_realtime_amount(self, delegator):
-        return self.delegator_btc_lst_realtime_amount.get(delegator, 0)
+        return self.delegator_table.get("btc_lst_realtime_amount", delegator)
 
     def sync_btc_lst_stake_amount(self, delegator):
-        self.delegator_btc_lst_stake_amount[delegator] = \
-            self.get_btc_lst_realtime_amount(delegator)
+        self.delegator_table.set("btc_lst_stake_amount", delegator, self.get_btc_lst_realtime_amount(delegator))
 
     def add_btc_lst_realtime_amount(self, delegator, delta_amout):
-        self.delegator_btc_lst_realtime_amount[delegator] = \
-            self.get_btc_lst_realtime_amount(delegator) + delta_amout
-
-        assert self.delegator_btc_lst_realtime_amount[delegator] >= 0
+        self.delegator_table.add("btc_lst_realtime_amount", delegator, delta_amout)
 
     def add_btc_lst_total_realtime_amount(self, delta_amount):
         self.btc_lst_total_realtime_amount += delta_amount
         assert self.btc_lst_total_realtime_amount >= 0
 
     def get_btc_lst_history_reward(self, delegator):
-        return self.delegator_btc_lst_history_reward.get(delegator, 0)
+        return self.delegator_table.get("btc_lst_history_reward", delegator)
 
     def add_btc_lst_history_reward(self, delegator, delta_amount):
-        self.delegator_btc_lst_history_reward[delegator] = \
-            self.get_btc_lst_history_reward(delegator) + delta_amount
-
-        assert self.delegator_btc_lst_history_reward[delegator] >= 0
+        self.delegator_table.add("btc_lst_history_reward", delegator, delta_amount)
 
     def update_btc_lst_history_reward(self, delegator, amount):
         assert amount >= 0
-        self.delegator_btc_lst_history_reward[delegator] = amount
+        self.delegator_table.set("btc_lst_history_reward", delegator, amount)
 
     def get_btc_lst_history_accured_stake_amount(self, delegator):
-        return self.delegator_btc_lst_history_accured_stake_amount.get(delegator, 0)
+        return self.delegator_table.get("btc_lst_history_accured_stake_amount", delegator)
 
     def add_btc_lst_history_accured_stake_amount(self, delegator, delta_amount):
-        self.delegator_btc_lst_history_accured_stake_amount[delegator] = \
-            self.get_btc_lst_history_accured_stake_amount(delegator) + delta_amount
-
-        assert self.delegator_btc_lst_history_accured_stake_amount[delegator] >= 0
+        self.delegator_table.add("btc_lst_history_accured_stake_amount", delegator, delta_amount)
 
     def update_btc_lst_history_accured_stake_amount(self, delegator, amount):
         assert amount >= 0
-        self.delegator_btc_lst_history_accured_stake_amount[delegator] = amount
+        self.delegator_table.set("btc_lst_history_accured_stake_amount", delegator, amount)
 
     def get_btc_stake_history_reward(self, delegator):
-        return self.delegator_btc_stake_history_reward.get(delegator, 0)
+        return self.delegator_table.get("btc_stake_history_reward", delegator)
 
     def add_btc_stake_history_reward(self, delegator, delta_amount):
-        self.delegator_btc_stake_history_reward[delegator] = \
-            self.get_btc_stake_history_reward(delegator) + delta_amount
-
-        assert self.delegator_btc_stake_history_reward[delegator] >= 0
+        self.delegator_table.add("btc_stake_history_reward", delegator, delta_amount)
 
     def update_btc_stake_history_reward(self, delegator, amount):
         assert amount >= 0
-        self.delegator_btc_stake_history_reward[delegator] = amount
+        self.delegator_table.set("btc_stake_history_reward", delegator, amount)
 
     def get_btc_stake_history_unclaimable_reward(self, delegator):
-        return self.delegator_btc_stake_history_unclaimable_reward.get(delegator, 0)
+        return self.delegator_table.get("btc_stake_history_unclaimable_reward", delegator)
 
     def add_btc_stake_history_unclaimable_reward(self, delegator, delta_amount):
-        self.delegator_btc_stake_history_unclaimable_reward[delegator] = \
-            self.get_btc_stake_history_unclaimable_reward(delegator) + delta_amount
-
-        assert self.delegator_btc_stake_history_unclaimable_reward[delegator] >= 0
+        self.delegator_table.add("btc_stake_history_unclaimable_reward", delegator, delta_amount)
 
     def update_btc_stake_history_unclaimable_reward(self, delegator, amount):
         assert amount >= 0
-        self.delegator_btc_stake_history_unclaimable_reward[delegator] = amount
+        self.delegator_table.set("btc_stake_history_unclaimable_reward", delegator, amount)
 
     def get_btc_stake_history_accured_stake_amount(self, delegator):
-        return self.delegator_btc_stake_history_accured_stake_amount.get(delegator, 0)
+        return self.delegator_table.get("btc_stake_history_accured_stake_amount", delegator)
 
     def add_btc_stake_history_accured_stake_amount(self, delegator, delta_amount):
-        self.delegator_btc_stake_history_accured_stake_amount[delegator] = \
-            self.get_btc_stake_history_accured_stake_amount(delegator) + delta_amount
-
-        assert self.delegator_btc_stake_history_accured_stake_amount[delegator] >= 0
+        self.delegator_table.add("btc_stake_history_accured_stake_amount", delegator, delta_amount)
 
     def update_btc_stake_history_accured_stake_amount(self, delegator, amount):
         assert amount >= 0
-        self.delegator_btc_stake_history_accured_stake_amount[delegator] = amount
+        self.delegator_table.set("btc_stake_history_accured_stake_amount", delegator, amount)
 
     def get_power_history_reward(self, delegator):
-        return self.delegator_power_history_reward.get(delegator, 0)
+        return self.delegator_table.get("power_history_reward", delegator)
 
     def add_power_history_reward(self, delegator, delta_amount):
-        self.delegator_power_history_reward[delegator] = \
-            self.get_power_history_reward(delegator) + delta_amount
-
-        assert self.delegator_power_history_reward[delegator] >= 0
+        self.delegator_table.add("power_history_reward", delegator, delta_amount)
 
     def update_power_history_reward(self, delegator, amount):
         assert amount >= 0
-        self.delegator_power_history_reward[delegator] = amount
+        self.delegator_table.set("power_history_reward", delegator, amount)
 
     def get_power_history_accured_stake_amount(self, delegator):
-        return self.delegator_power_history_accured_stake_amount.get(delegator, 0)
+        return self.delegator_table.get("power_history_accured_stake_amount", delegator)
 
     def add_power_history_accured_stake_amount(self, delegator, delta_amount):
-        self.delegator_power_history_accured_stake_amount[delegator] = \
-            self.get_power_history_accured_stake_amount(delegator) + delta_amount
-
-        assert self.delegator_power_history_accured_stake_amount[delegator] >= 0
+        self.delegator_table.add("power_history_accured_stake_amount", delegator, delta_amount)
 
     def update_power_history_accured_stake_amount(self, delegator, amount):
         assert amount >= 0
-        self.delegator_power_history_accured_stake_amount[delegator] = amount
+        self.delegator_table.set("power_history_accured_stake_amount", delegator, amount)
 
     def get_core_history_reward(self, delegator):
-        return self.delegator_core_history_reward.get(delegator, 0)
+        return self.delegator_table.get("core_history_reward", delegator)
 
     def add_core_history_reward(self, delegator, delta_amount):
-        self.delegator_core_history_reward[delegator] = \
-            self.get_core_history_reward(delegator) + delta_amount
-
-        assert self.delegator_core_history_reward[delegator] >= 0
+        self.delegator_table.add("core_history_reward", delegator, delta_amount)
 
     def update_core_history_reward(self, delegator, amount):
         assert amount >= 0
-        self.delegator_core_history_reward[delegator] = amount
+        self.delegator_table.set("core_history_reward", delegator, amount)
 
     def get_core_history_accured_stake_amount(self, delegator):
-        return self.delegator_core_history_accured_stake_amount.get(delegator, 0)
+        return self.delegator_table.get("core_history_accured_stake_amount", delegator)
 
     def add_core_history_accured_stake_amount(self, delegator, delta_amount):
-        self.delegator_core_history_accured_stake_amount[delegator] = \
-            self.get_core_history_accured_stake_amount(delegator) + delta_amount
-
-        assert self.delegator_core_history_accured_stake_amount[delegator] >= 0
+        self.delegator_table.add("core_history_accured_stake_amount", delegator, delta_amount)
 
     def update_core_history_accured_stake_amount(self, delegator, amount):
         assert amount >= 0
-        self.delegator_core_history_accured_stake_amount[delegator] = amount
+        self.delegator_table.set("core_history_accured_stake_amount", delegator, amount)
 
     def get_btc_lst_stake_tx(self, txid):
         return self.btc_lst_stake_txs.get(txid)
@@ -0,0 +1,105 @@
+from .account_mgr import AccountMgr
+
+# invariants of the off-chain model, a model-only run that breaks one is replayed on chain
+
+get_contract_addr = AccountMgr.get_contract_addr
+
+
+def check_validator_count(chain):
+    validator_count = len(chain.get_validators())
+    assert 0 < validator_count <= chain.get_validator_count(), \
+        f"validator count {validator_count}, max {chain.get_validator_count()}"
+
+
+def check_balances(chain):
+    for addr, balance in chain.balances.items():
+        assert balance >= 0, f"balance of {addr} is {balance}"
+
+    for addr, balance in chain.btc_lst_balances.items():
+        assert balance >= 0, f"btc lst balance of {addr} is {balance}"
+
+
+def check_total_unclaimed_reward(chain):
+    assert chain.get_total_unclaimed_reward() >= 0, f"total unclaimed reward {chain.get_total_unclaimed_reward()}"
+
+
+def check_candidates(chain):
+    for candidate in chain.get_candidates().values():
+        if candidate.is_removed():
+            continue
+
+        assert candidate.get_margin_amount() >= 0, f"{candidate}"
+        assert candidate.get_income() >= 0, f"{candidate}"
+        assert candidate.get_stake_state().get_total_score() >= 0, f"{candidate}"
+
+
+def check_core_stake_conservation(chain):
+    # the realtime amount of a candidate is the sum of its delegators', and the core amount of a delegator is the
+    # sum of its realtime amounts in all candidates, a transfer moves the amount without changing either sum
+    asset_name = chain.get_core_asset().get_name()
+    delegator_amounts = {}
+    for candidate in chain.get_candidates().values():
+        stake_state = candidate.get_stake_state()
+        table = stake_state.get_delegator_table(asset_name)
+        total_amount = 0
+        for delegator in table.get_keys():
+            amount = table.get("realtime_amount", delegator)
+            total_amount += amount
+            delegator_amounts[delegator] = delegator_amounts.get(delegator, 0) + amount
+
+        assert stake_state.get_realtime_amount(asset_name) == total_amount, \
+            f"{candidate}: realtime amount {stake_state.get_realtime_amount(asset_name)}, delegators {total_amount}"
+
+    delegator_stake_state = chain.get_delegator_stake_state()
+    for delegator in delegator_stake_state.delegator_table.get_keys():
+        core_amount = delegator_stake_state.get_core_amount(delegator)
+        assert core_amount == delegator_amounts.get(delegator, 0), \
+            f"core amount of {delegator} is {core_amount}, candidates {delegator_amounts.get(delegator, 0)}"
+
+
+def check_btc_lst_stake_conservation(chain):
+    delegator_stake_state = chain.get_delegator_stake_state()
+    total_amount = 0
+    for delegator in delegator_stake_state.delegator_table.get_keys():
+        total_amount += delegator_stake_state.get_btc_lst_realtime_amount(delegator)
+
+    assert delegator_stake_state.get_btc_lst_total_realtime_amount() == total_amount, \
+        f"btc lst total realtime amount {delegator_stake_state.get_btc_lst_total_realtime_amount()}, " \
+        f"delegators {total_amount}"
+
+
+def check_income_conservation(chain):
+    # the block rewards and fees collected by the validators are owed out of the ValidatorSet balance, a slashed
+    # validator's income is shared by the others and the rounding dust stays in the total income
+    validator_income = sum(candidate.get_income() for candidate in chain.get_candidates().values())
+    total_income = chain.get_total_income()
+    assert validator_income <= total_income, f"validator income {validator_income}, total income {total_income}"
+
+    balance = chain.get_balance(get_contract_addr("ValidatorSet"))
+    assert total_income <= balance, f"total income {total_income}, ValidatorSet balance {balance}"
+
+
+def check_reward_conservation(chain):
+    # the income of a validator is split between the assets by score, or burned when it has no score, the split
+    # only loses the rounding down of each asset's share
+    asset_count = len(chain.get_assets())
+    for operator_addr, (income, distributed_reward) in chain.get_distributed_rewards().items():
+        assert 0 <= income - distributed_reward < asset_count, \
+            f"{operator_addr}: income {income}, distributed reward {distributed_reward}"
+
+
+MODEL_INVARIANTS = [
+    check_validator_count,
+    check_balances,
+    check_total_unclaimed_reward,
+    check_candidates,
+    check_core_stake_conservation,
+    check_btc_lst_stake_conservation,
+    check_income_conservation,
+    check_reward_conservation
+]
+
+
+def check_model_invariants(chain):
+    for invariant in MODEL_INVARIANTS:
+        invariant(chain)
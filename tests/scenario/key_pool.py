@@ -0,0 +1,148 @@
+import os
+import json
+import random
+from concurrent.futures import ProcessPoolExecutor
+from ecdsa import SigningKey, SECP256k1
+from eth_hash.auto import keccak
+from eth_utils import to_checksum_address
+
+DEFAULT_POOL_SIZE = 1024
+DEFAULT_CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache")
+
+# bumped whenever the cache file format or the way the keys are drawn changes, an older cache is rewritten
+CACHE_VERSION = 2
+
+# below this many keys the derivation runs in the calling process, starting the workers costs more
+MIN_PARALLEL_KEYS = 256
+CHUNK_SIZE = 128
+
+
+def derive_key(secret):
+    # a single point multiplication gives both the compressed bitcoin pubkey and the ethereum address
+    verifying_key = SigningKey.from_secret_exponent(secret, curve=SECP256k1).get_verifying_key()
+    pubkey = verifying_key.to_string("compressed")
+    addr = to_checksum_address(keccak(verifying_key.to_string())[-20:])
+    return pubkey.hex(), addr
+
+
+def derive_keys(secrets, workers=None):
+    if len(secrets) < MIN_PARALLEL_KEYS:
+        return [derive_key(secret) for secret in secrets]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(derive_key, secrets, chunksize=CHUNK_SIZE))
+
+
+class KeyPool:
+    # secp256k1 keys drawn from a seeded rng and handed out in order, the public halves are derived in bulk
+    # by a process pool and kept in a cache file keyed by the name and the seed, so a rerun of a seed derives a
+    # single key. the secrets are redrawn from the rng on load, they are cheap and never written to disk, the
+    # address of the first secret is derived again and compared with the cache before the cache is used.
+    # the pool grows by another batch once it is used up, the sequence of keys of a seed does not depend on
+    # the batch size. an unseeded pool is neither deterministic nor cached
+    def __init__(self, name, seed=None, size=DEFAULT_POOL_SIZE, cache_dir=DEFAULT_CACHE_DIR, workers=None):
+        self.name = name
+        self.seed = seed
+        self.size = size
+        self.cache_dir = cache_dir
+        self.workers = workers
+
+        self.random = random.Random(None if seed is None else f"{name}:{seed}")
+        self.secrets = []
+        # (pubkey hex, address) of each secret
+        self.public_keys = []
+        self.cursor = 0
+
+        self.__load()
+        self.__grow(size)
+
+    def get_cache_file(self):
+        if self.seed is None or self.cache_dir is None:
+            return None
+
+        return os.path.join(self.cache_dir, f"{self.name}_{self.seed}.json")
+
+    def get_key_count(self):
+        return len(self.secrets)
+
+    def __draw_secrets(self, count):
+        secrets = [self.random.randrange(1, SECP256k1.order) for _ in range(count)]
+        self.secrets.extend(secrets)
+        return secrets
+
+    def __load(self):
+        cache_file = self.get_cache_file()
+        if cache_file is None or not os.path.exists(cache_file):
+            return
+
+        with open(cache_file, 'r') as f:
+            try:
+                cache = json.load(f)
+            except ValueError:
+                return
+
+        if not self.__is_valid_cache(cache):
+            return
+
+        public_keys = [tuple(item) for item in cache["public_keys"]]
+        self.__draw_secrets(len(public_keys))
+        self.public_keys = public_keys
+
+    def __is_valid_cache(self, cache):
+        # a cache of another version, or one written for other secrets, is ignored and written again
+        if not isinstance(cache, dict) or cache.get("version") != CACHE_VERSION:
+            return False
+
+        public_keys = cache.get("public_keys")
+        if not isinstance(public_keys, list) or len(public_keys) == 0:
+            return False
+
+        rng = random.Random()
+        rng.setstate(self.random.getstate())
+        check = derive_key(rng.randrange(1, SECP256k1.order))[1]
+        return cache.get("check") == check and public_keys[0][1] == check
+
+    def __save(self):
+        cache_file = self.get_cache_file()
+        if cache_file is None:
+            return
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        tmp_file = f"{cache_file}.{os.getpid()}.tmp"
+        with open(tmp_file, 'w') as f:
+            json.dump({"version": CACHE_VERSION, "check": self.public_keys[0][1], "public_keys": self.public_keys}, f)
+        os.replace(tmp_file, cache_file)
+
+    def __grow(self, min_count):
+        count = min_count - len(self.secrets)
+        if count <= 0:
+            return
+
+        secrets = self.__draw_secrets(count)
+        self.public_keys.extend(derive_keys(secrets, self.workers))
+        self.__save()
+
+    def get_cursor(self):
+        return self.cursor
+
+    def set_cursor(self, cursor):
+        # the keys past the cursor are the same whenever they are drawn, restoring the cursor rewinds the pool
+        assert cursor <= len(self.secrets), f"Invalid cursor {cursor}, {len(self.secrets)} keys"
+        self.cursor = cursor
+
+    def next_index(self):
+        if self.cursor == len(self.secrets):
+            self.__grow(len(self.secrets) + self.size)
+
+        index = self.cursor
+        self.cursor += 1
+        return index
+
+    def next_key(self):
+        # (secret bytes, compressed pubkey bytes)
+        index = self.next_index()
+        return self.secrets[index].to_bytes(32, 'big'), bytes.fromhex(self.public_keys[index][0])
+
+    def next_address(self):
+        index = self.next_index()
+        return self.public_keys[index][1]
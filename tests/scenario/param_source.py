@@ -0,0 +1,186 @@
+import json
+from brownie import *
+
+# contract name => container name, the names are the keys of AccountMgr's contract table
+CONTRACT_CONTAINERS = {
+    "ValidatorSet": "ValidatorSetMock",
+    "CandidateHub": "CandidateHubMock",
+    "StakeHub": "StakeHubMock",
+    "CoreAgent": "CoreAgentMock",
+    "HashPowerAgent": "HashPowerAgentMock",
+    "BitcoinAgent": "BitcoinAgentMock",
+    "BitcoinStake": "BitcoinStakeMock",
+    "BitcoinLSTStake": "BitcoinLSTStakeMock",
+    "GovHub": "GovHubMock",
+    "RelayerHub": "RelayerHubMock",
+    "SlashIndicator": "SlashIndicatorMock",
+    "Burn": "Burn",
+    "Foundation": "Foundation",
+    "SystemReward": "SystemRewardMock"
+}
+
+ASSET_COUNT = 3
+
+
+def to_json_value(value):
+    # brownie return values are tuples of str and int subclasses
+    if isinstance(value, (list, tuple)):
+        return [to_json_value(item) for item in value]
+
+    if isinstance(value, bool):
+        return value
+
+    if isinstance(value, int):
+        return int(value)
+
+    if isinstance(value, str):
+        return str(value)
+
+    return value
+
+
+def read_validators():
+    validators = []
+    for i in range(len(ValidatorSetMock[0].getValidatorOps())):
+        validators.append(ValidatorSetMock[0].currentValidatorSet(i))
+
+    return validators
+
+
+def read_asset_states():
+    asset_states = []
+    for i in range(ASSET_COUNT):
+        asset = StakeHubMock[0].assets(i)
+        asset_states.append(asset + StakeHubMock[0].stateMap(asset[1]))
+
+    return asset_states
+
+
+# name => reader of the parameters the off-chain model is initialized with
+PARAM_READERS = {
+    "required_margin": lambda: CandidateHubMock[0].requiredMargin(),
+    "dues": lambda: CandidateHubMock[0].dues(),
+    "validator_count": lambda: CandidateHubMock[0].validatorCount(),
+    "candidates": lambda: CandidateHubMock[0].getCandidates(),
+    "validators": read_validators,
+    "block_reward": lambda: ValidatorSetMock[0].blockReward(),
+    "subsidy_reduce_interval": lambda: ValidatorSetMock[0].SUBSIDY_REDUCE_INTERVAL(),
+    "reduce_factor": lambda: ValidatorSetMock[0].REDUCE_FACTOR(),
+    "incentive_percent": lambda: ValidatorSetMock[0].blockRewardIncentivePercent(),
+    "incentive_balance_cap": lambda: SystemRewardMock[0].incentiveBalanceCap(),
+    "is_burn": lambda: SystemRewardMock[0].isBurn(),
+    "burn_cap": lambda: Burn[0].burnCap(),
+    "felony_threshold": lambda: SlashIndicatorMock[0].felonyThreshold(),
+    "misdemeanor_threshold": lambda: SlashIndicatorMock[0].misdemeanorThreshold(),
+    "felony_deposit": lambda: SlashIndicatorMock[0].felonyDeposit(),
+    "felony_round": lambda: SlashIndicatorMock[0].felonyRound(),
+    "reward_for_report_double_sign": lambda: SlashIndicatorMock[0].rewardForReportDoubleSign(),
+    "asset_states": read_asset_states,
+    "btc_asset_weight": lambda: BitcoinAgentMock[0].assetWeight(),
+    "core_stake_grade_flag": lambda: BitcoinAgentMock[0].gradeActive(),
+    "core_stake_grades": lambda: BitcoinAgentMock[0].getGrades(),
+    "btc_stake_grade_flag": lambda: BitcoinStakeMock[0].gradeActive(),
+    "btc_stake_grades": lambda: BitcoinStakeMock[0].getGrades(),
+    "btc_lst_stake_grade_percent": lambda: BitcoinAgentMock[0].lstGradePercentage(),
+    "utxo_fee": lambda: BitcoinLSTStakeMock[0].utxoFee(),
+    "block_number": lambda: chain.height
+}
+
+
+class OnChainParamSource:
+    # reads the parameters from the deployed contracts, the default of ChainState
+    def is_model_only(self):
+        return False
+
+    def get(self, name):
+        return PARAM_READERS[name]()
+
+    def get_accounts(self):
+        return [account.address for account in accounts]
+
+    def get_contracts(self):
+        contracts = {}
+        for name, container_name in CONTRACT_CONTAINERS.items():
+            contracts[name] = project.get_loaded_projects()[0][container_name][0].address
+
+        return contracts
+
+    def get_balance(self, addr):
+        if isinstance(addr, str):
+            addr = accounts.at(addr, force=True)
+
+        return addr.balance()
+
+    def get_btc_lst_balance(self, addr):
+        return BitcoinLSTToken[0].balanceOf(addr)
+
+    def capture(self):
+        # the parameters, addresses and initial balances of a freshly deployed chain, the input of a model-only run
+        params = {}
+        for name in PARAM_READERS.keys():
+            params[name] = to_json_value(self.get(name))
+
+        account_list = self.get_accounts()
+        contracts = self.get_contracts()
+
+        balances = {}
+        for addr in account_list + list(contracts.values()):
+            balances[addr] = self.get_balance(addr)
+
+        return {
+            "params": params,
+            "accounts": account_list,
+            "contracts": contracts,
+            "balances": balances,
+            "btc_lst_balances": {}
+        }
+
+
+class StaticParamSource:
+    # serves captured parameters, the off-chain model runs without a node
+    def __init__(self, data):
+        self.params = data["params"]
+        self.accounts = data["accounts"]
+        self.contracts = data["contracts"]
+        self.balances = data["balances"]
+        self.btc_lst_balances = data["btc_lst_balances"]
+
+    @classmethod
+    def load(cls, json_file):
+        with open(json_file, 'r') as f:
+            return cls(json.load(f))
+
+    @classmethod
+    def capture_from_chain(cls):
+        return cls(OnChainParamSource().capture())
+
+    def dump(self, json_file):
+        data = {
+            "params": self.params,
+            "accounts": self.accounts,
+            "contracts": self.contracts,
+            "balances": self.balances,
+            "btc_lst_balances": self.btc_lst_balances
+        }
+
+        with open(json_file, 'w') as f:
+            json.dump(data, f, indent=4)
+
+    def is_model_only(self):
+        return True
+
+    def get(self, name):
+        assert name in self.params, f"Missing parameter {name}"
+        return self.params[name]
+
+    def get_accounts(self):
+        return self.accounts
+
+    def get_contracts(self):
+        return self.contracts
+
+    def get_balance(self, addr):
+        return self.balances.get(str(addr), 0)
+
+    def get_btc_lst_balance(self, addr):
+        return self.btc_lst_balances.get(str(addr), 0)
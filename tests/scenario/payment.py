@@ -13,6 +13,7 @@ from ecdsa import SigningKey, SECP256k1
 from . import payment
 from eth_hash.auto import keccak
 from ..delegate import get_btc_lst_transaction_op_return_data, get_transaction_op_return_data
+from ..btc_merkle import get_merkle_root
 
 
 class WalletStatus(Enum):
@@ -21,6 +22,8 @@ class WalletStatus(Enum):
 
 
 class BtcLSTLockWallet:
+    __slots__ = ("payment", "script_pubkey", "key", "hash", "payment_type", "status")
+
     def __init__(self):
         self.payment = None
         self.script_pubkey = None
@@ -96,6 +99,49 @@ class PaymentType(Enum):
 
 
 class Payment(ABC):
+    # the keys and lock scripts are drawn from os.urandom and the random module unless a seeded source is set
+    __random = None
+
+    # the key pairs are handed out from it once set, instead of being derived one payment at a time
+    __key_pool = None
+
+    @classmethod
+    def set_random(cls, rng):
+        Payment.__random = rng
+
+    @classmethod
+    def set_key_pool(cls, key_pool):
+        Payment.__key_pool = key_pool
+
+    @classmethod
+    def get_random_state(cls):
+        # the state of the seeded sources, saved by ChainSnapshot
+        random_state = None if Payment.__random is None else Payment.__random.getstate()
+        cursor = None if Payment.__key_pool is None else Payment.__key_pool.get_cursor()
+        return random_state, cursor
+
+    @classmethod
+    def set_random_state(cls, state):
+        random_state, cursor = state
+        if random_state is not None:
+            Payment.__random.setstate(random_state)
+        if cursor is not None:
+            Payment.__key_pool.set_cursor(cursor)
+
+    @classmethod
+    def get_random(cls):
+        if Payment.__random is None:
+            return random
+
+        return Payment.__random
+
+    @classmethod
+    def create_random_secret(cls):
+        if Payment.__random is None:
+            return os.urandom(32)
+
+        return Payment.__random.randrange(1, SECP256k1.order).to_bytes(32, 'big')
+
     def __init__(self):
         self.private_key, self.public_key = self.create_random_key_pair()
 
@@ -120,8 +166,20 @@ class Payment(ABC):
     def get_amount(self):
         return self.amount
 
+    @classmethod
+    def next_pooled_key_pair(cls):
+        if Payment.__key_pool is None:
+            return None
+
+        return Payment.__key_pool.next_key()
+
     def create_random_key_pair(self):
-        private_key = os.urandom(32)  # bytes
+        key_pair = self.next_pooled_key_pair()
+        if key_pair is not None:
+            private_key, public_key = key_pair
+            return private_key, CPubKey(public_key)
+
+        private_key = self.create_random_secret()  # bytes
         secret = CBitcoinSecret.from_secret_bytes(private_key)
         public_key = CPubKey(secret.pub)  # bytes
         return private_key, public_key
@@ -275,7 +333,12 @@ class P2TR(Payment):
         return self.taproot_pubkey  # 32bytes
 
     def create_random_key_pair(self):
-        private_key = SigningKey.generate(curve=SECP256k1)
+        key_pair = self.next_pooled_key_pair()
+        if key_pair is not None:
+            # the private key of a pooled pair stays the secret bytes, it is never used to sign
+            return key_pair
+
+        private_key = SigningKey.from_string(self.create_random_secret(), curve=SECP256k1)
         public_key = private_key.get_verifying_key().to_string("compressed")
 
         return private_key, public_key
@@ -313,12 +376,12 @@ class P2TR_SCRIPT(P2TR):
         merkle_nodes = []
 
         # build 4 ~ 8 lock scripts
-        count = random.randint(4, 8)
+        count = self.get_random().randint(4, 8)
         for i in range(count):
-            lock_script_type = random.choice(avaliable_lock_script_list)
+            lock_script_type = self.get_random().choice(avaliable_lock_script_list)
             redeem_script_type = None
             if avaliable_redeem_script_map.get(lock_script_type) is not None:
-                redeem_script_type = random.choice(avaliable_redeem_script_map[lock_script_type])
+                redeem_script_type = self.get_random().choice(avaliable_redeem_script_map[lock_script_type])
 
             PaymentClass = getattr(payment, lock_script_type)
 
@@ -342,26 +405,17 @@ class P2TR_SCRIPT(P2TR):
         return merkle_nodes
 
     def __build_node_hash(self, script_pubkey, version="c0"):
-        return hashlib.sha256(bytes.fromhex(version) + script_pubkey)
+        return hashlib.sha256(bytes.fromhex(version) + script_pubkey).digest()
 
     def __build_merkle_root(self):
         merkle_nodes = self.__random_build_merkle_node()
         assert merkle_nodes is not None, f"Script list is None"
 
-        node_count = len(merkle_nodes)
-        nodes = merkle_nodes
-
-        while node_count > 1:
-            for i in range(0, node_count, 2):
-                left = nodes[i]
-                right = nodes[i + 1] if i + 1 < node_count else left
-
-                # reuse nodes
-                # (i,i+1) -> i/2
-                nodes[i // 2] = hashlib.sha256(hashlib.sha256(left.digest() + right.digest()).digest())
-            node_count //= 2
-
-        return nodes[0].digest()
+        # the roots of 3, 5, 6 and 7 scripts changed when the loop this used was replaced by btc_merkle, the loop
+        # dropped the last node of an odd level. the scenario files hold the payment type only and the address is
+        # built on every run, an expected P2TR_SCRIPT address saved elsewhere has to be regenerated.
+        # test_script_tree_root pins the roots
+        return get_merkle_root(merkle_nodes)
 
     def __build_taproot_tweak(self, tag, public_key, merkle_root):
         assert len(public_key) == 33 and len(merkle_root) == 32, \
@@ -422,8 +476,8 @@ class CLTV_P2MS(CLTV_SCRIPT):
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
 
-        m = kwargs.get("m", random.randint(2, 3))
-        n = kwargs.get("n", random.randint(m + 1, m * 2 - 1))
+        m = kwargs.get("m", self.get_random().randint(2, 3))
+        n = kwargs.get("n", self.get_random().randint(m + 1, m * 2 - 1))
 
         private_keys = []
         public_keys = []
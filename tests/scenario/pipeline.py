@@ -0,0 +1,76 @@
+from .verifier import Verifier, PER_ROUND
+
+
+class TaskPipeline:
+    # collects consecutive pipelined tasks of a round whose access keys do not conflict and executes them together:
+    #   1. on_task_ready of every task, before any transaction is sent
+    #   2. every transaction is sent with required_confs=0
+    #   3. the receipts are awaited in bulk
+    #   4. complete and on_task_finish of every task in the original order
+    # the node mines the transactions in the order they are sent, and the off-chain model is updated in the same
+    # order, so state shared by all tasks (contract balances, candidate amounts) stays in step. the checks of the
+    # tasks are queued and run once the whole group is finished, since the chain is already ahead of the model
+    # while on_task_finish is applied task by task.
+    def __init__(self, chain, verifier):
+        self.chain = chain
+        self.verifier = verifier
+
+        self.tasks = []
+        self.read_keys = set()
+        self.write_keys = set()
+
+    def get_task_count(self):
+        return len(self.tasks)
+
+    def is_independent(self, task):
+        read_keys, write_keys = task.get_access_keys()
+        if not write_keys.isdisjoint(self.read_keys) or not write_keys.isdisjoint(self.write_keys):
+            return False
+
+        return read_keys.isdisjoint(self.write_keys)
+
+    def add(self, task):
+        assert self.is_independent(task), f"{task.__class__.__name__} conflicts with the pipelined tasks"
+
+        read_keys, write_keys = task.get_access_keys()
+        self.read_keys |= read_keys
+        self.write_keys |= write_keys
+        self.tasks.append(task)
+
+    def execute(self):
+        tasks = self.tasks
+        self.tasks = []
+        self.read_keys = set()
+        self.write_keys = set()
+
+        if len(tasks) == 0:
+            return
+
+        if len(tasks) == 1:
+            tasks[0].execute()
+            tasks[0].post_execute()
+            return
+
+        # a deferred verify policy already queues the checks, otherwise they are queued for this group
+        group_verifier = self.verifier if self.verifier.is_deferred() else Verifier(PER_ROUND)
+        for task in tasks:
+            task.set_verifier(group_verifier)
+
+        for task in tasks:
+            print(f"\r\nRound {task.round}: Pipeline task {task.__class__.__name__} ({task.params})")
+            task.notify_task_ready()
+
+        tx_receipts = [task.submit(required_confs=0) for task in tasks]
+        for tx_receipt in tx_receipts:
+            tx_receipt.wait(1)
+
+        for task, tx_receipt in zip(tasks, tx_receipts):
+            assert tx_receipt.status == 1, \
+                f"{task.__class__.__name__} ({task.params}) reverted: {tx_receipt.revert_msg}"
+
+            task.complete(tx_receipt)
+            task.notify_task_finish()
+            task.post_execute()
+
+        if group_verifier is not self.verifier:
+            group_verifier.run_queued_checks(self.chain)
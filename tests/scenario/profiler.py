@@ -0,0 +1,334 @@
+import argparse
+import csv
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+MIDDLEWARE_NAME = "scenario_profiler"
+SEND_METHODS = ["eth_sendTransaction", "eth_sendRawTransaction"]
+
+TASK_FIELDS = [
+    "task", "count", "tx_count", "gas_used", "wall_time", "rpc_time", "rpc_count",
+    "checker_eth_calls", "checker_rpc_time"
+]
+METHOD_FIELDS = [
+    "method", "tx_count", "reverted", "gas_used", "gas_avg", "gas_min", "gas_max", "latency", "latency_avg"
+]
+
+# the profiler of the running scenario, the checkers report to it without holding a reference
+active_profiler = None
+
+
+def get_active_profiler():
+    return active_profiler
+
+
+@contextmanager
+def checking():
+    # on-chain reads of the checker are counted apart from the reads made while sending transactions
+    if active_profiler is None:
+        yield
+        return
+
+    with active_profiler.checking():
+        yield
+
+
+def get_method_name(tx_receipt):
+    if tx_receipt.contract_name is None:
+        return "transfer"
+
+    return f"{tx_receipt.contract_name}.{tx_receipt.fn_name}"
+
+
+class TaskProfile:
+    def __init__(self, task_name):
+        self.task_name = task_name
+        self.count = 0
+        self.tx_count = 0
+        self.gas_used = 0
+        self.wall_time = 0.0
+        self.rpc_time = 0.0
+        self.rpc_count = 0
+        self.checker_eth_calls = 0
+        self.checker_rpc_time = 0.0
+
+    def to_dict(self):
+        return {
+            "task": self.task_name,
+            "count": self.count,
+            "tx_count": self.tx_count,
+            "gas_used": self.gas_used,
+            "wall_time": self.wall_time,
+            "rpc_time": self.rpc_time,
+            "rpc_count": self.rpc_count,
+            "checker_eth_calls": self.checker_eth_calls,
+            "checker_rpc_time": self.checker_rpc_time
+        }
+
+
+class MethodProfile:
+    def __init__(self, method):
+        self.method = method
+        self.tx_count = 0
+        self.reverted = 0
+        self.gas_used = 0
+        self.gas_min = None
+        self.gas_max = None
+        self.latency = 0.0
+
+    def add_tx(self, gas_used, latency, reverted):
+        self.tx_count += 1
+        self.reverted += 1 if reverted else 0
+        self.gas_used += gas_used
+        self.gas_min = gas_used if self.gas_min is None else min(self.gas_min, gas_used)
+        self.gas_max = gas_used if self.gas_max is None else max(self.gas_max, gas_used)
+        self.latency += latency
+
+    def to_dict(self):
+        return {
+            "method": self.method,
+            "tx_count": self.tx_count,
+            "reverted": self.reverted,
+            "gas_used": self.gas_used,
+            "gas_avg": self.gas_used // self.tx_count,
+            "gas_min": self.gas_min,
+            "gas_max": self.gas_max,
+            "latency": self.latency,
+            "latency_avg": self.latency / self.tx_count
+        }
+
+
+class Profiler:
+    # the RPC requests are timed by a web3 middleware, the gas comes from the receipts in brownie's history.
+    # the latency of a transaction is the RPC time spent from the end of the previous transaction of the task
+    # (gas estimation, nonce) up to its receipt.
+    def __init__(self, meta=None):
+        self.meta = meta if meta is not None else {}
+
+        self.task_profiles = {}
+        self.method_profiles = {}
+
+        self.current_task = None
+        self.checking_depth = 0
+        self.pending_latency = 0.0
+        self.tx_latencies = {}
+
+        self.lock = threading.Lock()
+        self.installed = False
+
+    def get_task_profiles(self):
+        return self.task_profiles
+
+    def get_method_profiles(self):
+        return self.method_profiles
+
+    def install(self):
+        global active_profiler
+        from brownie import web3
+
+        assert active_profiler is None, f"Another profiler is active"
+        active_profiler = self
+
+        # innermost layer, so that only the requests that reach the node are counted
+        web3.middleware_onion.inject(self.make_middleware, name=MIDDLEWARE_NAME, layer=0)
+        self.installed = True
+
+    def uninstall(self):
+        global active_profiler
+        from brownie import web3
+
+        if not self.installed:
+            return
+
+        web3.middleware_onion.remove(MIDDLEWARE_NAME)
+        self.installed = False
+        active_profiler = None
+
+    def make_middleware(self, make_request, w3):
+        def middleware(method, params):
+            start_time = time.perf_counter()
+            response = make_request(method, params)
+            elapsed = time.perf_counter() - start_time
+
+            with self.lock:
+                self.on_request(method, params, response, elapsed)
+
+            return response
+
+        return middleware
+
+    def get_task_profile(self, task_name):
+        task_profile = self.task_profiles.get(task_name)
+        if task_profile is None:
+            task_profile = TaskProfile(task_name)
+            self.task_profiles[task_name] = task_profile
+
+        return task_profile
+
+    def on_request(self, method, params, response, elapsed):
+        task_profile = self.get_task_profile(self.current_task if self.current_task is not None else "-")
+
+        if self.checking_depth > 0:
+            task_profile.checker_rpc_time += elapsed
+            if method == "eth_call":
+                task_profile.checker_eth_calls += 1
+            return
+
+        task_profile.rpc_time += elapsed
+        task_profile.rpc_count += 1
+
+        if method in SEND_METHODS and isinstance(response, dict) and response.get("result") is not None:
+            txid = response["result"]
+            self.tx_latencies[txid] = self.pending_latency + elapsed
+            self.pending_latency = 0.0
+            return
+
+        # receipt polling and traces of a sent transaction
+        if isinstance(params, (list, tuple)) and len(params) > 0 and params[0] in self.tx_latencies:
+            self.tx_latencies[params[0]] += elapsed
+            return
+
+        self.pending_latency += elapsed
+
+    @contextmanager
+    def checking(self):
+        self.checking_depth += 1
+        try:
+            yield
+        finally:
+            self.checking_depth -= 1
+
+    @contextmanager
+    def task(self, task_name):
+        from brownie import history
+
+        task_profile = self.get_task_profile(task_name)
+        task_profile.count += 1
+
+        self.current_task = task_name
+        self.pending_latency = 0.0
+        history_length = len(history)
+        start_time = time.perf_counter()
+        try:
+            yield
+        finally:
+            task_profile.wall_time += time.perf_counter() - start_time
+            self.collect_receipts(task_profile, history[history_length:])
+            self.current_task = None
+
+    def collect_receipts(self, task_profile, tx_receipts):
+        for tx_receipt in tx_receipts:
+            method = get_method_name(tx_receipt)
+            method_profile = self.method_profiles.get(method)
+            if method_profile is None:
+                method_profile = MethodProfile(method)
+                self.method_profiles[method] = method_profile
+
+            gas_used = tx_receipt.gas_used if tx_receipt.gas_used is not None else 0
+            latency = self.tx_latencies.pop(tx_receipt.txid, 0.0)
+            method_profile.add_tx(gas_used, latency, tx_receipt.status == 0)
+
+            task_profile.tx_count += 1
+            task_profile.gas_used += gas_used
+
+        self.tx_latencies.clear()
+
+    ############# report ###################
+
+    def get_task_rows(self):
+        rows = [task_profile.to_dict() for task_profile in self.task_profiles.values()]
+        return sorted(rows, key=lambda row: row["wall_time"], reverse=True)
+
+    def get_method_rows(self):
+        rows = [method_profile.to_dict() for method_profile in self.method_profiles.values()]
+        return sorted(rows, key=lambda row: row["gas_used"], reverse=True)
+
+    def to_dict(self):
+        return {
+            "meta": self.meta,
+            "tasks": self.get_task_rows(),
+            "methods": self.get_method_rows()
+        }
+
+    def dump(self, file_prefix):
+        # <prefix>.json with everything, <prefix>_tasks.csv and <prefix>_methods.csv
+        with open(f"{file_prefix}.json", 'w') as f:
+            json.dump(self.to_dict(), f, indent=4)
+
+        write_csv(f"{file_prefix}_tasks.csv", TASK_FIELDS, self.get_task_rows(), self.meta)
+        write_csv(f"{file_prefix}_methods.csv", METHOD_FIELDS, self.get_method_rows(), self.meta)
+
+    def print_summary(self):
+        print_summary(self.to_dict())
+
+
+def write_csv(file_path, fields, rows, meta):
+    meta_fields = list(meta.keys())
+    with open(file_path, 'w', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=meta_fields + fields)
+        writer.writeheader()
+        for row in rows:
+            writer.writerow({**meta, **row})
+
+
+def print_summary(report):
+    meta = ", ".join(f"{key}={value}" for key, value in report["meta"].items())
+    print(f"\r\nProfile {meta}")
+
+    print(f"{'task':<24} {'count':>6} {'txs':>6} {'gas':>14} {'wall(s)':>9} {'rpc(s)':>9} "
+          f"{'chk calls':>10} {'chk(s)':>9}")
+    for row in report["tasks"]:
+        print(f"{row['task']:<24} {row['count']:>6} {row['tx_count']:>6} {row['gas_used']:>14} "
+              f"{row['wall_time']:>9.3f} {row['rpc_time']:>9.3f} {row['checker_eth_calls']:>10} "
+              f"{row['checker_rpc_time']:>9.3f}")
+
+    print(f"{'method':<40} {'txs':>6} {'gas':>14} {'gas avg':>10} {'gas max':>10} {'latency(s)':>11}")
+    for row in report["methods"]:
+        print(f"{row['method']:<40} {row['tx_count']:>6} {row['gas_used']:>14} {row['gas_avg']:>10} "
+              f"{row['gas_max']:>10} {row['latency']:>11.3f}")
+
+
+def print_comparison(reports, key):
+    # average gas and latency of every method across runs, e.g. key=delegators to see how they grow
+    reports = sorted(reports, key=lambda report: report["meta"].get(key, 0))
+    columns = [report["meta"].get(key) for report in reports]
+
+    methods = {}
+    for i, report in enumerate(reports):
+        for row in report["methods"]:
+            methods.setdefault(row["method"], [None] * len(reports))[i] = row
+
+    print(f"{'method':<40} " + " ".join(f"{f'{key}={column}':>24}" for column in columns))
+    for method, rows in sorted(methods.items()):
+        cells = []
+        for row in rows:
+            if row is None:
+                cells.append(f"{'-':>24}")
+            else:
+                cells.append(f"{row['gas_avg']:>12} {row['latency_avg'] * 1000:>9.2f}ms")
+        print(f"{method:<40} " + " ".join(cells))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Print the scenario profiler reports")
+    parser.add_argument("reports", nargs="+", help="json reports written by Profiler.dump")
+    parser.add_argument("--compare", default=None, help="meta key to compare the runs by, e.g. delegators")
+    args = parser.parse_args()
+
+    reports = []
+    for file_path in args.reports:
+        with open(file_path, 'r') as f:
+            reports.append(json.load(f))
+
+    if args.compare is not None:
+        print_comparison(reports, args.compare)
+        return
+
+    for report in reports:
+        print_summary(report)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,62 +1,268 @@
 import json
 import os
+from contextlib import nullcontext
 from .. import common
 from . import task as task_module
 from . import chain_state
 from . import constants
+from .chain_snapshot import ChainSnapshot
+from .pipeline import TaskPipeline
+from .verifier import Verifier, EVERY_TASK, MODEL_ONLY
+
+# line-delimited scenario files: a header line with init_round, then one line per round
+JSONL_EXTENSION = ".jsonl"
+
+
+def is_jsonl_file(file_path):
+    return file_path.endswith(JSONL_EXTENSION)
 
 
 class Scenario:
     def __init__(self):
         self.init_round = 0
         self.round_tasks = {}
+        # a function returning an iterator of (advanced round, tasks), used instead of round_tasks when it is set
+        self.round_task_source = None
+        # the seed of a generated scenario
+        self.seed = None
         self.chain = None
 
+        # take a snapshot every snapshot_interval advanced rounds, 0 means no snapshot. the snapshots are kept in
+        # memory and only taken on rounds with tasks, see ChainSnapshot
+        self.snapshot_interval = 0
+        # (advanced round => ChainSnapshot)
+        self.snapshots = {}
+
+        self.verifier = None
+        # records gas and RPC latency of the tasks when it is set
+        self.profiler = None
+        # send the independent tasks of a round together, see pipeline.py
+        self.pipelined = False
+        # the chain parameters of a model-only run, the tasks only update the off-chain model when it is set
+        self.param_source = None
+        # packs the staked BTC transactions into relayed blocks, the stake tasks then send real SPV proofs
+        self.spv_relay = None
+
     def load(self, json_file):
-        ok, init_round, round_tasks = self.__load(json_file)
+        if is_jsonl_file(json_file):
+            self.__load_jsonl(json_file)
+            return
+
+        ok, init_round, round_tasks, seed = self.__load(json_file)
         assert ok, f"Load json file error"
 
         self.init_round = init_round
         self.round_tasks = round_tasks
+        self.round_task_source = None
+        self.seed = seed
 
     def dump(self, write_file):
         assert self.init_round >= constants.MIN_ROUND
-        assert self.round_tasks is not None and len(self.round_tasks) > 0
+
+        if is_jsonl_file(write_file):
+            self.__dump_jsonl(write_file)
+            return
+
+        round_tasks = {}
+        for advanced_round, tasks in self.iter_round_tasks():
+            round_tasks[advanced_round] = tasks
+        assert len(round_tasks) > 0
 
         json_data = {
             "init_round": self.init_round,
-            "round_tasks": self.round_tasks
+            "round_tasks": round_tasks
         }
+        if self.seed is not None:
+            json_data["seed"] = self.seed
+
         with open(write_file, 'w') as json_file:
             json.dump(json_data, json_file, indent=4)
 
+    def __dump_jsonl(self, write_file):
+        header = {"init_round": self.init_round}
+        if self.seed is not None:
+            header["seed"] = self.seed
+
+        round_count = 0
+        with open(write_file, 'w') as jsonl_file:
+            jsonl_file.write(json.dumps(header) + "\n")
+
+            # rounds are written as they are produced, a lazily generated scenario is never materialized
+            for advanced_round, tasks in self.iter_round_tasks():
+                jsonl_file.write(json.dumps({"round": int(advanced_round), "tasks": tasks}) + "\n")
+                round_count += 1
+
+        assert round_count > 0
+
+    def __load_jsonl(self, jsonl_file):
+        assert os.path.isfile(jsonl_file), f"Error: File {jsonl_file} not found."
+
+        # only the header is read here, the rounds are streamed from the file when the scenario is executed
+        with open(jsonl_file, 'r') as file:
+            header = json.loads(file.readline())
+
+        self.init_round = header['init_round']
+        self.seed = header.get('seed')
+        self.set_round_task_source(lambda: self.__stream_jsonl(jsonl_file))
+
+    def __stream_jsonl(self, jsonl_file):
+        with open(jsonl_file, 'r') as file:
+            file.readline()
+
+            for line_number, line in enumerate(file, 2):
+                if len(line.strip()) == 0:
+                    continue
+
+                try:
+                    data = json.loads(line)
+                except json.JSONDecodeError as e:
+                    assert False, f"Error: Failed to decode line {line_number} in {jsonl_file}, {e}"
+
+                yield data['round'], data['tasks']
+
     def set_init_round(self, init_round):
         self.init_round = init_round
 
     def set_round_tasks(self, round_tasks):
         self.round_tasks = round_tasks
+        self.round_task_source = None
+
+    def set_round_task_source(self, round_task_source):
+        self.round_task_source = round_task_source
+        self.round_tasks = None
+
+    def set_seed(self, seed):
+        self.seed = seed
+
+    def get_seed(self):
+        return self.seed
+
+    def iter_round_tasks(self):
+        if self.round_task_source is not None:
+            return self.round_task_source()
 
-    def get_task_count(self):
         assert self.round_tasks is not None
+        return iter(self.round_tasks.items())
 
+    def get_task_count(self):
         count = 0
-        for tasks in self.round_tasks.values():
+        for advanced_round, tasks in self.iter_round_tasks():
             count += len(tasks)
 
         return count
 
-    def execute(self):
+    def set_snapshot_interval(self, snapshot_interval):
+        assert snapshot_interval >= 0
+        self.snapshot_interval = snapshot_interval
+
+    def get_snapshots(self):
+        return self.snapshots
+
+    def get_verifier(self):
+        return self.verifier
+
+    def set_pipelined(self, pipelined):
+        self.pipelined = pipelined
+
+    def set_param_source(self, param_source):
+        self.param_source = param_source
+
+    def is_model_only(self):
+        return self.param_source is not None and self.param_source.is_model_only()
+
+    def set_spv_relay(self, spv_relay):
+        self.spv_relay = spv_relay
+
+    def set_profiler(self, profiler):
+        self.profiler = profiler
+
+    def get_profiler(self):
+        return self.profiler
+
+    def execute(self, verify_policy=EVERY_TASK):
+        # verify_policy: every-task, per-round, sampled(p) or final-only
         init_round = self.init_round
-        round_tasks = self.round_tasks
 
         assert init_round >= constants.MIN_ROUND, f"Initial round is too small (init_round >= {constants.MIN_ROUND})"
+
+        if self.is_model_only():
+            self.__execute_model_only()
+            return
+
         if init_round != common.get_current_round():
             common.set_round_tag(init_round)
 
+        if self.spv_relay is not None:
+            self.spv_relay.start()
+
         self.chain = chain_state.ChainState(init_round)
-        last_advanced_round = 0
+        self.chain.set_spv_relay(self.spv_relay)
+        self.snapshots = {}
+        # the sampled checks are drawn from the seed of the scenario
+        self.verifier = Verifier(verify_policy, self.seed)
+        self.__execute_with_profiler(0, 0)
+
+    def __execute_model_only(self):
+        # no transaction is sent, the checks against the chain are replaced by the model invariants.
+        # snapshots, profiling and pipelining need a node and are skipped
+        assert self.profiler is None, f"A model-only run can not be profiled"
+
+        self.chain = chain_state.ChainState(self.init_round, self.param_source)
+        self.snapshots = {}
+        self.verifier = Verifier(MODEL_ONLY)
+        self.__execute_round_tasks(0, 0)
+        self.verifier.on_scenario_finish(self.chain)
+
+    def resume(self, advanced_round=None):
+        # restore the latest snapshot taken at or before advanced_round and replay the remaining rounds
+        snapshot_rounds = [
+            snapshot_round for snapshot_round in self.snapshots.keys()
+            if advanced_round is None or snapshot_round <= advanced_round
+        ]
+        assert len(snapshot_rounds) > 0, f"No snapshot to resume from (advanced_round={advanced_round})"
+
+        snapshot = self.snapshots[max(snapshot_rounds)]
+        print(f"Resume scenario from {snapshot}")
+
+        self.chain = snapshot.restore()
+        # the checks queued by the full run belong to the rounds replayed now, the sampling starts over from the seed
+        self.verifier = Verifier(self.verifier.get_policy(), self.seed)
+        # the SpvRelay is restored with the ChainState
+        self.spv_relay = self.chain.get_spv_relay()
+        assert self.chain.get_round() == common.get_current_round(), f"Invalid round {self.chain.get_round()}"
+
+        # the snapshots taken after the restored one no longer match the node state
+        for snapshot_round in list(self.snapshots.keys()):
+            if snapshot_round > snapshot.get_advanced_round():
+                self.snapshots.pop(snapshot_round)
+
+        self.__execute_with_profiler(snapshot.get_advanced_round(), snapshot.get_advanced_round() + 1)
+
+    def __execute_with_profiler(self, last_advanced_round, from_advanced_round):
+        if self.profiler is not None:
+            self.profiler.install()
+
+        try:
+            self.__execute_round_tasks(last_advanced_round, from_advanced_round)
+            with self.__profile("Verifier"):
+                self.verifier.on_scenario_finish(self.chain)
+        finally:
+            if self.profiler is not None:
+                self.profiler.uninstall()
+
+    def __profile(self, task_name):
+        if self.profiler is None:
+            return nullcontext()
+
+        return self.profiler.task(task_name)
+
+    def __execute_round_tasks(self, last_advanced_round, from_advanced_round):
+        init_round = self.init_round
+
+        for advanced_round, tasks in self.iter_round_tasks():
+            if int(advanced_round) < from_advanced_round:
+                continue
 
-        for advanced_round, tasks in round_tasks.items():
             round = init_round + int(advanced_round)
 
             turn_round_count = int(advanced_round) - last_advanced_round
@@ -68,22 +274,43 @@ class Scenario:
                     [turn_round_count]
                 )
 
-            assert round == common.get_current_round(), f"Invalid round {round}"
+            assert round == self.__get_current_round(), f"Invalid round {round}"
 
-            for task in tasks:
-                ##task[0] is task name
-                ##task[1:] is execute params
-                assert len(task) > 0
-                self.__execute_task(
-                    int(advanced_round),
-                    round,
-                    task[0],
-                    task[1:] if len(task) > 1 else []
-                )
+            if self.pipelined and not self.chain.is_model_only():
+                self.__execute_pipelined_tasks(int(advanced_round), round, tasks)
+            else:
+                for task in tasks:
+                    ##task[0] is task name
+                    ##task[1:] is execute params
+                    assert len(task) > 0
+                    self.__execute_task(
+                        int(advanced_round),
+                        round,
+                        task[0],
+                        task[1:] if len(task) > 1 else []
+                    )
 
             last_advanced_round = int(advanced_round)
+            with self.__profile("Verifier"):
+                self.verifier.on_round_finish(self.chain)
+            self.__take_snapshot(last_advanced_round)
 
-    def __execute_task(self, advanced_round, round, task_name, task_params):
+    def __get_current_round(self):
+        if self.chain.is_model_only():
+            return self.chain.get_round()
+
+        return common.get_current_round()
+
+    def __take_snapshot(self, advanced_round):
+        if self.chain.is_model_only():
+            return
+
+        if self.snapshot_interval == 0 or advanced_round % self.snapshot_interval != 0:
+            return
+
+        self.snapshots[advanced_round] = ChainSnapshot(advanced_round, self.chain)
+
+    def __create_task(self, advanced_round, round, task_name):
         TaskClass = getattr(task_module, task_name)
         task_inst = TaskClass()
 
@@ -92,9 +319,57 @@ class Scenario:
 
         task_inst.set_round(round)
         task_inst.set_chain_state(self.chain)
-        task_inst.pre_execute(task_params)
-        task_inst.execute()
-        task_inst.post_execute()
+        task_inst.set_verifier(self.verifier)
+        return task_inst
+
+    def __execute_task(self, advanced_round, round, task_name, task_params):
+        task_inst = self.__create_task(advanced_round, round, task_name)
+
+        with self.__profile(task_name):
+            task_inst.pre_execute(task_params)
+            if self.chain.is_model_only():
+                task_inst.simulate()
+            else:
+                task_inst.execute()
+            task_inst.post_execute()
+
+    def __execute_pipelined_tasks(self, advanced_round, round, tasks):
+        pipeline = TaskPipeline(self.chain, self.verifier)
+
+        for task in tasks:
+            assert len(task) > 0
+            task_name = task[0]
+            task_params = task[1:] if len(task) > 1 else []
+
+            # the pre_execute of the other tasks may read the chain, the pipelined tasks are executed first
+            if not getattr(task_module, task_name).pipelined:
+                self.__execute_pipeline(pipeline)
+                self.__execute_task(advanced_round, round, task_name, task_params)
+                continue
+
+            task_inst = self.__create_task(advanced_round, round, task_name)
+            task_inst.pre_execute(task_params)
+
+            if task_inst.get_access_keys() is None:
+                self.__execute_pipeline(pipeline)
+                with self.__profile(task_name):
+                    task_inst.execute()
+                    task_inst.post_execute()
+                continue
+
+            if not pipeline.is_independent(task_inst):
+                self.__execute_pipeline(pipeline)
+
+            pipeline.add(task_inst)
+
+        self.__execute_pipeline(pipeline)
+
+    def __execute_pipeline(self, pipeline):
+        if pipeline.get_task_count() == 0:
+            return
+
+        with self.__profile("Pipeline"):
+            pipeline.execute()
 
     def __load(self, json_file):
         # pattern = os.path.join(config_dir, '*.json')
@@ -102,16 +377,17 @@ class Scenario:
 
         # for json_file in json_files:
         if not os.path.isfile(json_file):
-            return False
+            return False, 0, [], None
 
         return self.__parse(json_file)
 
     def __parse(self, json_file):
         init_round = 0
         round_tasks = []
+        seed = None
 
         if not os.path.exists(json_file):
-            return False, init_round, round_tasks
+            return False, init_round, round_tasks, seed
 
         ok = False
 
@@ -120,6 +396,7 @@ class Scenario:
                 data = json.load(file)
                 init_round = data['init_round']
                 round_tasks = data['round_tasks']
+                seed = data.get('seed')
                 ok = True
 
         except FileNotFoundError:
@@ -129,4 +406,4 @@ class Scenario:
         except Exception as e:
             print(f"Error: {e}")
 
-        return ok, init_round, round_tasks
+        return ok, init_round, round_tasks, seed
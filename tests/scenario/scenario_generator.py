@@ -5,6 +5,7 @@ import random
 from . import constants
 from .account_mgr import AccountMgr
 from .chain_state import NodeStatus, Candidate
+from .param_source import OnChainParamSource
 from . import payment
 from .scenario import Scenario
 
@@ -17,7 +18,9 @@ class AssetAmount:
 
 
 class DelegatorStakeInfo:
-    def __init__(self):
+    def __init__(self, rng):
+        self.random = rng
+
         # delegatee=>amount info
         self.cores = {}
 
@@ -82,7 +85,7 @@ class DelegatorStakeInfo:
         if operators is None or len(operators) == 0:
             return None, 0
 
-        operator = random.choice(operators)
+        operator = self.random.choice(operators)
         amount = self.cores[operator].amount
 
         return operator, amount
@@ -123,16 +126,21 @@ class DelegatorStakeInfo:
         if len(self.btcs) == 0:
             return None, None, 0
 
-        delegatee = random.choice(list(self.btcs.keys()))
+        delegatee = self.random.choice(list(self.btcs.keys()))
         if len(self.btcs[delegatee]) == 0:
             return None, None, 0
 
-        tx_symbol = random.choice(list(self.btcs[delegatee].keys()))
+        tx_symbol = self.random.choice(list(self.btcs[delegatee].keys()))
         return delegatee, tx_symbol, self.btcs[delegatee][tx_symbol]
 
 
 class DataCenter:
-    def __init__(self, round, candidate_count, delegator_count):
+    def __init__(self, round, candidate_count, delegator_count, rng, param_source):
+        # every random choice of the scenario generation is drawn from the seeded rng
+        self.random = rng
+        # the chain parameters, read from the deployed contracts or captured for a model-only run
+        self.param_source = param_source
+
         # update when a candidate is registered or its status changes
         self.candidates = {}
 
@@ -152,6 +160,9 @@ class DataCenter:
         self.operators = None
         self.delegators = None
 
+        # delegator => balance before the scenario is executed
+        self.delegator_balances = None
+
         self.btc_stake_payments = None
 
         self.btc_lst_stake_payments = None
@@ -164,6 +175,7 @@ class DataCenter:
 
         self.init_sponsees()
         self.init_delegators()
+        self.init_delegator_balances()
         self.init_operators()
         self.init_btc_stake_payments()
         self.init_btc_lst_stake_payments()
@@ -186,6 +198,12 @@ class DataCenter:
 
         self.delegators = delegators
 
+    def init_delegator_balances(self):
+        # read once, so that generating the rounds lazily while the scenario is executed gives the same tasks
+        self.delegator_balances = {}
+        for delegator in self.delegators:
+            self.delegator_balances[delegator] = self.param_source.get_balance(AccountMgr.get_delegator_addr(delegator))
+
     def init_operators(self):
         operators = []
         for i in range(self.candidate_count):
@@ -244,14 +262,14 @@ class DataCenter:
         self.btc_lst_redeem_max_amount = 0#BitcoinLSTStakeMock[0].burnBTCLimit()
 
     def init_utxo_fee(self):
-        self.utxo_fee = BitcoinLSTStakeMock[0].utxoFee()
+        self.utxo_fee = self.param_source.get("utxo_fee")
 
     def init_slash_params(self):
-        self.felony_round = SlashIndicatorMock[0].felonyRound()
-        self.felony_deposit = SlashIndicatorMock[0].felonyDeposit()
-        self.felony_threshold = SlashIndicatorMock[0].felonyThreshold()
-        self.dues = CandidateHubMock[0].dues()
-        self.required_margin = CandidateHubMock[0].requiredMargin()
+        self.felony_round = self.param_source.get("felony_round")
+        self.felony_deposit = self.param_source.get("felony_deposit")
+        self.felony_threshold = self.param_source.get("felony_threshold")
+        self.dues = self.param_source.get("dues")
+        self.required_margin = self.param_source.get("required_margin")
 
     def refresh(self):
         self.round += 1
@@ -274,6 +292,12 @@ class DataCenter:
     ############### end initialization ################
 
     ############### getter and setter #################
+    def get_random(self):
+        return self.random
+
+    def get_delegator_balance(self, delegator):
+        return self.delegator_balances[delegator]
+
     def get_probability(self, name):
         return self.random_task_probabilities.get(name, constants.DEFAULT_PROBABILITY)
 
@@ -300,7 +324,7 @@ class DataCenter:
 
     def get_stake_info(self, delegator, init_if_none=True):
         if self.stake_infos.get(delegator) is None and init_if_none:
-            self.stake_infos[delegator] = DelegatorStakeInfo()
+            self.stake_infos[delegator] = DelegatorStakeInfo(self.random)
 
         return self.stake_infos.get(delegator)
 
@@ -429,7 +453,7 @@ class DataCenter:
         if len(candidates) == 0:
             return
 
-        return random.choice(list(candidates.keys()))
+        return self.random.choice(list(candidates.keys()))
 
     # delegateable candidate
     def choice_available_candidate(self):
@@ -437,7 +461,7 @@ class DataCenter:
         if len(candidates) == 0:
             return
 
-        return random.choice(list(candidates.keys()))
+        return self.random.choice(list(candidates.keys()))
 
     # delegateable candidate
     def choice_available_candidate_exclude(self, excluded_operator):
@@ -457,12 +481,12 @@ class DataCenter:
     def choice_miners(self):
         assert self.delegator_count > 0
         max_count = max(self.delegator_count // 2, 1)
-        count = random.randint(1, max_count)
+        count = self.random.randint(1, max_count)
 
-        return random.choices(self.delegators, k=count)
+        return self.random.choices(self.delegators, k=count)
 
     def choice_delegator(self):
-        return random.choice(self.delegators)
+        return self.random.choice(self.delegators)
 
     ############## end delegator ####################
 
@@ -533,7 +557,7 @@ class DataCenter:
         if max_amount < min_amount:
             return 0
 
-        amount = round(random.uniform(min_amount, max_amount), 8)
+        amount = round(self.random.uniform(min_amount, max_amount), 8)
         return amount
 
     def is_staked_asset(self, delegator):
@@ -549,26 +573,34 @@ class DataCenter:
         return cur_symbol
 
     def choice_btc_stake_lock_script(self):
-        payment_type = random.choice(list(self.btc_stake_payments.keys()))
-        redeem_script_type = random.choice(list(self.btc_stake_payments[payment_type]))
+        payment_type = self.random.choice(list(self.btc_stake_payments.keys()))
+        redeem_script_type = self.random.choice(list(self.btc_stake_payments[payment_type]))
 
         return payment_type, redeem_script_type
 
     def choice_btc_lst_stake_lock_script(self):
-        payment_type = random.choice(list(self.btc_lst_stake_payments.keys()))
+        payment_type = self.random.choice(list(self.btc_lst_stake_payments.keys()))
 
         redeem_script_types = self.btc_lst_stake_payments[payment_type]
         if len(redeem_script_types) == 0:
             return payment_type, None
 
-        redeem_script_type = random.choice(redeem_script_types)
+        redeem_script_type = self.random.choice(redeem_script_types)
         return payment_type, redeem_script_type
 
     ################ end lock script #################
 
 
 class ScenarioGenerator:
-    def __init__(self):
+    def __init__(self, seed=None, param_source=None):
+        # a scenario is fully determined by the seed and the generate params
+        if seed is None:
+            seed = random.randrange(2 ** 32)
+
+        self.seed = seed
+        self.random = None
+        self.param_source = param_source if param_source is not None else OnChainParamSource()
+
         self.start_round = 0
         self.stop_round = 0
 
@@ -576,6 +608,9 @@ class ScenarioGenerator:
         self.task_generators = None
         self.data_center = None
 
+    def get_seed(self):
+        return self.seed
+
     def add_generator(self, generator):
         assert generator is not None
         assert self.data_center is not None
@@ -584,19 +619,44 @@ class ScenarioGenerator:
         self.task_generators[generator.get_id()] = generator
 
     def generate(self, start_round, stop_round, candidate_count, delegator_count):
+        round_tasks = {}
+        for advanced_round, tasks in self.generate_rounds(start_round, stop_round, candidate_count, delegator_count):
+            round_tasks[advanced_round] = tasks
+
+        scenario = Scenario()
+        scenario.set_seed(self.seed)
+        scenario.set_init_round(self.init_round)
+        scenario.set_round_tasks(round_tasks)
+        return scenario
+
+    def replay(self, start_round, stop_round, candidate_count, delegator_count):
+        # the same scenario as generate(), but the tasks of a round are only generated when the round is executed
+        def round_tasks():
+            return self.generate_rounds(start_round, stop_round, candidate_count, delegator_count)
+
+        scenario = Scenario()
+        scenario.set_seed(self.seed)
+        scenario.set_init_round(start_round)
+        scenario.set_round_task_source(round_tasks)
+        return scenario
+
+    def generate_rounds(self, start_round, stop_round, candidate_count, delegator_count):
         # check params
         assert start_round >= constants.MIN_ROUND and stop_round > start_round
         assert candidate_count > 0 and delegator_count > 0
 
+        # the task builders are shared by class, a previous generation may have been left unfinished
+        self.reset()
+
         # init data members
+        self.random = random.Random(self.seed)
         self.start_round = start_round
         self.stop_round = stop_round
 
         self.init_round = start_round
         self.task_generators = {}
-        self.round_tasks = {}
 
-        self.data_center = DataCenter(start_round, candidate_count, delegator_count)
+        self.data_center = DataCenter(start_round, candidate_count, delegator_count, self.random, self.param_source)
 
         # init global task builder for each task generator
         ChainTaskGenerator.init_supported_task_builders()
@@ -644,17 +704,15 @@ class ScenarioGenerator:
 
                 tasks.extend(res)
 
-            self.round_tasks[advanced_round] = tasks
+            yield advanced_round, tasks
 
-        scenario = Scenario()
-        scenario.set_init_round(self.init_round)
-        scenario.set_round_tasks(self.round_tasks)
+        self.reset()
 
+    def reset(self):
         ChainTaskGenerator.reset()
         CandidateTaskGenerator.reset()
         DelegatorTaskGenerator.reset()
         TaskGenerator.reset()
-        return scenario
 
 
 ############# end scenario generator ##############
@@ -694,6 +752,9 @@ class TaskGenerator:
     def get_data_center(self):
         return self.data_center
 
+    def get_random(self):
+        return self.data_center.get_random()
+
     def generate_one_time_task(self, advanced_round):
         self.set_advanced_round(advanced_round)
 
@@ -941,7 +1002,7 @@ class TaskBuilder:
         probability = data_center.get_probability(self.__class__.__name__)
 
         print(f"{self.__class__.__name__}:{probability}")
-        p = random.randint(1, constants.PROBABILITY_DECIMALS)
+        p = task_generator.get_random().randint(1, constants.PROBABILITY_DECIMALS)
         return p <= probability
 
     def build(self, task_generator):
@@ -968,8 +1029,8 @@ class TaskBuilder:
 
         return self.next_builder.build(task_generator)
 
-    def build_confirm_btc_tx_task(self, tx_symbol):
-        delay_minutes = random.randint(12, 60)
+    def build_confirm_btc_tx_task(self, task_generator, tx_symbol):
+        delay_minutes = task_generator.get_random().randint(12, 60)
         return [ConfirmBtcTx.__name__, tx_symbol, delay_minutes]
 
 
@@ -1024,9 +1085,9 @@ class GenerateBlock(TaskBuilder):
         if candidate_count == 0:
             return
 
-        block_count_per_validator = random.randint(1, constants.MAX_BLOCK_COUNT_PER_VALIDATOR)
+        block_count_per_validator = task_generator.get_random().randint(1, constants.MAX_BLOCK_COUNT_PER_VALIDATOR)
         block_count = block_count_per_validator * candidate_count
-        block_count += random.randint(0, candidate_count)
+        block_count += task_generator.get_random().randint(0, candidate_count)
 
         task = [self.__class__.__name__, block_count]
         return [task]
@@ -1040,7 +1101,7 @@ class UpdateCoreStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateCoreStakeGrades()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = task_generator.get_random().randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1060,7 +1121,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
 
     def self_build(self, task_generator):
         # discount grades
-        grade_count = random.randint(constants.MIN_GRADE_COUNT, constants.MAX_GRADE_COUNT)
+        grade_count = task_generator.get_random().randint(constants.MIN_GRADE_COUNT, constants.MAX_GRADE_COUNT)
         level_step = constants.PERCENT_DECIMALS // (grade_count - 1)
         percent_step = level_step
 
@@ -1068,7 +1129,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
             return
 
         min_level = 0
-        min_percent = random.randint(1, percent_step - 1)
+        min_percent = task_generator.get_random().randint(1, percent_step - 1)
         grades = [min_level, min_percent]
         for i in range(1, grade_count):
             level = min_level + i * level_step
@@ -1080,7 +1141,7 @@ class UpdateCoreStakeGrades(TaskBuilder):
             grades.append(percent)
 
         # multiple grades
-        multiple = random.randint(1, constants.MAX_CORE_STAKE_GRADE_PERCENT // constants.PERCENT_DECIMALS)
+        multiple = task_generator.get_random().randint(1, constants.MAX_CORE_STAKE_GRADE_PERCENT // constants.PERCENT_DECIMALS)
         if multiple > 1:
             percent = constants.PERCENT_DECIMALS * multiple
             level = constants.PERCENT_DECIMALS * multiple * (
@@ -1100,7 +1161,7 @@ class UpdateBtcStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateBtcStakeGrades()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = task_generator.get_random().randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1119,9 +1180,9 @@ class UpdateBtcStakeGrades(TaskBuilder):
         return self.enabled
 
     def self_build(self, task_generator):
-        max_level = random.randint(0, constants.MAX_BTC_STAKE_GRADE_LEVEL)
+        max_level = task_generator.get_random().randint(0, constants.MAX_BTC_STAKE_GRADE_LEVEL)
         max_percent = constants.PERCENT_DECIMALS
-        grade_count = random.randint(5, 10)
+        grade_count = task_generator.get_random().randint(5, 10)
 
         level_step = max_level // grade_count
         percent_step = max_percent // grade_count
@@ -1157,7 +1218,7 @@ class UpdateBtcLstStakeGradeFlag(TaskBuilder):
         self.next_builder = UpdateBtcLstStakeGradePercent()
 
     def self_build(self, task_generator):
-        value = random.randint(0, 1)
+        value = task_generator.get_random().randint(0, 1)
         if value > 0:
             self.next_builder.enable()
         else:
@@ -1173,7 +1234,7 @@ class UpdateBtcLstStakeGradePercent(TaskBuilder):
         self.type = TaskType.UpdateBtcLstStakeGradePercent.value
 
     def self_build(self, task_generator):
-        value = random.randint(1, constants.MAX_BTC_LST_STAKE_GRADE_PERCENT)
+        value = task_generator.get_random().randint(1, constants.MAX_BTC_LST_STAKE_GRADE_PERCENT)
         task = [self.__class__.__name__, value]
         return [task]
 
@@ -1200,7 +1261,7 @@ class RegisterCandidate(TaskBuilder):
             return True
 
         probability = data_center.get_probability(self.__class__.__name__)
-        p = random.randint(1, constants.PROBABILITY_DECIMALS)
+        p = task_generator.get_random().randint(1, constants.PROBABILITY_DECIMALS)
         return p <= probability
 
     def self_build(self, task_generator):
@@ -1212,7 +1273,7 @@ class RegisterCandidate(TaskBuilder):
 
         data_center.register_candidate(operator)
 
-        commission = random.randint(1, constants.MAX_CANDIDATE_COMMISSION)
+        commission = task_generator.get_random().randint(1, constants.MAX_CANDIDATE_COMMISSION)
         task = [self.__class__.__name__, operator, commission]
 
         return [task]
@@ -1237,7 +1298,7 @@ class SlashValidator(TaskBuilder):
             return
 
         max_count = data_center.get_felony_threshold()
-        count = random.randint(1, max_count * 2)
+        count = task_generator.get_random().randint(1, max_count * 2)
         task = [self.__class__.__name__, operator, count]
 
         data_center.slash_validator(operator, count)
@@ -1359,10 +1420,9 @@ class AssetOperationBuilder(TaskBuilder):
     def __init__(self):
         super().__init__()
 
-    def random_stake_amount(self, delegator):
-        delegator_addr = AccountMgr.get_delegator_addr(delegator)
-        delegator_balance = delegator_addr.balance()
-        return random.randint(1, min(delegator_balance // 100, 1000))
+    def random_stake_amount(self, task_generator, delegator):
+        delegator_balance = task_generator.get_data_center().get_delegator_balance(delegator)
+        return task_generator.get_random().randint(1, min(delegator_balance // 100, 1000))
 
 
 class StakeCore(AssetOperationBuilder):
@@ -1381,7 +1441,7 @@ class StakeCore(AssetOperationBuilder):
         delegator = task_generator.get_delegator()
 
         # init amount by delegator balance
-        amount = self.random_stake_amount(delegator)
+        amount = self.random_stake_amount(task_generator, delegator)
         task = [self.__class__.__name__, delegator, delegatee, amount]
 
         data_center.stake_core(delegator, delegatee, amount)
@@ -1404,7 +1464,7 @@ class UnstakeCore(AssetOperationBuilder):
             return
 
         # random init undelegate amount
-        amount = random.randint(1, staked_amount)
+        amount = task_generator.get_random().randint(1, staked_amount)
         task = [self.__class__.__name__, delegator, delegatee, amount]
 
         data_center.unstake_core(delegator, delegatee, amount)
@@ -1432,7 +1492,7 @@ class TransferCore(AssetOperationBuilder):
             return
 
         # random init amount
-        amount = random.randint(1, staked_amount)
+        amount = task_generator.get_random().randint(1, staked_amount)
         task = [self.__class__.__name__, delegator, from_delegatee, to_delegatee, amount]
 
         data_center.transfer_core(delegator, from_delegatee, to_delegatee, amount)
@@ -1454,7 +1514,7 @@ class StakeBtc(AssetOperationBuilder):
 
     def self_build(self, task_generator):
         lock_tx_task, tx_symbol, delegator, delegatee, lock_round = self.build_lock_tx_task(task_generator)
-        confirm_tx_task = self.build_confirm_btc_tx_task(tx_symbol)
+        confirm_tx_task = self.build_confirm_btc_tx_task(task_generator, tx_symbol)
         stake_btc_task = [self.__class__.__name__, tx_symbol, delegator]
 
         data_center = task_generator.get_data_center()
@@ -1474,10 +1534,10 @@ class StakeBtc(AssetOperationBuilder):
         delegatee = data_center.choice_candidate()
 
         # bitcoin amount 0.01 ~ 2
-        amount = random.randint(1, 200) / 100
+        amount = task_generator.get_random().randint(1, 200) / 100
 
         # lock round
-        lock_round = random.randint(5, 365)
+        lock_round = task_generator.get_random().randint(5, 365)
 
         # payment type
         payment_type, redeem_script_type = \
@@ -1538,7 +1598,7 @@ class StakeLSTBtc(AssetOperationBuilder):
 
     def self_build(self, task_generator):
         lst_lock_tx_task, tx_symbol, amount, delegator = self.build_lock_tx_task(task_generator)
-        confirm_tx_task = self.build_confirm_btc_tx_task(tx_symbol)
+        confirm_tx_task = self.build_confirm_btc_tx_task(task_generator, tx_symbol)
         add_wallet_task = [AddWallet.__name__, tx_symbol]
         stake_btc_lst_task = [self.__class__.__name__, tx_symbol, delegator]
 
@@ -1556,7 +1616,7 @@ class StakeLSTBtc(AssetOperationBuilder):
         delegator = task_generator.get_delegator()
 
         # bitcoin amount 0.01 ~ 2
-        amount = random.randint(1, 200) / 100
+        amount = task_generator.get_random().randint(1, 200) / 100
 
         # payment type
         payment_type, redeem_script_type = \
@@ -1595,7 +1655,7 @@ class TransferLSTBtc(AssetOperationBuilder):
         if stake_amount == 0:
             return
 
-        transfer_amount = round(random.uniform(0, stake_amount), 8)
+        transfer_amount = round(task_generator.get_random().uniform(0, stake_amount), 8)
 
         to_delegator = data_center.choice_delegator()
         if to_delegator == from_delegator:
@@ -1621,7 +1681,7 @@ class BurnLSTBtcAndPayBtcToRedeemer(AssetOperationBuilder):
         if amount == 0:
             return
 
-        confirm_tx_task = self.build_confirm_btc_tx_task(tx_symbol)
+        confirm_tx_task = self.build_confirm_btc_tx_task(task_generator, tx_symbol)
         unstake_btc_lst_task = [UnstakeLSTBtc.__name__, tx_symbol, redeemer]
 
         data_center = task_generator.get_data_center()
@@ -0,0 +1,334 @@
+import argparse
+import multiprocessing
+import os
+import queue
+import random
+import sys
+import time
+from multiprocessing.util import Finalize
+
+PROJECT_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..'))
+BASE_PORT = 8600
+
+# one dev node per worker process, set by init_worker
+worker_port = None
+worker_snapshot = False
+
+
+def make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count, seed=None):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_name = f"{start_round}_{stop_round}_{candidate_count}_{delegator_count}"
+    if seed is not None:
+        file_name += f"_{seed}"
+    file_path = os.path.join(base_dir, 'config', f"{file_name}_error.json")
+    return file_path
+
+
+def make_profile_file_prefix(profile_dir, seed, candidate_count, delegator_count):
+    return os.path.join(profile_dir, f"profile_{seed}_{candidate_count}_{delegator_count}")
+
+
+def make_profiler(seed, start_round, stop_round, candidate_count, delegator_count):
+    from .profiler import Profiler
+
+    return Profiler({
+        "seed": seed,
+        "rounds": stop_round - start_round,
+        "candidates": candidate_count,
+        "delegators": delegator_count
+    })
+
+
+def deploy_system_contracts():
+    # the deployment of the set_system_contract_address fixture in tests/conftest.py
+    from brownie import accounts
+    from .. import common
+
+    common.deploy_system_contracts(accounts[0])
+
+
+def init_worker(ports):
+    global worker_port
+
+    from brownie import network, project
+    from brownie._config import CONFIG
+
+    worker_port = ports.get()
+
+    project.load(PROJECT_DIR)
+
+    # launch a dedicated dev node for this worker
+    CONFIG.networks['development']['cmd_settings']['port'] = worker_port
+    network.connect('development')
+
+    # pool workers leave through os._exit, atexit handlers do not run and the node would be left behind
+    Finalize(None, network.disconnect, exitpriority=10)
+
+    deploy_system_contracts()
+
+
+def reset_chain():
+    global worker_snapshot
+
+    from brownie import chain
+
+    # every scenario starts from the freshly deployed contracts
+    if worker_snapshot:
+        chain.revert()
+    else:
+        chain.snapshot()
+        worker_snapshot = True
+
+
+def init_random_sources(seed, param_source=None):
+    # the scenario modules read the contract containers on import, which exist after project.load
+    from .account_mgr import AccountMgr
+    from .payment import Payment
+    from .key_pool import KeyPool
+
+    # the generator has its own rng, these cover the random draws made while the tasks are executed
+    random.seed(seed)
+    AccountMgr.init_account_mgr(seed, param_source)
+    Payment.set_random(random.Random(seed))
+    Payment.set_key_pool(KeyPool("payment", seed))
+
+
+def replay_random_scenario(seed, start_round, stop_round, candidate_count, delegator_count,
+                           verify_policy="every-task", profile_dir=None, pipelined=False, spv_proof=False):
+    # regenerates the scenario of a seed round by round while it is executed on the connected node
+    from .scenario_generator import ScenarioGenerator
+    from .spv_relay import SpvRelay
+
+    init_random_sources(seed)
+    generator = ScenarioGenerator(seed)
+    scenario = generator.replay(start_round, stop_round, candidate_count, delegator_count)
+
+    if profile_dir is not None:
+        scenario.set_profiler(make_profiler(seed, start_round, stop_round, candidate_count, delegator_count))
+    scenario.set_pipelined(pipelined)
+    if spv_proof:
+        scenario.set_spv_relay(SpvRelay(seed))
+
+    scenario.execute(verify_policy)
+
+    if profile_dir is not None:
+        scenario.get_profiler().print_summary()
+        scenario.get_profiler().dump(make_profile_file_prefix(profile_dir, seed, candidate_count, delegator_count))
+
+    return scenario
+
+
+def run_random_scenario(seed, start_round, stop_round, candidate_count, delegator_count, profile_dir=None,
+                        pipelined=False, spv_proof=False):
+    from .scenario_generator import ScenarioGenerator
+    from .spv_relay import SpvRelay
+
+    reset_chain()
+    init_random_sources(seed)
+
+    generator = ScenarioGenerator(seed)
+    scenario = generator.generate(start_round, stop_round, candidate_count, delegator_count)
+
+    result = {
+        "seed": seed,
+        "port": worker_port,
+        "task_count": scenario.get_task_count(),
+        "error": None,
+        "file_path": None,
+        "profile": None
+    }
+
+    if profile_dir is not None:
+        scenario.set_profiler(make_profiler(seed, start_round, stop_round, candidate_count, delegator_count))
+    scenario.set_pipelined(pipelined)
+    if spv_proof:
+        scenario.set_spv_relay(SpvRelay(seed))
+
+    start_time = time.time()
+    try:
+        scenario.execute()
+    except Exception as e:
+        # when execution fails, dump the scenario configuration for issue diagnosis and execution verification
+        file_path = make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count, seed)
+        scenario.dump(file_path)
+        result["error"] = repr(e)
+        result["file_path"] = file_path
+
+    result["elapsed"] = time.time() - start_time
+
+    if profile_dir is not None:
+        file_prefix = make_profile_file_prefix(profile_dir, seed, candidate_count, delegator_count)
+        scenario.get_profiler().dump(file_prefix)
+        result["profile"] = f"{file_prefix}.json"
+
+    return result
+
+
+def run_random_scenarios(seeds, start_round, stop_round, candidate_count, delegator_count,
+                         worker_count=None, base_port=BASE_PORT, profile_dir=None, pipelined=False,
+                         spv_proof=False):
+    if worker_count is None:
+        worker_count = os.cpu_count()
+    worker_count = max(1, min(worker_count, len(seeds)))
+
+    # compile once, so that the workers only load the build artifacts
+    from brownie import project
+    if len(project.get_loaded_projects()) == 0:
+        project.load(PROJECT_DIR).close()
+
+    # the workers must not inherit a loaded brownie state, so they are spawned instead of forked
+    context = multiprocessing.get_context('spawn')
+    ports = context.Queue()
+    for i in range(worker_count):
+        ports.put(base_port + i)
+
+    if profile_dir is not None:
+        os.makedirs(profile_dir, exist_ok=True)
+
+    params = [
+        (seed, start_round, stop_round, candidate_count, delegator_count, profile_dir, pipelined, spv_proof)
+        for seed in seeds
+    ]
+
+    start_time = time.time()
+    with context.Pool(worker_count, initializer=init_worker, initargs=(ports,)) as pool:
+        results = pool.starmap(run_random_scenario, params, chunksize=1)
+        pool.close()
+        pool.join()
+
+    elapsed = time.time() - start_time
+    task_count = sum(result["task_count"] for result in results)
+    failures = [result for result in results if result["error"] is not None]
+
+    print(f"Executed {len(results)} scenarios ({task_count} tasks) on {worker_count} workers in {elapsed:.1f}s")
+    for result in failures:
+        print(f"Scenario seed={result['seed']} port={result['port']} failed: {result['error']}, "
+              f"dumped to {result['file_path']}")
+
+    return results, failures
+
+
+def capture_params(param_file):
+    # the parameters of the freshly deployed contracts, the input of the model-only runs
+    from .param_source import StaticParamSource
+
+    init_random_sources(0)
+    StaticParamSource.capture_from_chain().dump(param_file)
+
+
+def run_model_scenario(seed, start_round, stop_round, candidate_count, delegator_count, param_source):
+    from .scenario_generator import ScenarioGenerator
+
+    init_random_sources(seed, param_source)
+
+    generator = ScenarioGenerator(seed, param_source)
+    scenario = generator.replay(start_round, stop_round, candidate_count, delegator_count)
+    scenario.set_param_source(param_source)
+
+    try:
+        scenario.execute()
+    except Exception as e:
+        return repr(e)
+
+    return None
+
+
+def run_model_scenarios(seeds, start_round, stop_round, candidate_count, delegator_count, param_file):
+    # executes the scenarios against the off-chain model alone, no node is needed.
+    # returns the seeds whose model invariants failed, they are the ones worth a replay on chain
+    from brownie import project
+    from .param_source import StaticParamSource
+
+    if len(project.get_loaded_projects()) == 0:
+        project.load(PROJECT_DIR)
+
+    param_source = StaticParamSource.load(param_file)
+
+    flagged_seeds = []
+    start_time = time.time()
+    for seed in seeds:
+        error = run_model_scenario(seed, start_round, stop_round, candidate_count, delegator_count, param_source)
+        if error is not None:
+            print(f"Scenario seed={seed} flagged by the model: {error}")
+            flagged_seeds.append(seed)
+
+    elapsed = time.time() - start_time
+    print(f"Simulated {len(seeds)} scenarios in {elapsed:.1f}s, {len(flagged_seeds)} flagged")
+
+    return flagged_seeds
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Execute random scenarios in parallel on local dev nodes")
+    parser.add_argument("--count", type=int, default=8, help="number of scenarios")
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first scenario")
+    parser.add_argument("--workers", type=int, default=None, help="number of worker processes")
+    parser.add_argument("--base-port", type=int, default=BASE_PORT, help="port of the first worker's node")
+    parser.add_argument("--start-round", type=int, default=7)
+    parser.add_argument("--stop-round", type=int, default=17)
+    parser.add_argument("--candidates", type=int, default=6)
+    parser.add_argument("--delegators", type=int, default=5)
+    parser.add_argument("--replay", action="store_true", help="replay the scenario of --seed in this process")
+    parser.add_argument("--profile-dir", default=None, help="write gas and latency reports of each scenario here")
+    parser.add_argument("--pipelined", action="store_true", help="send the independent tasks of a round together")
+    parser.add_argument("--spv-proof", action="store_true",
+                        help="relay synthetic btc blocks and stake with real merkle proofs instead of the mock bypass")
+    parser.add_argument("--capture-params", default=None, help="write the parameters of a fresh chain to this file")
+    parser.add_argument("--model-only", action="store_true",
+                        help="execute against the off-chain model with the --params file, then replay the flagged "
+                             "seeds on chain")
+    parser.add_argument("--params", default=None, help="parameter file written by --capture-params")
+    args = parser.parse_args()
+
+    if args.capture_params is not None:
+        ports = queue.Queue()
+        ports.put(args.base_port)
+        init_worker(ports)
+        capture_params(args.capture_params)
+        return
+
+    if args.replay:
+        ports = queue.Queue()
+        ports.put(args.base_port)
+        init_worker(ports)
+
+        if args.profile_dir is not None:
+            os.makedirs(args.profile_dir, exist_ok=True)
+
+        replay_random_scenario(args.seed, args.start_round, args.stop_round, args.candidates, args.delegators,
+                               profile_dir=args.profile_dir, pipelined=args.pipelined, spv_proof=args.spv_proof)
+        return
+
+    seeds = list(range(args.seed, args.seed + args.count))
+
+    if args.model_only:
+        assert args.params is not None, f"--model-only requires --params"
+        seeds = run_model_scenarios(
+            seeds,
+            args.start_round,
+            args.stop_round,
+            args.candidates,
+            args.delegators,
+            args.params
+        )
+        if len(seeds) == 0:
+            sys.exit(0)
+
+    results, failures = run_random_scenarios(
+        seeds,
+        args.start_round,
+        args.stop_round,
+        args.candidates,
+        args.delegators,
+        args.workers,
+        args.base_port,
+        args.profile_dir,
+        args.pipelined,
+        args.spv_proof
+    )
+
+    sys.exit(1 if len(failures) > 0 else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+import random
+import struct
+from brownie import *
+from ..btc_merkle import MerkleTree, double_sha256
+
+BLOCK_VERSION = 0x20000000
+
+# a full mainnet block, the merkle proofs are as long as the ones of real stake transactions
+DEFAULT_BLOCK_TX_COUNT = 4096
+
+
+def get_txid(tx):
+    # the txid BitcoinStake and BitcoinLSTStake compute from the serialized transaction they are given
+    return double_sha256(tx.serialize())
+
+
+class SpvRelay:
+    # packs the btc transactions confirmed by ConfirmBtcTx into synthetic blocks, one block per confirm time,
+    # padded with random txids to block_tx_count. the headers are relayed to BtcLightClientMock, followed by
+    # enough empty blocks to confirm them, when the first transaction of a block is staked or unstaked. the
+    # stake tasks then pass real merkle proofs and checkTxProof runs instead of the setCheckResult bypass
+    def __init__(self, seed=None, block_tx_count=DEFAULT_BLOCK_TX_COUNT):
+        assert block_tx_count > 0, f"Invalid block tx count {block_tx_count}"
+
+        self.random = random.Random(seed)
+        self.block_tx_count = block_tx_count
+        self.confirm_block = 0
+        self.nonce = 0
+
+        # block time => txids confirmed at it and not relayed yet
+        self.pending_txids = {}
+        self.last_block_time = 0
+
+        # txid => (btc block height, merkle nodes, tx index)
+        self.proofs = {}
+
+    def start(self):
+        # called before the off-chain model reads any balance
+        BtcLightClientMock[0].setCheckResult(False, 0)
+        self.confirm_block = max(BitcoinStakeMock[0].btcConfirmBlock(), BitcoinLSTStakeMock[0].btcConfirmBlock())
+
+    def confirm_tx(self, tx, block_time):
+        txid = get_txid(tx)
+        if txid in self.proofs:
+            return
+
+        txids = self.pending_txids.setdefault(block_time, [])
+        if txid not in txids:
+            txids.append(txid)
+        self.last_block_time = block_time
+
+    def is_pending(self, txid):
+        for txids in self.pending_txids.values():
+            if txid in txids:
+                return True
+
+        return False
+
+    def relay_tx_block(self, tx):
+        # relays the pending blocks once a transaction in them is needed, returns the receipts of the headers.
+        # a transaction staked without a ConfirmBtcTx of its own lands in a block at the last confirm time,
+        # the time the setCheckResult bypass would have returned for it
+        txid = get_txid(tx)
+        if txid in self.proofs:
+            return []
+
+        if not self.is_pending(txid):
+            self.confirm_tx(tx, self.last_block_time)
+
+        tx_receipts = []
+        for block_time in sorted(self.pending_txids.keys()):
+            tx_receipts.append(self.__relay_block(self.pending_txids[block_time], block_time))
+
+        for i in range(self.confirm_block):
+            tx_receipts.append(self.__relay_block([], self.last_block_time))
+
+        self.pending_txids = {}
+        return tx_receipts
+
+    def get_proof(self, tx):
+        txid = get_txid(tx)
+        assert txid in self.proofs, f"Btc tx {txid[::-1].hex()} is not relayed"
+        return self.proofs[txid]
+
+    def __relay_block(self, txids, block_time):
+        light_client = BtcLightClientMock[0]
+        chain_tip = light_client.getChainTip()
+        block_height = light_client.getHeight(chain_tip) + 1
+
+        # the empty blocks only confirm the ones before them, a coinbase is enough
+        filler_count = max(self.block_tx_count - len(txids), 1) if len(txids) > 0 else 1
+        leaves = [self.random.randbytes(32) for _ in range(filler_count)]
+        indexes = self.random.sample(range(len(leaves) + len(txids)), len(txids))
+        for index, txid in sorted(zip(indexes, txids)):
+            leaves.insert(index, txid)
+
+        tree = MerkleTree(leaves)
+        for index, txid in zip(indexes, txids):
+            merkle_nodes = ['0x' + node.hex() for node in tree.get_proof(index)]
+            self.proofs[txid] = (block_height, merkle_nodes, index)
+
+        self.nonce += 1
+        header = struct.pack("<I", BLOCK_VERSION) + bytes(chain_tip)[::-1] + tree.get_root() + \
+            struct.pack("<III", block_time, light_client.getBits(chain_tip), self.nonce)
+
+        return light_client.storeMockBlockHeader(header)
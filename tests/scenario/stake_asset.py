@@ -1,11 +1,16 @@
 from brownie import *
+from bisect import bisect_right
 from . import constants
 from .account_mgr import AccountMgr
 
 addr_to_name = AccountMgr.addr_to_name
+get_contract_addr = AccountMgr.get_contract_addr
 
 
 class RoundReward:
+    # one per validator per asset per round
+    __slots__ = ("reward_amount", "stake_amount")
+
     def __init__(self, reward_amount, stake_amount):
         self.reward_amount = reward_amount  # total reward amount in current round
         self.stake_amount = stake_amount  # total stake in current round
@@ -16,19 +21,41 @@ class RoundReward:
 
 
 class CoreRoundReward(RoundReward):
+    __slots__ = ()
+
     def get_reward_per_stake(self):
         assert self.stake_amount > 0, f"{self.reward_amount}, {self.stake_amount}"
         return self.reward_amount * constants.CORE_AMOUNT_PER_REWARD // self.stake_amount
 
 
 class BtcRoundReward(RoundReward):
+    __slots__ = ()
+
     def get_reward_per_stake(self):
         assert self.stake_amount > 0, f"{self.reward_amount}, {self.stake_amount}"
         return self.reward_amount * constants.BTC_AMOUNT_PER_REWARD // self.stake_amount
 
 
+# rewards are added round by round, so the accrued index only grows at its tail
+def add_accrued_reward(rounds, accrued_rewards, round, reward_per_stake):
+    assert len(rounds) == 0 or rounds[-1] < round, f"{rounds[-1]}, {round}"
+
+    last_accrued_reward = accrued_rewards[-1] if len(accrued_rewards) > 0 else 0
+    rounds.append(round)
+    accrued_rewards.append(last_accrued_reward + reward_per_stake)
+
+
+# the accrued reward per stake of the rounds [0, round]
+def get_accrued_reward(rounds, accrued_rewards, round):
+    idx = bisect_right(rounds, round)
+    if idx == 0:
+        return 0
+
+    return accrued_rewards[idx - 1]
+
+
 class Asset:
-    def __init__(self):
+    def __init__(self, param_source):
         self.name = None
         self.agent = None
         self.hardcap = None
@@ -38,10 +65,16 @@ class Asset:
         self.factor = None
         self.round_rewards = {}
 
+        # accrued reward per stake index, similar to accruedRewardMap on chain
+        # (delegatee => [round]), rounds with reward in ascending order
+        self.accrued_reward_rounds = {}
+        # (delegatee => [accrued reward per stake]), aligned with accrued_reward_rounds
+        self.accrued_rewards = {}
+
         self.dual_stake_mask = 0
         self.decimals = 1
 
-        self.init_state_off_chain()
+        self.init_state_off_chain(param_source)
 
     def __repr__(self):
         return f"Asset(name={self.name},agent={self.agent},hardcap={self.hardcap},bonus_rate={self.bonus_rate},bonus_amount={self.bonus_amount},amount={self.amount},factor={self.factor})"
@@ -59,6 +92,10 @@ class Asset:
     def calc_candidate_stake_amount_list(self, candidate, delegator_stake_state, round):
         pass
 
+    # whether the stake amount list saved at the last turn round may differ from a new calculation
+    def is_stake_amount_list_changed(self, candidate, delegator_stake_state, round):
+        return candidate.get_stake_state().is_dirty(self.name)
+
     def get_name(self):
         return self.name
 
@@ -71,9 +108,9 @@ class Asset:
     def get_decimals(self):
         return self.decimals
 
-    def init_state_off_chain(self):
+    def init_state_off_chain(self, param_source):
         tuple_data = self.get_initial_state()
-        tuple_data_on_chain = self.get_initial_state_on_chain()
+        tuple_data_on_chain = self.get_initial_state_on_chain(param_source)
         assert tuple_data == tuple_data_on_chain, f"off_chain_data={tuple_data}, on_chain_data={tuple_data_on_chain}"
 
         self.name = tuple_data[0]
@@ -86,10 +123,9 @@ class Asset:
         self.amount = tuple_data[3]
         self.factor = tuple_data[4]
 
-    def get_initial_state_on_chain(self):
-        state1 = StakeHubMock[0].assets(self.get_asset_idx())
-        state2 = StakeHubMock[0].stateMap(self.get_agent_addr())
-        return state1 + state2
+    def get_initial_state_on_chain(self, param_source):
+        # StakeHub.assets(idx) + StakeHub.stateMap(agent)
+        return tuple(param_source.get("asset_states")[self.get_asset_idx()])
 
     def set_total_amount(self, total_amount):
         self.total_amount = total_amount
@@ -135,18 +171,29 @@ class Asset:
         round_reward = self.create_round_reward(reward_amount, stake_amount)
         self.round_rewards[delegatee][round] = round_reward
 
-    def get_reward_per_stake(self, delegatee, from_round, to_round):
-        round_reward_list = self.round_rewards.get(delegatee)
-        if round_reward_list is None:
+        if self.accrued_reward_rounds.get(delegatee) is None:
+            self.accrued_reward_rounds[delegatee] = []
+            self.accrued_rewards[delegatee] = []
+
+        add_accrued_reward(
+            self.accrued_reward_rounds[delegatee],
+            self.accrued_rewards[delegatee],
+            round,
+            round_reward.get_reward_per_stake()
+        )
+
+    def get_accrued_reward(self, delegatee, round):
+        rounds = self.accrued_reward_rounds.get(delegatee)
+        if rounds is None:
             return 0
 
-        reward_per_stake = 0
-        for round in range(from_round, to_round + 1):
-            round_reward = round_reward_list.get(round)
-            if round_reward is not None:
-                reward_per_stake += round_reward.get_reward_per_stake()
+        return get_accrued_reward(rounds, self.accrued_rewards[delegatee], round)
 
-        return reward_per_stake
+    def get_reward_per_stake(self, delegatee, from_round, to_round):
+        if from_round > to_round:
+            return 0
+
+        return self.get_accrued_reward(delegatee, to_round) - self.get_accrued_reward(delegatee, from_round - 1)
 
     def distribute_reward(self, validators, delegator_stake_state, round):
         print(f"{self.__class__.__name__} distribute_reward")
@@ -198,8 +245,8 @@ class Asset:
 
 
 class CoreAsset(Asset):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, param_source):
+        super().__init__(param_source)
 
         self.dual_stake_mask = 1
 
@@ -210,7 +257,7 @@ class CoreAsset(Asset):
         return 0
 
     def get_agent_addr(self):
-        return CoreAgentMock[0]
+        return get_contract_addr("CoreAgent")
 
     def create_round_reward(self, reward_amount, stake_amount):
         return CoreRoundReward(reward_amount, stake_amount)
@@ -315,8 +362,8 @@ class CoreAsset(Asset):
 
 
 class PowerAsset(Asset):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, param_source):
+        super().__init__(param_source)
         self.dual_stake_mask = (1 << 1)
 
     def get_initial_state(self):
@@ -326,7 +373,7 @@ class PowerAsset(Asset):
         return 1
 
     def get_agent_addr(self):
-        return HashPowerAgentMock[0]
+        return get_contract_addr("HashPowerAgent")
 
     def distribute_reward(self, validators, delegator_stake_state, round):
         super().distribute_reward(validators, delegator_stake_state, round)
@@ -350,6 +397,10 @@ class PowerAsset(Asset):
     def calc_candidate_stake_amount_list(self, candidate, delegator_stake_state, round):
         return [candidate.get_stake_state().get_round_powers(round - 7)]
 
+    def is_stake_amount_list_changed(self, candidate, delegator_stake_state, round):
+        # the powers of a different round are used in every turn round
+        return True
+
     def claim_reward(
             self,
             round,
@@ -369,14 +420,16 @@ class PowerAsset(Asset):
 
 
 class BtcAsset(Asset):
-    def __init__(self):
-        super().__init__()
+    def __init__(self, param_source):
+        super().__init__(param_source)
         self.dual_stake_mask = (1 << 2)
 
-        self.decimals = BitcoinAgentMock[0].assetWeight()
+        self.decimals = param_source.get("btc_asset_weight")
 
         # btc lst data => single class
         self.btc_lst_round_rewards = {}
+        self.btc_lst_accrued_reward_rounds = []
+        self.btc_lst_accrued_rewards = []
 
     def calc_candidate_stake_amount_list(self, candidate, delegator_stake_state, round):
         amount_list = [0, 0]
@@ -385,6 +438,14 @@ class BtcAsset(Asset):
             amount_list[1] = delegator_stake_state.get_btc_lst_avg_stake_amount()
         return amount_list
 
+    def is_stake_amount_list_changed(self, candidate, delegator_stake_state, round):
+        if super().is_stake_amount_list_changed(candidate, delegator_stake_state, round):
+            return True
+
+        # the btc lst amount is shared by the validators and changes with the validator count
+        amount_list = candidate.get_stake_state().get_round_stake_amount_list(self.name)
+        return candidate.is_validator() or amount_list[1] != 0
+
     def get_initial_state(self):
         return ("BTC", self.get_agent_addr().address, 4000, 0, 2 * (10 ** 14))
 
@@ -392,7 +453,7 @@ class BtcAsset(Asset):
         return 2
 
     def get_agent_addr(self):
-        return BitcoinAgentMock[0]
+        return get_contract_addr("BitcoinAgent")
 
     def create_round_reward(self, reward_amount, stake_amount):
         return BtcRoundReward(reward_amount, stake_amount)
@@ -410,14 +471,21 @@ class BtcAsset(Asset):
         round_reward = self.create_round_reward(reward_amount, stake_amount)
         self.btc_lst_round_rewards[round] = round_reward
 
+        add_accrued_reward(
+            self.btc_lst_accrued_reward_rounds,
+            self.btc_lst_accrued_rewards,
+            round,
+            round_reward.get_reward_per_stake()
+        )
+
     def get_btc_lst_reward_per_stake(self, from_round, to_round):
-        reward_per_stake = 0
-        for round in range(from_round, to_round + 1):
-            round_reward = self.btc_lst_round_rewards.get(round)
-            if round_reward is not None:
-                reward_per_stake += round_reward.get_reward_per_stake()
+        if from_round > to_round:
+            return 0
 
-        return reward_per_stake
+        rounds = self.btc_lst_accrued_reward_rounds
+        accrued_rewards = self.btc_lst_accrued_rewards
+        return get_accrued_reward(rounds, accrued_rewards, to_round) - \
+            get_accrued_reward(rounds, accrued_rewards, from_round - 1)
 
     def distribute_reward(self, validators, delegator_stake_state, round):
         super().distribute_reward(validators, delegator_stake_state, round)
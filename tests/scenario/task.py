@@ -21,6 +21,15 @@ addr_to_name = AccountMgr.addr_to_name
 
 
 class Task(ABC):
+    # a pipelined task sends one transaction through submit() and has a pre_execute that does not read the chain,
+    # the tasks of a round with disjoint access keys are then sent together, see pipeline.py
+    pipelined = False
+
+    def __init__(self):
+        self.chain = None
+        self.verifier = None
+        self.handler = None
+
     @abstractmethod
     def pre_execute(self, params):
         assert self.chain is not None
@@ -38,23 +47,63 @@ class Task(ABC):
     def set_chain_state(self, chain):
         self.chain = chain
 
+    def set_verifier(self, verifier):
+        self.verifier = verifier
+
+        # the checker of an initialized handler follows the verifier
+        if self.handler is not None:
+            self.handler.init_checker(verifier)
+
     @abstractmethod
     def execute(self):
         print(f"\r\nRound {self.round}: Execute task {self.__class__.__name__} ({self.params})")
 
+    def get_access_keys(self):
+        # (read keys, write keys) of a pipelined task, None when it has to be executed alone
+        return None
+
+    def submit(self, required_confs=1):
+        # send the transaction of a pipelined task, with required_confs=0 it does not wait for the receipt
+        pass
+
+    def complete(self, tx_receipt):
+        self.pay_gas(tx_receipt)
+
+    def simulate(self):
+        # model-only execution: the handler updates the off-chain model as if the transaction had been mined
+        Task.execute(self)
+        self.notify_task_ready()
+        self.chain.mine_block()
+        self.notify_task_finish()
+
     def init_task_handler(self):
         HandlerClass = getattr(task_handler, self.__class__.__name__)
         self.handler = HandlerClass()
         self.handler.set_chain(self.chain)
         self.handler.set_task(self)
         self.handler.init_handler()
-        self.handler.init_checker()
+        self.handler.init_checker(self.verifier)
 
     def notify_task_ready(self):
-        self.handler.on_task_ready()
+        # the checks of a callback are sent to the node in one multicall
+        with self.handler.checker.batch():
+            self.handler.on_task_ready()
 
     def notify_task_finish(self):
-        self.handler.on_task_finish()
+        with self.handler.checker.batch():
+            self.handler.on_task_finish()
+
+    def get_btc_tx_proof(self, tx):
+        # (btc block height, merkle nodes, tx index) of a staked BTC transaction. without an SPV relay the
+        # proof is a fake one, accepted by the light client because ConfirmBtcTx sets its check result
+        spv_relay = self.chain.get_spv_relay()
+        if spv_relay is None:
+            return constants.FAKE_BTC_BLOCK_HEIGHT, [], 0
+
+        for tx_receipt in spv_relay.relay_tx_block(tx):
+            self.pay_gas(tx_receipt)
+
+        return spv_relay.get_proof(tx)
 
     def pay_gas(self, tx_receipt):
         gas_price = tx_receipt.gas_price
@@ -91,8 +140,14 @@ class SponsorFund(Task):
         amount = params[1] if len(params) == 2 else random.randint(1, 100)
         self.amount = int(amount * constants.CORE_DECIMALS)
 
-        assert self.amount <= self.sponsor.balance() // 2, \
-            f"The amount is too large, {self.amount}, {self.sponsor.balance() // 2}"
+        if self.chain.is_model_only():
+            self.chain.init_balance(self.sponsor)
+            sponsor_balance = self.chain.get_balance(self.sponsor)
+        else:
+            sponsor_balance = self.sponsor.balance()
+
+        assert self.amount <= sponsor_balance // 2, \
+            f"The amount is too large, {self.amount}, {sponsor_balance // 2}"
 
     def execute(self):
         super().execute()
@@ -111,8 +166,8 @@ class RegisterCandidate(Task):
         assert len(params) >= 2, "Invalid params"
         self.operator_addr = get_operator_addr(params[0])
         self.commission = params[1]
-        self.margin = int(params[2] * constants.CORE_DECIMALS) if len(params) == 3 else CandidateHubMock[
-            0].requiredMargin()
+        self.margin = int(params[2] * constants.CORE_DECIMALS) if len(params) == 3 else \
+            self.chain.get_candidate_required_margin()
         self.consensus_addr = get_consensus_addr(params[0])
         self.fee_addr = get_fee_addr(params[0])
 
@@ -175,6 +230,14 @@ class SlashValidator(Task):
             self.pay_gas(tx_receipt)
             self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+
+        for i in range(self.slash_count):
+            self.notify_task_ready()
+            self.block_number = self.chain.mine_block()
+            self.notify_task_finish()
+
 
 class AddMargin(Task):
     def pre_execute(self, params):
@@ -183,8 +246,8 @@ class AddMargin(Task):
         assert len(params) > 0, f"Invalid params"
 
         self.operator_addr = get_operator_addr(params[0])
-        self.amount = int(params[1] * constants.CORE_DECIMALS) if len(params) == 2 else CandidateHubMock[
-            0].requiredMargin()
+        self.amount = int(params[1] * constants.CORE_DECIMALS) if len(params) == 2 else \
+            self.chain.get_candidate_required_margin()
 
     def execute(self):
         super().execute()
@@ -240,16 +303,24 @@ class GenerateBlock(Task):
         self.block_count = params[0]
         self.sponsor = get_sponsor_addr("S0")
 
+        # the fees are drawn before the blocks are generated, execute and simulate then take the same draws
+        self.tx_fees = [int(random.uniform(0.01, 2) * constants.CORE_DECIMALS) for i in range(self.block_count)]
+
+    def get_miners(self, consensus_addrs):
+        # the miner of each block, a validator set listed in a different order still mines the same blocks
+        miners = sorted(consensus_addrs, key=lambda addr: addr.lower())
+        miner_count = len(miners)
+        return [miners[i % miner_count] for i in range(self.block_count)]
+
     def execute(self):
         super().execute()
 
         # get consensus address list
-        miners = ValidatorSetMock[0].getValidators()
-        miner_count = len(miners)
+        miners = self.get_miners(ValidatorSetMock[0].getValidators())
 
         for i in range(self.block_count):
-            self.miner = miners[i % miner_count]
-            self.tx_fee = int(random.uniform(0.01, 2) * constants.CORE_DECIMALS)
+            self.miner = miners[i]
+            self.tx_fee = self.tx_fees[i]
             self.notify_task_ready()
             tx_receipt = ValidatorSetMock[0].deposit(
                 self.miner, {
@@ -260,6 +331,20 @@ class GenerateBlock(Task):
             print(f"slash count: {i}")
             self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+
+        miners = self.get_miners(
+            [validator.get_consensus_addr() for validator in self.chain.get_validators().values()]
+        )
+
+        for i in range(self.block_count):
+            self.miner = miners[i]
+            self.tx_fee = self.tx_fees[i]
+            self.notify_task_ready()
+            self.block_number = self.chain.mine_block()
+            self.notify_task_finish()
+
 
 class TurnRound(Task):
     def is_supported(self, advanced_round):
@@ -281,8 +366,19 @@ class TurnRound(Task):
             self.pay_gas(tx_receipt)
             self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+
+        for i in range(self.count):
+            self.notify_task_ready()
+            self.chain.mine_block()
+            self.round += 1
+            self.notify_task_finish()
+
 
 class StakeCore(Task):
+    pipelined = True
+
     def pre_execute(self, params):
         super().pre_execute(params)
 
@@ -291,19 +387,28 @@ class StakeCore(Task):
         self.delegatee = get_operator_addr(params[1])
         self.amount = int(params[2] * constants.CORE_DECIMALS)
 
-    def execute(self):
-        super().execute()
-        self.notify_task_ready()
-        tx_receipt = CoreAgentMock[0].delegateCoin(
+    def get_access_keys(self):
+        return {self.delegator}, {self.delegator}
+
+    def submit(self, required_confs=1):
+        return CoreAgentMock[0].delegateCoin(
             self.delegatee, {
                 "value": self.amount,
-                "from": self.delegator
+                "from": self.delegator,
+                "required_confs": required_confs
             })
-        self.pay_gas(tx_receipt)
+
+    def execute(self):
+        super().execute()
+        self.notify_task_ready()
+        tx_receipt = self.submit()
+        self.complete(tx_receipt)
         self.notify_task_finish()
 
 
 class UnstakeCore(Task):
+    pipelined = True
+
     def pre_execute(self, params):
         super().pre_execute(params)
 
@@ -312,19 +417,28 @@ class UnstakeCore(Task):
         self.delegatee = get_operator_addr(params[1])
         self.amount = int(params[2] * constants.CORE_DECIMALS)
 
-    def execute(self):
-        super().execute()
-        self.notify_task_ready()
-        tx_receipt = CoreAgentMock[0].undelegateCoin(
+    def get_access_keys(self):
+        return {self.delegator}, {self.delegator}
+
+    def submit(self, required_confs=1):
+        return CoreAgentMock[0].undelegateCoin(
             self.delegatee,
             self.amount, {
-                "from": self.delegator
+                "from": self.delegator,
+                "required_confs": required_confs
             })
-        self.pay_gas(tx_receipt)
+
+    def execute(self):
+        super().execute()
+        self.notify_task_ready()
+        tx_receipt = self.submit()
+        self.complete(tx_receipt)
         self.notify_task_finish()
 
 
 class TransferCore(Task):
+    pipelined = True
+
     def pre_execute(self, params):
         super().pre_execute(params)
 
@@ -334,16 +448,23 @@ class TransferCore(Task):
         self.to_delegatee = get_operator_addr(params[2])
         self.amount = int(params[3] * constants.CORE_DECIMALS)
 
-    def execute(self):
-        super().execute()
-        self.notify_task_ready()
-        tx_receipt = CoreAgentMock[0].transferCoin(
+    def get_access_keys(self):
+        return {self.delegator}, {self.delegator}
+
+    def submit(self, required_confs=1):
+        return CoreAgentMock[0].transferCoin(
             self.from_delegatee,
             self.to_delegatee,
             self.amount, {
-                "from": self.delegator
+                "from": self.delegator,
+                "required_confs": required_confs
             })
-        self.pay_gas(tx_receipt)
+
+    def execute(self):
+        super().execute()
+        self.notify_task_ready()
+        tx_receipt = self.submit()
+        self.complete(tx_receipt)
         self.notify_task_finish()
 
 
@@ -413,6 +534,10 @@ class CreateStakeLockTx(Task):
         self.chain.add_btc_tx(self.storage_key, txobj)
         self.notify_task_finish()
 
+    def simulate(self):
+        # no transaction is sent
+        self.execute()
+
 
 class CreateLSTLockTx(Task):
     def pre_execute(self, params):
@@ -440,6 +565,10 @@ class CreateLSTLockTx(Task):
         self.chain.add_btc_tx(self.storage_key, txobj)
         self.notify_task_finish()
 
+    def simulate(self):
+        # no transaction is sent
+        self.execute()
+
 
 class ConfirmBtcTx(Task):
     def pre_execute(self, params):
@@ -456,9 +585,23 @@ class ConfirmBtcTx(Task):
     def execute(self):
         super().execute()
         self.notify_task_ready()
-        tx_receipt = BtcLightClientMock[0].setCheckResult(True, self.check_time)
+
+        spv_relay = self.chain.get_spv_relay()
+        if spv_relay is None:
+            tx_receipt = BtcLightClientMock[0].setCheckResult(True, self.check_time)
+            self.pay_gas(tx_receipt)
+        else:
+            # the tx is packed in a block of this time, relayed when it is staked
+            spv_relay.confirm_tx(self.tx, self.check_time)
+
+        self.tx_data.set_block_time(self.check_time)
+        self.notify_task_finish()
+
+    def simulate(self):
+        Task.execute(self)
+        self.notify_task_ready()
+        self.chain.mine_block()
         self.tx_data.set_block_time(self.check_time)
-        self.pay_gas(tx_receipt)
         self.notify_task_finish()
 
 
@@ -479,17 +622,15 @@ class StakeBtc(Task):
     def execute(self):
         super().execute()
 
-        fake_block_height = 100
-        fake_merkle_nodes = []
-        fake_tx_index = 0
+        block_height, merkle_nodes, tx_index = self.get_btc_tx_proof(self.tx)
 
         self.notify_task_ready()
         print(f"redeem_script={self.redeem_script.hex()}")
         tx_receipt = BitcoinStakeMock[0].delegate(
             self.tx.serialize().hex(),
-            fake_block_height,
-            fake_merkle_nodes,
-            fake_tx_index,
+            block_height,
+            merkle_nodes,
+            tx_index,
             self.redeem_script, {
                 'from': self.relayer
             })
@@ -498,6 +639,13 @@ class StakeBtc(Task):
         self.pay_gas(tx_receipt)
         self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+        self.notify_task_ready()
+        self.tx_data.set_block_number(self.chain.mine_block())
+        self.tx_data.set_relayer(self.relayer)
+        self.notify_task_finish()
+
 
 class TransferBtc(Task):
     def pre_execute(self, params):
@@ -569,9 +717,7 @@ class StakeLSTBtc(Task):
     def execute(self):
         super().execute()
 
-        fake_block_height = 100
-        fake_merkle_nodes = []
-        fake_tx_index = 0
+        block_height, merkle_nodes, tx_index = self.get_btc_tx_proof(self.tx)
 
         if self.auto_add_wallet:
             tx_receipt = BitcoinLSTStakeMock[0].updateParam(
@@ -585,9 +731,9 @@ class StakeLSTBtc(Task):
         self.notify_task_ready()
         tx_receipt = BitcoinLSTStakeMock[0].delegate(
             self.tx.serialize().hex(),
-            fake_block_height,
-            fake_merkle_nodes,
-            fake_tx_index,
+            block_height,
+            merkle_nodes,
+            tx_index,
             self.script_pubkey, {
                 'from': self.relayer
             })
@@ -597,8 +743,21 @@ class StakeLSTBtc(Task):
         self.pay_gas(tx_receipt)
         self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+
+        if self.auto_add_wallet:
+            self.chain.mine_block()
+
+        self.notify_task_ready()
+        self.tx_data.set_block_number(self.chain.mine_block())
+        self.tx_data.set_relayer(self.relayer)
+        self.notify_task_finish()
+
 
 class TransferLSTBtc(Task):
+    pipelined = True
+
     def pre_execute(self, params):
         super().pre_execute(params)
 
@@ -608,16 +767,23 @@ class TransferLSTBtc(Task):
         self.to_delegator = get_delegator_addr(params[1])
         self.amount = int(params[2] * constants.BTC_DECIMALS)
 
-    def execute(self):
-        super().execute()
+    def get_access_keys(self):
+        keys = {self.from_delegator, self.to_delegator}
+        return keys, keys
 
-        self.notify_task_ready()
-        tx_receipt = BitcoinLSTToken[0].transfer(
+    def submit(self, required_confs=1):
+        return BitcoinLSTToken[0].transfer(
             self.to_delegator,
             self.amount,
-            {'from': self.from_delegator}
+            {'from': self.from_delegator, 'required_confs': required_confs}
         )
-        self.pay_gas(tx_receipt)
+
+    def execute(self):
+        super().execute()
+
+        self.notify_task_ready()
+        tx_receipt = self.submit()
+        self.complete(tx_receipt)
         self.notify_task_finish()
 
 
@@ -672,6 +838,14 @@ class BurnLSTBtcAndPayBtcToRedeemer(Task):
         self.pay_gas(tx_receipt)
         self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+        self.notify_task_ready()
+        self.create_redeemer_script_pubkey()
+        self.chain.mine_block()
+        self.pay_btc_to_redeemer()
+        self.notify_task_finish()
+
 
 class UnstakeLSTBtc(Task):
     def pre_execute(self, params):
@@ -689,16 +863,14 @@ class UnstakeLSTBtc(Task):
     def execute(self):
         super().execute()
 
-        fake_block_height = 100
-        fake_merkle_nodes = []
-        fake_tx_index = 0
+        block_height, merkle_nodes, tx_index = self.get_btc_tx_proof(self.tx)
 
         self.notify_task_ready()
         tx_receipt = BitcoinLSTStakeMock[0].undelegate(
             self.tx.serialize().hex(),
-            fake_block_height,
-            fake_merkle_nodes,
-            fake_tx_index, {
+            block_height,
+            merkle_nodes,
+            tx_index, {
                 'from': self.relayer
             })
         self.tx_data.set_relayer(self.relayer)
@@ -706,8 +878,17 @@ class UnstakeLSTBtc(Task):
         self.pay_gas(tx_receipt)
         self.notify_task_finish()
 
+    def simulate(self):
+        Task.execute(self)
+        self.notify_task_ready()
+        self.tx_data.set_relayer(self.relayer)
+        self.tx_data.set_block_number(self.chain.mine_block())
+        self.notify_task_finish()
+
 
 class ClaimReward(Task):
+    pipelined = True
+
     def pre_execute(self, params):
         super().pre_execute(params)
 
@@ -718,14 +899,35 @@ class ClaimReward(Task):
             account = get_delegator_addr(account_name)
             self.accounts.append(account)
 
+        self.account = self.accounts[0]
+
+    def get_access_keys(self):
+        # the handler follows one account at a time, a claim for several accounts runs alone
+        if len(self.accounts) > 1:
+            return None
+
+        return {self.account}, {self.account}
+
+    def submit(self, required_confs=1):
+        return StakeHubMock[0].claimReward({'from': self.account, 'required_confs': required_confs})
+
     def execute(self):
         super().execute()
 
         for account in self.accounts:
             self.account = account
             self.notify_task_ready()
-            tx_receipt = StakeHubMock[0].claimReward({'from': account})
-            self.pay_gas(tx_receipt)
+            tx_receipt = self.submit()
+            self.complete(tx_receipt)
+            self.notify_task_finish()
+
+    def simulate(self):
+        Task.execute(self)
+
+        for account in self.accounts:
+            self.account = account
+            self.notify_task_ready()
+            self.chain.mine_block()
             self.notify_task_finish()
 
 
@@ -886,3 +1088,7 @@ class CreatePayment(Task):
         # print(f"dataArr={dataArr}")
         # print(f"part1={part1}")
         # print(f"part2={part2}")
+
+    def simulate(self):
+        # no transaction is sent
+        self.execute()
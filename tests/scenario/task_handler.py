@@ -5,6 +5,7 @@ from . import chain_handler
 from .account_mgr import AccountMgr
 
 addr_to_name = AccountMgr.addr_to_name
+get_contract_addr = AccountMgr.get_contract_addr
 
 
 class TaskHandler(ABC):
@@ -17,11 +18,15 @@ class TaskHandler(ABC):
     def set_task(self, task):
         self.task = task
 
-    def init_checker(self):
+    def init_checker(self, verifier=None):
         assert self.chain is not None
         assert self.task is not None
         self.checker = chain_checker.ChainChecker(self.chain, self.task)
 
+        # deferred verify policies queue the checks instead of running them
+        if verifier is not None:
+            self.checker = verifier.wrap(self.checker)
+
     def init_handler(self):
         assert self.chain is not None
         self.chain_handler = chain_handler.ChainHandler(self.chain)
@@ -39,10 +44,12 @@ class TaskHandler(ABC):
 class SponsorFund(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
+        self.chain.init_balance(self.task.sponsor)
         self.chain.init_balance(self.task.sponsee)
 
     def on_task_finish(self):
         super().on_task_finish()
+        self.chain.add_balance(self.task.sponsor, -self.task.amount)
         self.chain.add_balance(self.task.sponsee, self.task.amount)
         self.check_state()
 
@@ -53,7 +60,7 @@ class SponsorFund(TaskHandler):
 class RegisterCandidate(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
-        self.chain.init_balance(CandidateHubMock[0])
+        self.chain.init_balance(get_contract_addr("CandidateHub"))
         self.chain.init_balance(self.task.fee_addr)
         self.checker.check_balance(self.task.fee_addr)
         self.chain.init_balance(self.task.operator_addr)
@@ -72,15 +79,15 @@ class RegisterCandidate(TaskHandler):
 
     def check_state(self):
         self.checker.check_candidate(self.task.operator_addr)
-        self.checker.check_balance(CandidateHubMock[0])
+        self.checker.check_balance(get_contract_addr("CandidateHub"))
         self.checker.check_balance(self.task.operator_addr)
 
 
 class UnregisterCandidate(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
-        self.chain.init_balance(CandidateHubMock[0])
-        self.chain.init_balance(SystemRewardMock[0])
+        self.chain.init_balance(get_contract_addr("CandidateHub"))
+        self.chain.init_balance(get_contract_addr("SystemReward"))
         self.chain.init_balance(self.task.operator_addr)
         self.candidate = self.chain.get_candidate(self.task.operator_addr)
 
@@ -92,8 +99,8 @@ class UnregisterCandidate(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(CandidateHubMock[0])
-        self.checker.check_balance(SystemRewardMock[0])
+        self.checker.check_balance(get_contract_addr("CandidateHub"))
+        self.checker.check_balance(get_contract_addr("SystemReward"))
         self.checker.check_balance(self.task.operator_addr)
         self.checker.check_candidate_removed(self.candidate)
 
@@ -101,10 +108,10 @@ class UnregisterCandidate(TaskHandler):
 class SlashValidator(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
-        self.chain.init_balance(Burn[0])
-        self.chain.init_balance(Foundation[0])
-        self.chain.init_balance(SystemRewardMock[0])
-        self.chain.init_balance(CandidateHubMock[0])
+        self.chain.init_balance(get_contract_addr("Burn"))
+        self.chain.init_balance(get_contract_addr("Foundation"))
+        self.chain.init_balance(get_contract_addr("SystemReward"))
+        self.chain.init_balance(get_contract_addr("CandidateHub"))
         self.checker.check_slash_indicator(self.task.operator_addr)
 
     def on_task_finish(self):
@@ -116,10 +123,10 @@ class SlashValidator(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(Burn[0])
-        self.checker.check_balance(Foundation[0])
-        self.checker.check_balance(SystemRewardMock[0])
-        self.checker.check_balance(CandidateHubMock[0])
+        self.checker.check_balance(get_contract_addr("Burn"))
+        self.checker.check_balance(get_contract_addr("Foundation"))
+        self.checker.check_balance(get_contract_addr("SystemReward"))
+        self.checker.check_balance(get_contract_addr("CandidateHub"))
         self.checker.check_slash_indicator(self.task.operator_addr)
         self.checker.check_jailed_round(self.task.operator_addr)
         self.checker.check_candidate(self.task.operator_addr)
@@ -130,7 +137,7 @@ class AddMargin(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
         self.chain.init_balance(self.task.operator_addr)
-        self.chain.init_balance(CandidateHubMock[0])
+        self.chain.init_balance(get_contract_addr("CandidateHub"))
 
     def on_task_finish(self):
         super().on_task_finish()
@@ -142,7 +149,7 @@ class AddMargin(TaskHandler):
 
     def check_state(self):
         self.checker.check_balance(self.task.operator_addr)
-        self.checker.check_balance(CandidateHubMock[0])
+        self.checker.check_balance(get_contract_addr("CandidateHub"))
         self.checker.check_candidate(self.task.operator_addr)
 
 
@@ -177,7 +184,7 @@ class AcceptDelegate(TaskHandler):
 class GenerateBlock(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
-        self.chain.init_balance(ValidatorSetMock[0])
+        self.chain.init_balance(get_contract_addr("ValidatorSet"))
 
     def on_task_finish(self):
         super().on_task_finish()
@@ -190,7 +197,7 @@ class GenerateBlock(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(ValidatorSetMock[0])
+        self.checker.check_balance(get_contract_addr("ValidatorSet"))
         self.checker.check_validator_income(self.task.miner)
         self.checker.check_total_income()
 
@@ -198,11 +205,11 @@ class GenerateBlock(TaskHandler):
 class TurnRound(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
-        self.chain.init_balance(Burn[0])
-        self.chain.init_balance(Foundation[0])
-        self.chain.init_balance(SystemRewardMock[0])
-        self.chain.init_balance(ValidatorSetMock[0])
-        self.chain.init_balance(StakeHubMock[0])
+        self.chain.init_balance(get_contract_addr("Burn"))
+        self.chain.init_balance(get_contract_addr("Foundation"))
+        self.chain.init_balance(get_contract_addr("SystemReward"))
+        self.chain.init_balance(get_contract_addr("ValidatorSet"))
+        self.chain.init_balance(get_contract_addr("StakeHub"))
         self.checker.check_candidate_statuses()
         self.checker.check_validator_incomes()
         self.checker.check_validator_scores()
@@ -220,11 +227,11 @@ class TurnRound(TaskHandler):
         self.checker.check_validator_incomes()
         self.checker.check_validator_stake_amounts()
         self.checker.check_validator_scores()
-        self.checker.check_balance(Burn[0])
-        self.checker.check_balance(Foundation[0])
-        self.checker.check_balance(SystemRewardMock[0])
-        self.checker.check_balance(ValidatorSetMock[0])
-        self.checker.check_balance(StakeHubMock[0])
+        self.checker.check_balance(get_contract_addr("Burn"))
+        self.checker.check_balance(get_contract_addr("Foundation"))
+        self.checker.check_balance(get_contract_addr("SystemReward"))
+        self.checker.check_balance(get_contract_addr("ValidatorSet"))
+        self.checker.check_balance(get_contract_addr("StakeHub"))
 
         # print(f"ROUND={self.chain.get_round()} validate set")
         # for validator in self.chain.get_validators().values():
@@ -261,7 +268,7 @@ class StakeCore(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
         self.chain.init_balance(self.task.delegator)
-        self.chain.init_balance(CoreAgentMock[0])
+        self.chain.init_balance(get_contract_addr("CoreAgent"))
         self.checker.check_core_history_reward(self.task.delegator)
 
     def on_task_finish(self):
@@ -274,7 +281,7 @@ class StakeCore(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(CoreAgentMock[0])
+        self.checker.check_balance(get_contract_addr("CoreAgent"))
         self.checker.check_balance(self.task.delegator)
         self.checker.check_candidate_core_realtime_amount(self.task.delegatee)
         self.checker.check_delegator_core_realtime_amount(self.task.delegator, self.task.delegatee)
@@ -289,7 +296,7 @@ class UnstakeCore(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
         self.chain.init_balance(self.task.delegator)
-        self.chain.init_balance(CoreAgentMock[0])
+        self.chain.init_balance(get_contract_addr("CoreAgent"))
         self.checker.check_core_history_reward(self.task.delegator)
 
     def on_task_finish(self):
@@ -302,7 +309,7 @@ class UnstakeCore(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(CoreAgentMock[0])
+        self.checker.check_balance(get_contract_addr("CoreAgent"))
         self.checker.check_balance(self.task.delegator)
         self.checker.check_candidate_core_realtime_amount(self.task.delegatee)
         self.checker.check_delegator_core_realtime_amount(self.task.delegator, self.task.delegatee)
@@ -318,7 +325,7 @@ class TransferCore(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
         self.chain.init_balance(self.task.delegator)
-        self.chain.init_balance(CoreAgentMock[0])
+        self.chain.init_balance(get_contract_addr("CoreAgent"))
         self.checker.check_core_history_reward(self.task.delegator)
 
     def on_task_finish(self):
@@ -333,7 +340,7 @@ class TransferCore(TaskHandler):
         self.check_state()
 
     def check_state(self):
-        self.checker.check_balance(CoreAgentMock[0])
+        self.checker.check_balance(get_contract_addr("CoreAgent"))
         self.checker.check_balance(self.task.delegator)
         self.checker.check_candidate_core_realtime_amount(self.task.from_delegatee)
         self.checker.check_candidate_core_realtime_amount(self.task.to_delegatee)
@@ -530,13 +537,13 @@ class ClaimReward(TaskHandler):
     def on_task_ready(self):
         super().on_task_ready()
         self.chain.init_balance(self.task.account)
-        self.chain.init_balance(StakeHubMock[0])
-        self.chain.init_balance(SystemRewardMock[0])
+        self.chain.init_balance(get_contract_addr("StakeHub"))
+        self.chain.init_balance(get_contract_addr("SystemReward"))
 
         # in fact the relayer has no rewards
         self.checker.check_creditor_contributions(self.task.account)
-        self.checker.check_balance(StakeHubMock[0])
-        self.checker.check_balance(SystemRewardMock[0])
+        self.checker.check_balance(get_contract_addr("StakeHub"))
+        self.checker.check_balance(get_contract_addr("SystemReward"))
         self.checker.check_history_reward(self.task.account)
         self.checker.check_balance(self.task.account)
         self.checker.check_total_unclaimed_reward()
@@ -551,8 +558,8 @@ class ClaimReward(TaskHandler):
         self.checker.check_history_reward(self.task.account)
         self.checker.check_balance(self.task.account)
         self.checker.check_total_unclaimed_reward()
-        self.checker.check_balance(SystemRewardMock[0])
-        self.checker.check_balance(StakeHubMock[0])
+        self.checker.check_balance(get_contract_addr("SystemReward"))
+        self.checker.check_balance(get_contract_addr("StakeHub"))
         # in fact the relayer has no rewards
         self.checker.check_creditor_contributions(self.task.account)
 
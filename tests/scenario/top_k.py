@@ -0,0 +1,42 @@
+# select the count items with the largest keys, in the same way as CandidateHub.getValidators:
+# an in-place quickselect with the first item of the range as pivot, so that ties and the order
+# of the selected items match the validator list on chain
+def select_top_k(items, count, key):
+    size = len(items)
+    if count >= size:
+        return list(items)
+
+    # the keys are calculated once and moved together with the items
+    items = list(items)
+    keys = [key(item) for item in items]
+
+    l = 0
+    r = size - 1
+    while l < r:
+        # partition
+        ll = l
+        rr = r
+        back = items[ll]
+        p = keys[ll]
+        while ll < rr:
+            while ll < rr and keys[rr] < p:
+                rr -= 1
+            items[ll] = items[rr]
+            keys[ll] = keys[rr]
+            while ll < rr and keys[ll] >= p:
+                ll += 1
+            items[rr] = items[ll]
+            keys[rr] = keys[ll]
+        items[ll] = back
+        keys[ll] = p
+        mid = ll
+
+        # sub sort
+        if mid < count:
+            l = mid + 1
+        elif mid > count:
+            r = mid - 1
+        else:
+            break
+
+    return items[:count]
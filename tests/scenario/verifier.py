@@ -0,0 +1,136 @@
+import random
+import re
+from . import chain_checker
+from . import invariants
+
+# every check runs as soon as the task handler asks for it
+EVERY_TASK = "every-task"
+# checks are queued and run once at the end of each round
+PER_ROUND = "per-round"
+# at the end of each round every queued check runs with probability p, the rest stay queued
+SAMPLED = "sampled"
+# checks are queued and run once at the end of the scenario
+FINAL_ONLY = "final-only"
+# there is no chain to check against, the checks are dropped and the model invariants run at the end of each round
+MODEL_ONLY = "model-only"
+
+
+def parse_policy(policy):
+    if policy in [EVERY_TASK, PER_ROUND, FINAL_ONLY, MODEL_ONLY]:
+        return policy, 1.0
+
+    match = re.fullmatch(r"sampled\((0(\.\d+)?|1(\.0+)?)\)", policy)
+    assert match is not None, f"Invalid verify policy {policy}"
+
+    return SAMPLED, float(match.group(1))
+
+
+def get_check_key(check_name, args):
+    # a removed candidate can not pass check_candidate any more, both checks share one key
+    # so the latest one replaces the queued one
+    if check_name == "check_candidate_removed":
+        return f"candidate:{args[0].get_operator_addr()}"
+
+    key = check_name[len("check_"):]
+    for arg in args:
+        key += f":{arg}"
+
+    return key
+
+
+class DeferredChecker:
+    def __init__(self, checker, verifier):
+        self.checker = checker
+        self.verifier = verifier
+
+    def __getattr__(self, name):
+        attr = getattr(self.checker, name)
+        if not name.startswith("check_"):
+            return attr
+
+        def queue_check(*args):
+            self.verifier.queue_check(name, args)
+
+        return queue_check
+
+
+class NullChecker:
+    def __init__(self, checker):
+        self.checker = checker
+
+    def __getattr__(self, name):
+        attr = getattr(self.checker, name)
+        if not name.startswith("check_"):
+            return attr
+
+        def drop_check(*args):
+            pass
+
+        return drop_check
+
+
+class Verifier:
+    def __init__(self, policy=EVERY_TASK, seed=None):
+        self.policy = policy
+        self.mode, self.probability = parse_policy(policy)
+
+        # sampling has its own random source, so the tasks see the same random sequence in every mode
+        self.random = random.Random(seed)
+
+        # key => (check name, args), in the order the checks were queued
+        self.queued_checks = {}
+
+    def get_policy(self):
+        return self.policy
+
+    def get_queued_check_count(self):
+        return len(self.queued_checks)
+
+    def is_deferred(self):
+        return self.mode != EVERY_TASK
+
+    def wrap(self, checker):
+        if not self.is_deferred():
+            return checker
+
+        if self.mode == MODEL_ONLY:
+            return NullChecker(checker)
+
+        return DeferredChecker(checker, self)
+
+    def queue_check(self, check_name, args):
+        key = get_check_key(check_name, args)
+
+        # the state is compared when the check runs, so only the latest request of a key is kept
+        self.queued_checks.pop(key, None)
+        self.queued_checks[key] = (check_name, args)
+
+    def on_round_finish(self, chain):
+        if self.mode == MODEL_ONLY:
+            invariants.check_model_invariants(chain)
+        elif self.mode == PER_ROUND:
+            self.run_checks(chain, list(self.queued_checks.keys()))
+        elif self.mode == SAMPLED:
+            keys = [key for key in self.queued_checks.keys() if self.random.random() < self.probability]
+            self.run_checks(chain, keys)
+
+    def on_scenario_finish(self, chain):
+        if self.mode == MODEL_ONLY:
+            invariants.check_model_invariants(chain)
+
+        self.run_queued_checks(chain)
+
+    def run_queued_checks(self, chain):
+        self.run_checks(chain, list(self.queued_checks.keys()))
+
+    def run_checks(self, chain, keys):
+        if len(keys) == 0:
+            return
+
+        print(f"Round {chain.get_round()}: Run {len(keys)} of {len(self.queued_checks)} queued checks ({self.policy})")
+
+        checker = chain_checker.ChainChecker(chain, None)
+        with checker.batch():
+            for key in keys:
+                check_name, args = self.queued_checks.pop(key)
+                getattr(checker, check_name)(*args)
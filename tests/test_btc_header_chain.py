@@ -0,0 +1,67 @@
+import pytest
+from .btc_header_chain import generate_header_chain, load_header_chain, target_from_bits, to_compact_bits, \
+    retarget_bits, block_work, double_sha256, DIFFICULTY_ADJUSTMENT_INTERVAL, EASY_BITS, CORE_MAGIC
+
+
+def check_proof_of_work(genesis, blocks):
+    # the checks of BtcLightClient.checkProofOfWork along a branch
+    adjustment_times = {genesis.height // DIFFICULTY_ADJUSTMENT_INTERVAL: genesis.time}
+    prev = genesis
+    for block in blocks:
+        header = block.get_header()
+        assert double_sha256(header)[::-1] == block.block_hash
+        assert header[4:36][::-1] == prev.block_hash
+        assert block.height == prev.height + 1
+        assert int.from_bytes(block.block_hash, 'big') <= target_from_bits(block.bits)
+
+        if block.height % DIFFICULTY_ADJUSTMENT_INTERVAL != 0:
+            assert block.bits == prev.bits
+        else:
+            start_time = adjustment_times[prev.height // DIFFICULTY_ADJUSTMENT_INTERVAL]
+            new_bits = retarget_bits(prev.bits, prev.time - start_time)
+            assert block.bits == new_bits or new_bits == 0
+            adjustment_times[block.height // DIFFICULTY_ADJUSTMENT_INTERVAL] = block.time
+        prev = block
+
+
+@pytest.mark.parametrize("bits", [EASY_BITS, 0x17053894, 0x1d00ffff, 0x207fffff])
+def test_compact_bits(bits):
+    assert to_compact_bits(target_from_bits(bits)) == bits
+
+
+def test_header_chain_across_retarget_boundaries():
+    genesis_height = 400 * DIFFICULTY_ADJUSTMENT_INTERVAL - 10
+    chain = generate_header_chain(2 * DIFFICULTY_ADJUSTMENT_INTERVAL + 20, 1, genesis_height)
+    check_proof_of_work(chain.get_genesis(), chain.get_blocks())
+
+    # the degenerate paths of EASY_BITS: the retargets are skipped and the blocks add no chain work
+    assert set(block.bits for block in chain.get_blocks()) == {EASY_BITS}
+    assert block_work(EASY_BITS) == 0
+    blocks = [chain.get_genesis()] + chain.get_blocks()
+    period_start = chain.get_genesis()
+    for prev, block in zip(blocks, blocks[1:]):
+        if block.height % DIFFICULTY_ADJUSTMENT_INTERVAL == 0:
+            assert retarget_bits(prev.bits, prev.time - period_start.time) == 0
+            period_start = block
+
+    for block in chain.get_blocks():
+        coinbase_output = block.block_bytes[-(2 + 4 + 1 + 40 + 4):-4]
+        assert coinbase_output[2:6] == CORE_MAGIC and coinbase_output[7:27] == block.candidate
+        assert coinbase_output[27:47] == block.reward_addr
+
+
+def test_header_chain_forks(tmp_path):
+    genesis_height = 400 * DIFFICULTY_ADJUSTMENT_INTERVAL
+    forks = [(genesis_height + 10, 3), (genesis_height + 40, 12)]
+    chain = load_header_chain(50, 2, genesis_height, forks, cache_dir=str(tmp_path))
+    blocks = chain.get_blocks()
+
+    for (fork_height, fork_length), fork in zip(forks, chain.get_forks()):
+        assert len(fork) == fork_length and fork[0].height == fork_height
+        branch = [block for block in blocks if block.height < fork_height] + fork
+        check_proof_of_work(chain.get_genesis(), branch)
+        assert fork[0].block_hash != blocks[fork_height - genesis_height - 1].block_hash
+
+    cached_chain = load_header_chain(50, 2, genesis_height, forks, cache_dir=str(tmp_path))
+    assert [block.block_bytes for block in cached_chain.get_blocks()] == [block.block_bytes for block in blocks]
+    assert cached_chain.get_forks()[1][-1].block_hash == chain.get_forks()[1][-1].block_hash
@@ -7,6 +7,7 @@ from brownie.network import gas_price
 from .utils import expect_event, get_tracker, padding_left, encode_args_with_signature
 from .common import register_relayer
 from .btc_block_data import btc_block_data
+from .btc_header_chain import load_header_chain, DIFFICULTY_ADJUSTMENT_INTERVAL
 
 
 def teardown_module():
@@ -195,6 +196,31 @@ def test_get_round_candidates(btc_light_client):
         assert c in result
 
 
+def test_synthetic_chain_retarget_and_reorg(btc_light_client):
+    # the synthetic blocks take the degenerate paths of EASY_BITS: the retarget at the boundary is skipped, and a
+    # block adds no chain work, so a fork block takes the tip once relayed. the next main chain block takes it
+    # back and walks height2HashMap back over the fork
+    genesis_height = 400 * DIFFICULTY_ADJUSTMENT_INTERVAL - 10
+    chain = load_header_chain(30, 3, genesis_height, forks=[(genesis_height + 25, 5)])
+    blocks = chain.get_blocks()
+    fork = chain.get_forks()[0]
+
+    btc_light_client.resetInitBlock(chain.get_genesis().get_header(), genesis_height)
+    for block in blocks[:-1]:
+        tx = btc_light_client.storeBlockHeader(block.get_hex())
+        assert 'StoreHeaderFailed' not in tx.events
+    for block in fork:
+        btc_light_client.storeBlockHeader(block.get_hex())
+        assert btc_light_client.heaviestBlock() == '0x' + block.block_hash.hex()
+    assert btc_light_client.height2HashMap(fork[-1].height) == '0x' + fork[-1].block_hash.hex()
+
+    btc_light_client.storeBlockHeader(blocks[-1].get_hex())
+    assert btc_light_client.heaviestBlock() == '0x' + blocks[-1].block_hash.hex()
+    assert btc_light_client.getChainTipHeight() == blocks[-1].height
+    for block in blocks[-len(fork) - 1:]:
+        assert btc_light_client.height2HashMap(block.height) == '0x' + block.block_hash.hex()
+
+
 def test_store_btc_block_gasprice_limit_failed(btc_light_client):
     gas_price(store_block_header_tx_gas_price // 2)
     block_data = btc_block_data[-2]
@@ -1533,6 +1533,67 @@ def test_no_reward_generated_in_current_round(btc_lst_stake, btc_agent):
     assert accrued_reward == round_reward * 2 + history_reward0
 
 
+def test_reward_after_idle_rounds(btc_lst_stake, btc_agent):
+    validators = accounts[:3]
+    reward_list = [1000, 20000, 30000]
+    stake_amount = 10000
+    update_system_contract_address(btc_lst_stake, btc_agent=accounts[0])
+    round_tag = get_current_round() + 1
+    btc_lst_stake.setStakedAmount(stake_amount)
+    for r in [round_tag, round_tag + 1, round_tag + 2]:
+        btc_lst_stake.setRoundTag(r)
+        btc_lst_stake.distributeReward(validators, reward_list)
+    assert btc_lst_stake.getContinuousRewardEndRounds() == [round_tag + 2]
+    round_reward = sum(reward_list) * Utils.BTC_DECIMAL // stake_amount
+    idle_round = round_tag + 1000
+    btc_lst_stake.setRoundTag(idle_round)
+    btc_lst_stake.distributeReward(validators, reward_list)
+    assert btc_lst_stake.getAccruedRewardPerBTCMap(idle_round) == round_reward * 4
+    assert btc_lst_stake.getContinuousRewardEndRounds() == [round_tag + 2, idle_round]
+
+
+def test_claim_reward_after_idle_rounds(btc_lst_stake, btc_agent):
+    stake_amount = 10000
+    history_reward = 50000
+    update_system_contract_address(btc_lst_stake, btc_agent=accounts[0])
+    round_tag = get_current_round() + 1
+    btc_lst_stake.setAccruedRewardPerBTCMap(round_tag, history_reward)
+    btc_lst_stake.setUserStakeInfo(accounts[1], round_tag, stake_amount, stake_amount)
+    btc_lst_stake.setRoundTag(round_tag + 1001)
+    tx = btc_lst_stake.claimReward(accounts[1])
+    reward, _, acc_staked_amount = tx.return_value
+    assert reward == stake_amount * history_reward // Utils.BTC_DECIMAL
+    assert acc_staked_amount == stake_amount * 1001
+
+
+def test_claim_reward_after_upgrade_without_reward_index(btc_lst_stake, btc_agent):
+    validators = accounts[:3]
+    reward_list = [1000, 20000, 30000]
+    stake_amount = 10000
+    update_system_contract_address(btc_lst_stake, btc_agent=accounts[0])
+    round_reward = sum(reward_list) * Utils.BTC_DECIMAL // stake_amount
+    history_reward = round_reward * 3
+    round_tag = get_current_round() + 1
+    # the accrued reward map of a live chain has gaps and no continuousRewardEndRounds
+    btc_lst_stake.setLegacyAccruedRewardPerBTCMap(round_tag, history_reward)
+    btc_lst_stake.setLegacyAccruedRewardPerBTCMap(round_tag + 2, history_reward)
+    btc_lst_stake.setStakedAmount(stake_amount)
+    btc_lst_stake.setUserStakeInfo(accounts[1], round_tag + 1, stake_amount, stake_amount)
+    btc_lst_stake.setUserStakeInfo(accounts[2], round_tag + 2, stake_amount, stake_amount)
+    btc_lst_stake.setUserStakeInfo(accounts[3], round_tag + 4, stake_amount, stake_amount)
+    upgrade_round = round_tag + 10
+    btc_lst_stake.setRoundTag(upgrade_round)
+    btc_lst_stake.distributeReward(validators, reward_list)
+    assert btc_lst_stake.getAccruedRewardPerBTCMap(upgrade_round) == history_reward + round_reward
+    # the first distribution after the upgrade indexes the rounds distributed before it
+    assert btc_lst_stake.getContinuousRewardEndRounds() == [round_tag, round_tag + 2, upgrade_round]
+    btc_lst_stake.setRoundTag(upgrade_round + 100)
+    for delegator in accounts[1:4]:
+        tx = btc_lst_stake.claimReward(delegator)
+        reward, _, _ = tx.return_value
+        assert reward == stake_amount * round_reward // Utils.BTC_DECIMAL
+
+
 def test_distribute_reward_only_btc_agent_can_call(btc_lst_stake, btc_agent):
     validators = accounts[:3]
     reward_list = [1000, 20000, 30000]
@@ -1601,6 +1662,12 @@ def test_btc_lst_claim_reward_success(btc_agent, btc_stake, btc_lst_stake, set_c
     assert btc_lst_stake.rewardMap(accounts[0]) == [0, 0]
 
 
+def test_collect_reward_range_finishes_where_it_starts(btc_lst_stake):
+    update_system_contract_address(btc_lst_stake, stake_hub=accounts[0])
+    assert btc_lst_stake.collectRewardRange(accounts[1], 0, 10) == [0, True]
+    assert btc_lst_stake.collectRewardRange(accounts[1], 3, 10) == [3, True]
+
+
 def test_lst_claim_reward_only_btc_agent_can_call(btc_agent, btc_stake, btc_lst_stake, set_candidate):
     with brownie.reverts("the msg sender must be bitcoin agent contract"):
         btc_lst_stake.claimReward(accounts[0])
@@ -0,0 +1,68 @@
+import hashlib
+import random
+import pytest
+from .btc_merkle import MerkleTree, get_merkle_root, verify_merkle_proof, double_sha256
+
+# bitcoin block 100000
+BLOCK_TXIDS = [
+    "8c14f0db3df150123e6f3dbbf30f8b955a8249b62ac1d1ff16284aefa3d06d87",
+    "fff2525b8931402dd09222c50775608f75787bd2b87e56995a7bdd30f79702c4",
+    "6359f0868171b1d194cbee1af2f16ea598ae8fad666d9b012c8ed2b79a236ec4",
+    "e9a66845e05d5abc0ad04ec80f774a7e585c6e8db975962d069a522137b80c1d"
+]
+BLOCK_MERKLE_ROOT = "f3e94742aca4b5ef85488dc37c06c3282295ffec960994b2c0d5ac2a25a95766"
+
+# script tree roots of P2TR_SCRIPT for the leaves sha256(0xc0 || i), i < leaf count. the roots of 3, 5, 6 and 7
+# leaves differ from the ones of the loop P2TR_SCRIPT used before btc_merkle, which dropped the last node of an
+# odd level
+SCRIPT_TREE_ROOTS = {
+    1: "e9aff84fdb699ca706c0a1fed47bb095cb25e3c95aa5d1c5d216ff2cfbcd4998",
+    2: "36d7388a3a6a239cde84fa8e624218550c51f127c920c6bd79de803ace2d1456",
+    3: "1490f9cab39b44e3337676282fd370b3779860e9b2b4a02137cb47f57219616c",
+    4: "ab68971525e53123ce9dc209345d0c2ae0671d0b17d7454691fda4a2c2867fbe",
+    5: "0b47ad5e30f1f9dd6eebb6965364bc772917b48c5e5c7690daec25de23df2713",
+    6: "8be5809e6078f9ebde63d55c9db5574fe0eb818511afc14b04ec2ee526390b70",
+    7: "bcd269e333d21f54d8e902351f0d40d6aa22a127a8b0f95d3780b4089beed64a",
+    8: "5884132d2d3d7254745cb05e1a757aeb486d76de1001e7b0cd9c8ba0074c8d20"
+}
+
+
+def build_merkle_root(leaves):
+    nodes = list(leaves)
+    while len(nodes) > 1:
+        if len(nodes) % 2 == 1:
+            nodes.append(nodes[-1])
+        nodes = [double_sha256(nodes[i] + nodes[i + 1]) for i in range(0, len(nodes), 2)]
+    return nodes[0]
+
+
+def test_block_merkle_root():
+    txids = [bytes.fromhex(txid)[::-1] for txid in BLOCK_TXIDS]
+    assert get_merkle_root(txids) == bytes.fromhex(BLOCK_MERKLE_ROOT)[::-1]
+
+
+@pytest.mark.parametrize("leaf_count", sorted(SCRIPT_TREE_ROOTS.keys()))
+def test_script_tree_root(leaf_count):
+    leaves = [hashlib.sha256(bytes.fromhex("c0") + bytes([i])).digest() for i in range(leaf_count)]
+    assert get_merkle_root(leaves).hex() == SCRIPT_TREE_ROOTS[leaf_count]
+
+
+@pytest.mark.parametrize("leaf_count", [1, 2, 3, 5, 8, 13, 64, 100])
+def test_merkle_proofs(leaf_count):
+    rng = random.Random(leaf_count)
+    leaves = [rng.randbytes(32) for _ in range(leaf_count)]
+    tree = MerkleTree(leaves)
+    root = tree.get_root()
+    assert root == build_merkle_root(leaves)
+
+    proofs = tree.get_all_proofs()
+    assert len(proofs) == leaf_count
+    for i, leaf in enumerate(leaves):
+        assert tree.get_leaf(i) == leaf
+        assert proofs[i] == tree.get_proof(i)
+        assert len(proofs[i]) == tree.get_depth()
+        assert verify_merkle_proof(leaf, proofs[i], i, root)
+
+    if leaf_count > 1:
+        assert not verify_merkle_proof(leaves[0], proofs[1], 0, root)
+        assert not verify_merkle_proof(leaves[1], proofs[1], 0, root)
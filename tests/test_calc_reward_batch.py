@@ -0,0 +1,52 @@
+import random
+import pytest
+from .calc_reward import parse_delegation, set_delegate, set_btc_lst_delegate
+from .calc_reward_batch import BatchDelegation, parse_delegation_batch
+from .constant import *
+
+
+def make_delegation(rng, agent_count, delegator_count):
+    agents = []
+    for i in range(agent_count):
+        agent = {"address": f"v{i}", "active": True}
+        for asset, decimal in [['coin', Utils.CORE_STAKE_DECIMAL * 10 ** 12], ['power', 1], ['btc', 10 ** 6]]:
+            stake_list = []
+            for j in range(rng.randint(0, 2 * delegator_count // agent_count + 1)):
+                value = rng.randint(1, 1000) * decimal
+                undelegate_amount = rng.randint(0, value // 2) if asset != 'power' and rng.random() < 0.3 else 0
+                stake_duration = rng.choice([10, 45, 100, 200, 400])
+                stake_list.append(
+                    set_delegate(f"d{rng.randrange(delegator_count)}", value, undelegate_amount, stake_duration))
+            agent[asset] = stake_list
+        agents.append(agent)
+
+    btc_lst_stake = {}
+    for i in range(rng.randint(0, delegator_count // 3)):
+        delegate_amount = rng.randint(1, 10 ** 8)
+        btc_lst_stake[f"d{rng.randrange(delegator_count)}"] = set_btc_lst_delegate(
+            delegate_amount, rng.randint(0, delegate_amount // 2))
+
+    return agents, btc_lst_stake
+
+
+@pytest.mark.parametrize("state_map", [
+    {},
+    {'core_lp': 1},
+    {'core_lp': 1, 'btc_gradeActive': 0, 'btc_lst_gradeActive': 0},
+    {'btc_lst_gradeActive': 0, 'percentage': 2000},
+])
+@pytest.mark.parametrize("block_reward", [13545, 3 * 10 ** 18, 2 ** 70])
+def test_batch_reward_matches_parse_delegation(state_map, block_reward):
+    rng = random.Random(block_reward)
+    for i in range(10):
+        agents, btc_lst_stake = make_delegation(rng, rng.randint(1, 6), rng.randint(1, 40))
+        delegation = BatchDelegation.from_agents(agents, btc_lst_stake)
+
+        compensation_reward = {'reward_pool': 0, 'system_reward': 100000000}
+        batch_compensation_reward = dict(compensation_reward)
+        expected = parse_delegation(agents, block_reward, btc_lst_stake, dict(state_map), compensation_reward)
+        actual = parse_delegation_batch(delegation, block_reward, dict(state_map), batch_compensation_reward)
+
+        for expected_item, actual_item in zip(expected, actual.to_dicts()):
+            assert dict(expected_item) == dict(actual_item)
+        assert compensation_reward == batch_compensation_reward
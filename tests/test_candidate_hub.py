@@ -8,6 +8,7 @@ from brownie.test import given, strategy
 from brownie.network.transaction import Status, TransactionReceipt
 from .utils import random_address, expect_event
 from .common import register_candidate, turn_round, get_candidate
+from .scenario.top_k import select_top_k
 
 
 @pytest.fixture(scope="module")
@@ -415,6 +416,50 @@ def test_get_validators(candidate_hub):
         assert len(validator_list) == expect_count
 
 
+@pytest.mark.parametrize("layout", ['random', 'sorted', 'reverse', 'few-distinct', 'all-equal'])
+def test_select_top_k_matches_get_validators(candidate_hub, layout):
+    candidates = [Account.create(str(random.random())).address for i in range(60)]
+    if layout == 'random':
+        scores = [random.randint(0, 10 ** 20) for i in range(60)]
+    elif layout == 'sorted':
+        scores = list(range(60))
+    elif layout == 'reverse':
+        scores = list(range(60, 0, -1))
+    elif layout == 'few-distinct':
+        scores = [random.randint(0, 3) for i in range(60)]
+    else:
+        scores = [100] * 60
+
+    # the off-chain selection keeps the same validators in the same order, ties included
+    for count in [1, 21, 59, 60, 61]:
+        validator_list = candidate_hub.getValidatorsMock(candidates, scores, count)
+        indexes = select_top_k(list(range(60)), count, key=lambda i: scores[i])
+        assert list(validator_list) == [candidates[i] for i in indexes]
+
+
+@pytest.mark.parametrize("layout", ['all-equal', 'few-distinct', 'sorted', 'reverse', 'random'])
+@pytest.mark.parametrize("candidate_count", [60, 200])
+def test_get_validators_matches_quickselect(candidate_hub, layout, candidate_count):
+    candidates = [random_address() for i in range(candidate_count)]
+    if layout == 'random':
+        scores = [random.randint(0, 10 ** 20) for i in range(candidate_count)]
+    elif layout == 'few-distinct':
+        scores = [random.randint(0, 3) for i in range(candidate_count)]
+    elif layout == 'sorted':
+        scores = list(range(candidate_count))
+    elif layout == 'reverse':
+        scores = list(range(candidate_count, 0, -1))
+    else:
+        scores = [100] * candidate_count
+
+    # the validators, their order and the ties are the ones turnRound has always passed to ValidatorSet, whether
+    # the partitions move on to the score tree or not
+    for count in [0, 1, 21, candidate_count - 1, candidate_count, candidate_count + 1]:
+        quickselect_list = candidate_hub.getValidatorsQuickselectMock(candidates, scores, count)
+        assert list(candidate_hub.getValidatorsMock(candidates, scores, count)) == list(quickselect_list)
+        assert list(candidate_hub.getValidatorsScoreTreeMock(candidates, scores, count)) == list(quickselect_list)
+
+
 def test_jail_validator(candidate_hub, validator_set, required_margin):
     fee_address = random_address()
 
@@ -6,7 +6,8 @@ from brownie.network import gas_price
 from .utils import expect_event, get_tracker, padding_left, encode_args_with_signature
 from .common import register_relayer
 from .btc_block_data import btc_block_data
-import hashlib, json, binascii
+from .btc_merkle import MerkleTree
+import json, binascii
 import random
 
 
@@ -1434,44 +1435,7 @@ for h in block['tx']:
     txids.append(bytes.fromhex(h)[::-1])
 
 
-def Hash(msg):
-    return hashlib.sha256(hashlib.sha256(msg).digest()).digest()
-
-
-def build_merkle_tree_from_txids(txids):
-    merkle_tree = []
-    for h in txids:
-        merkle_tree.append(h)
-
-    size = len(txids)
-    j = 0
-    while size > 1:
-        for i in range(0, size, 2):
-            i2 = min(i + 1, size - 1)
-            merkle_tree.append(Hash(merkle_tree[j + i] + merkle_tree[j + i2]))
-
-        j += size
-        size = (size + 1) // 2
-
-    return merkle_tree
-
-
-def get_intermediate_nodes(txids, tx_index: int):
-    merkle_tree = build_merkle_tree_from_txids(txids)
-    intermediate_nodes = []
-    size = len(txids)
-    offset = 0
-    node_index = tx_index
-    while size > 1:
-        if tx_index % 2 == 0:
-            intermediate_nodes.append(merkle_tree[node_index + 1 if tx_index + 1 < size else node_index])
-        else:
-            intermediate_nodes.append(merkle_tree[node_index - 1])
-        tx_index >>= 1
-        offset += size
-        node_index = tx_index + offset
-        size = (size + 1) // 2
-    return intermediate_nodes
+merkle_tree = MerkleTree(txids)
 
 
 def test_check_tx_proof_not_confirm(btc_light_client):
@@ -1482,7 +1446,7 @@ def test_check_tx_proof_not_confirm(btc_light_client):
         btc_light_client.storeBlockHeader(btc_block_data[idx])
         idx += 1
 
-    nodes = get_intermediate_nodes(txids, 0)
+    nodes = merkle_tree.get_proof(0)
     nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
     result = btc_light_client.checkTxProof(txids[0], 717700, 5, nodes, 0)
     assert result is False
@@ -1496,14 +1460,14 @@ def test_check_tx_proof_success(btc_light_client):
         btc_light_client.storeBlockHeader(btc_block_data[idx])
         idx += 1
     for i in range(len(txids)):
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         assert btc_light_client.checkTxProof(txids[i], 717700, 2, nodes, i)
     for _ in range(6, 10):
         btc_light_client.storeBlockHeader(btc_block_data[idx])
         idx += 1
     for i in range(len(txids)):
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         assert btc_light_client.checkTxProof(txids[i], 717700, 7, nodes, i) is False
 
@@ -1518,7 +1482,7 @@ def test_update_confirm_block_and_check_tx_proof(btc_light_client, confirm_block
         idx += 1
     assert btc_light_client.getChainTipHeight() == height
     for i in range(len(txids)):
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         check_tx_proof = True
         if confirm_block > 6:
@@ -1538,7 +1502,7 @@ def test_check_tx_proof_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, j)
+        nodes = merkle_tree.get_proof(j)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         assert not btc_light_client.checkTxProof(txids[i], 717700, 2, nodes, i)
 
@@ -1546,7 +1510,7 @@ def test_check_tx_proof_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         assert not btc_light_client.checkTxProof(txids[j], 717700, 2, nodes, i)
 
@@ -1554,7 +1518,7 @@ def test_check_tx_proof_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         assert not btc_light_client.checkTxProof(txids[i], 717700, 2, nodes, j)
 
@@ -1568,7 +1532,7 @@ def test_check_tx_proof_and_get_time_success(btc_light_client):
         idx += 1
 
     for i in range(len(txids)):
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         result, block_time = btc_light_client.checkTxProofAndGetTime(txids[i], 717700, 2, nodes, i)
         assert result
@@ -1587,7 +1551,7 @@ def test_check_tx_proof_and_get_time_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, j)
+        nodes = merkle_tree.get_proof(j)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         result, block_time = btc_light_client.checkTxProofAndGetTime(txids[i], 717700, 2, nodes, i)
         assert not result
@@ -1597,7 +1561,7 @@ def test_check_tx_proof_and_get_time_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         result, block_time = btc_light_client.checkTxProofAndGetTime(txids[j], 717700, 2, nodes, i)
         assert not result
@@ -1607,7 +1571,7 @@ def test_check_tx_proof_and_get_time_fail(btc_light_client):
         j = i
         while j == i:
             j = random.randint(0, len(txids) - 1)
-        nodes = get_intermediate_nodes(txids, i)
+        nodes = merkle_tree.get_proof(i)
         nodes = ['0x' + binascii.hexlify(node).decode('utf8') for node in nodes]
         result, block_time = btc_light_client.checkTxProofAndGetTime(txids[i], 717700, 2, nodes, j)
         assert not result
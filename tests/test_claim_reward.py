@@ -655,6 +655,82 @@ def test_no_multisig_wallet_stake(btc_lst_stake):
         delegate_btc_lst_success(accounts[0], BTC_VALUE, BTCLST_LOCK_SCRIPT)
 
 
+def set_btc_stake_txs(delegator, candidate, tx_count, round_tag, amount, lock_time, batch_size=200):
+    for start in range(0, tx_count, batch_size):
+        BTC_STAKE.setBtcStakeTxs(delegator, candidate, start, min(batch_size, tx_count - start), round_tag, amount,
+                                 lock_time)
+
+
+def test_claim_reward_range_with_5k_btc_txs(btc_stake, btc_agent, stake_hub, set_candidate):
+    operators, consensuses = set_candidate
+    tx_count = 5000
+    claim_count = 500
+    history_reward = 10 ** 8
+    btc_stake.setIsActive(False)
+    btc_agent.setIsActive(False)
+    round_tag = btc_stake.roundTag()
+    lock_time = (round_tag + 100) * Utils.ROUND_INTERVAL
+    delegator = accounts[2]
+    set_btc_stake_txs(delegator, operators[0], tx_count, round_tag - 2, BTC_VALUE, lock_time)
+    btc_stake.setCandidateMap(operators[0], 0, 0, [round_tag - 1])
+    btc_stake.setAccruedRewardPerBTCMap(operators[0], round_tag - 1, history_reward)
+    accounts[99].transfer(stake_hub.address, BTC_VALUE * tx_count)
+    tracker = get_tracker(delegator)
+    start = 0
+    gas_used = []
+    while True:
+        tx = stake_hub.claimRewardRange(start, claim_count, {'from': delegator})
+        gas_used.append(tx.gas_used)
+        start, rewards = tx.return_value
+        if start == tx_count:
+            break
+        assert 'claimedReward' not in tx.events
+        assert btc_stake.claimCursorMap(delegator) == [round_tag, start]
+    assert len(gas_used) == tx_count // claim_count
+    # every call iterates at most claim_count txs, far below the block gas limit a single claim would need
+    assert max(gas_used) < 2 * min(gas_used)
+    assert max(gas_used) < 20000000
+    assert sum(rewards) == BTC_VALUE * tx_count
+    assert tracker.delta() == BTC_VALUE * tx_count
+    assert btc_stake.claimCursorMap(delegator) == [0, 0]
+
+
+def test_claim_reward_range_cursor_resets_every_round(btc_stake, btc_agent, stake_hub, set_candidate):
+    operators, consensuses = set_candidate
+    btc_stake.setIsActive(False)
+    btc_agent.setIsActive(False)
+    round_tag = btc_stake.roundTag()
+    lock_time = (round_tag + 100) * Utils.ROUND_INTERVAL
+    delegator = accounts[2]
+    set_btc_stake_txs(delegator, operators[0], 10, round_tag - 2, BTC_VALUE, lock_time)
+    tx = stake_hub.claimRewardRange(0, 4, {'from': delegator})
+    assert tx.return_value[0] == 4
+    with brownie.reverts("invalid claim cursor"):
+        stake_hub.claimRewardRange(5, 4, {'from': delegator})
+    stake_hub.claimRewardRange(2, 4, {'from': delegator})
+    assert btc_stake.claimCursorMap(delegator) == [round_tag, 6]
+    set_round_tag(round_tag + 1)
+    with brownie.reverts("invalid claim cursor"):
+        stake_hub.claimRewardRange(6, 4, {'from': delegator})
+    tx = stake_hub.claimRewardRange(0, 10, {'from': delegator})
+    assert tx.return_value[0] == 10
+    assert btc_stake.claimCursorMap(delegator) == [0, 0]
+
+
+def test_claim_reward_range_removes_expired_txs(btc_stake, btc_agent, stake_hub, set_candidate):
+    operators, consensuses = set_candidate
+    btc_stake.setIsActive(False)
+    btc_agent.setIsActive(False)
+    round_tag = btc_stake.roundTag()
+    delegator = accounts[2]
+    set_btc_stake_txs(delegator, operators[0], 3, round_tag - 2, BTC_VALUE, (round_tag + 100) * Utils.ROUND_INTERVAL)
+    btc_stake.setBtcStakeTxs(delegator, operators[0], 3, 3, round_tag - 2, BTC_VALUE, round_tag * Utils.ROUND_INTERVAL)
+    tx = stake_hub.claimRewardRange(0, 6, {'from': delegator})
+    assert tx.return_value[0] == 3
+    assert len(tx.events['btcExpired']) == 3
+    assert len(btc_stake.getDelegatorBtcMap(delegator)) == 3
+
+
 def init_hybrid_score_mock():
     STAKE_HUB.initHybridScoreMock()
     set_round_tag(get_current_round())
@@ -0,0 +1,64 @@
+import json
+import pytest
+from eth_account import Account
+from bitcoin.wallet import CBitcoinSecret
+from .scenario.key_pool import KeyPool, derive_keys
+
+
+def test_derived_keys_match_the_libraries():
+    pool = KeyPool("test", None, 8, cache_dir=None)
+    for _ in range(8):
+        index = pool.next_index()
+        secret = pool.secrets[index].to_bytes(32, 'big')
+        pubkey, addr = pool.public_keys[index]
+        assert addr == Account.from_key(secret).address
+        assert bytes.fromhex(pubkey) == CBitcoinSecret.from_secret_bytes(secret).pub
+
+
+def test_parallel_derivation_matches_serial():
+    secrets = list(range(1, 301))
+    assert derive_keys(secrets, workers=2) == [derive_keys([secret])[0] for secret in secrets]
+
+
+@pytest.mark.parametrize("size", [1, 7, 64])
+def test_keys_do_not_depend_on_batch_size(size):
+    expected = KeyPool("test", 42, 64, cache_dir=None)
+    pool = KeyPool("test", 42, size, cache_dir=None)
+    for _ in range(64):
+        assert pool.next_key() == expected.next_key()
+
+
+def test_cached_pool(tmp_path):
+    pool = KeyPool("test", 7, 16, cache_dir=str(tmp_path))
+    keys = [pool.next_key() for _ in range(24)]
+    assert (tmp_path / "test_7.json").exists()
+
+    cached_pool = KeyPool("test", 7, 16, cache_dir=str(tmp_path))
+    assert cached_pool.get_key_count() == 32
+    assert [cached_pool.next_key() for _ in range(24)] == keys
+    assert KeyPool("other", 7, 1, cache_dir=str(tmp_path)).next_key() != keys[0]
+
+
+@pytest.mark.parametrize("cache", [
+    [["02" + "00" * 32, "0x" + "00" * 20]],
+    {"version": 1, "check": None, "public_keys": []},
+    "not json"
+])
+def test_invalid_cache_is_rewritten(tmp_path, cache):
+    cache_file = tmp_path / "test_7.json"
+    cache_file.write_text(cache if isinstance(cache, str) else json.dumps(cache))
+
+    expected = KeyPool("test", 7, 16, cache_dir=None)
+    pool = KeyPool("test", 7, 16, cache_dir=str(tmp_path))
+    assert [pool.next_key() for _ in range(16)] == [expected.next_key() for _ in range(16)]
+    assert json.loads(cache_file.read_text())["check"] == pool.public_keys[0][1]
+
+
+def test_cache_of_another_seed_is_rewritten(tmp_path):
+    # a cache file copied from another seed holds public keys of other secrets
+    KeyPool("test", 8, 16, cache_dir=str(tmp_path))
+    (tmp_path / "test_8.json").rename(tmp_path / "test_7.json")
+
+    pool = KeyPool("test", 7, 16, cache_dir=str(tmp_path))
+    secret, pubkey = pool.next_key()
+    assert bytes.fromhex(derive_keys([int.from_bytes(secret, 'big')])[0][0]) == pubkey
@@ -2,14 +2,7 @@ import pytest
 from .scenario.scenario_generator import ScenarioGenerator
 from .scenario.scenario import Scenario
 from .scenario.account_mgr import AccountMgr
-import os
-
-
-def make_failed_scenario_file_path(start_round, stop_round, candidate_count, delegator_count):
-    base_dir = os.path.dirname(os.path.abspath(__file__))
-    file_name = f"{start_round}_{stop_round}_{candidate_count}_{delegator_count}_error.json"
-    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
-    return file_path
+from .scenario.scenario_runner import make_failed_scenario_file_path, run_random_scenarios
 
 
 @pytest.mark.skip(reason="This test is temporarily skipped")
@@ -36,3 +29,50 @@ def test_random_scenario(
         assert False
 
     print(f"Executed {scenario.get_task_count()} scenario tasks")
+
+
+@pytest.mark.skip(reason="This test is temporarily skipped")
+@pytest.mark.parametrize("scenario_count,worker_count,start_round,stop_round,candidate_count,delegator_count", [
+    [8, 4, 7, 17, 6, 5],
+    [16, 8, 10, 50, 26, 15]
+])
+def test_parallel_random_scenarios(
+        scenario_count,
+        worker_count,
+        start_round,
+        stop_round,
+        candidate_count,
+        delegator_count):
+    # every worker runs its scenarios on its own dev node, failed scenarios are dumped with their seed
+    seeds = list(range(scenario_count))
+    results, failures = run_random_scenarios(
+        seeds,
+        start_round,
+        stop_round,
+        candidate_count,
+        delegator_count,
+        worker_count
+    )
+
+    assert len(results) == scenario_count
+    assert len(failures) == 0, f"{len(failures)} random scenarios failed"
+
+
+@pytest.mark.parametrize("seed,start_round,stop_round,candidate_count,delegator_count", [
+    [1, 7, 17, 6, 5],
+    [2024, 10, 30, 12, 10]
+])
+def test_replay_generates_same_scenario(seed, start_round, stop_round, candidate_count, delegator_count):
+    AccountMgr.init_account_mgr(seed)
+    scenario = ScenarioGenerator(seed).generate(start_round, stop_round, candidate_count, delegator_count)
+    assert scenario.get_seed() == seed
+
+    # the lazily replayed rounds match the materialized ones
+    replayed = ScenarioGenerator(seed).replay(start_round, stop_round, candidate_count, delegator_count)
+    round_tasks = dict(scenario.iter_round_tasks())
+    replayed_round_count = 0
+    for advanced_round, tasks in replayed.iter_round_tasks():
+        assert tasks == round_tasks[advanced_round]
+        replayed_round_count += 1
+
+    assert replayed_round_count == len(round_tasks)
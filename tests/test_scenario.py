@@ -1,9 +1,18 @@
 import pytest
 from brownie import *
 import os
+import random
 
 from .scenario.scenario import Scenario
 from .scenario.account_mgr import AccountMgr
+from .scenario.profiler import Profiler
+from .scenario.param_source import StaticParamSource
+from .scenario.payment import Payment
+from .scenario.key_pool import KeyPool
+from .scenario.spv_relay import SpvRelay
+from .scenario.scenario_runner import init_random_sources
+from .scenario.chain_snapshot import ChainSnapshot, check_brownie_version, get_random_state
+from .common import get_current_round
 
 init_account_mgr = AccountMgr.init_account_mgr
 
@@ -21,3 +30,229 @@ def test_scenario(file_name):
 
     scenario.load(file_path)
     scenario.execute()
+
+
+@pytest.mark.parametrize("file_name,snapshot_interval", [
+    ['example_scenario.json', 2],
+    ['btcfi_scenario.json', 3],
+])
+def test_scenario_resume_from_snapshot(file_name, snapshot_interval):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    scenario.load(file_path)
+    scenario.set_snapshot_interval(snapshot_interval)
+    scenario.execute()
+
+    snapshot_rounds = sorted(scenario.get_snapshots().keys())
+    assert len(snapshot_rounds) > 1
+
+    # replay the second half of the scenario from a middle snapshot, the checkers verify every task again
+    scenario.resume(snapshot_rounds[len(snapshot_rounds) // 2])
+
+
+def test_scenario_resume_matches_full_run():
+    init_random_sources(7)
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', 'btcfi_scenario.json')
+
+    scenario.load(file_path)
+    scenario.set_snapshot_interval(2)
+    scenario.execute()
+    random_state = get_random_state()
+    height = chain.height
+
+    # the resumed run draws the same random values and sends the same transactions as the full run
+    snapshot_rounds = sorted(scenario.get_snapshots().keys())
+    scenario.resume(snapshot_rounds[0])
+    assert get_random_state() == random_state
+    assert chain.height == height
+
+
+def test_chain_snapshot_restores_state():
+    init_random_sources(7)
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', 'btcfi_scenario.json')
+
+    scenario.load(file_path)
+    scenario.execute()
+    chain_state = scenario.chain
+    snapshot = ChainSnapshot(0, chain_state)
+    height = chain.height
+    balance = accounts[1].balance()
+    random_state = get_random_state()
+    balances = dict(chain_state.balances)
+    validators = [str(addr) for addr in chain_state.get_validators().keys()]
+
+    # mutate the node, the model and the random sources after the snapshot
+    accounts[0].transfer(accounts[1], 10 ** 18)
+    chain_state.add_balance(accounts[1].address, 10 ** 18)
+    chain_state.incr_round()
+    random.random()
+
+    restored_state = snapshot.restore()
+    assert chain.height == height
+    assert accounts[1].balance() == balance
+    assert get_random_state() == random_state
+    assert restored_state.get_round() == snapshot.get_round()
+    assert restored_state.get_total_unclaimed_reward() == chain_state.get_total_unclaimed_reward()
+    assert [str(addr) for addr in restored_state.get_validators().keys()] == validators
+    assert {str(addr): amount for addr, amount in restored_state.balances.items()} == \
+           {str(addr): amount for addr, amount in balances.items()}
+
+
+def test_check_brownie_version():
+    check_brownie_version("1.20.6")
+    with pytest.raises(AssertionError):
+        check_brownie_version("1.19.3")
+
+
+@pytest.mark.parametrize("file_name", [
+    'btcfi_scenario.json',
+    'no_btclst_stake_scenario.json',
+])
+def test_scenario_spv_proof(file_name):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    scenario.load(file_path)
+    scenario.set_spv_relay(SpvRelay(0, block_tx_count=64))
+    scenario.execute()
+
+    # the stake transactions were checked against relayed headers instead of the mock check result
+    assert BtcLightClientMock[0].checkResult() is False
+    assert BtcLightClientMock[0].getChainTipHeight() > BtcLightClientMock[0].INIT_CHAIN_HEIGHT()
+
+
+@pytest.mark.parametrize("file_name,verify_policy", [
+    ['example_scenario.json', 'per-round'],
+    ['btcfi_scenario.json', 'sampled(0.3)'],
+    ['btcfi_scenario.json', 'final-only'],
+])
+def test_scenario_verify_policy(file_name, verify_policy):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    scenario.load(file_path)
+    scenario.execute(verify_policy)
+
+    # every queued check has run by the end of the scenario
+    assert scenario.get_verifier().get_queued_check_count() == 0
+
+
+@pytest.mark.parametrize("file_name", [
+    'example_scenario.json',
+    'btcfi_scenario.json',
+])
+def test_scenario_jsonl(file_name, tmp_path):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+    scenario.load(file_path)
+
+    jsonl_file_path = str(tmp_path / file_name.replace('.json', '.jsonl'))
+    scenario.dump(jsonl_file_path)
+
+    # the rounds are streamed from the line-delimited file while the scenario is executed
+    streamed_scenario = Scenario()
+    streamed_scenario.load(jsonl_file_path)
+    assert streamed_scenario.init_round == scenario.init_round
+    assert [[int(advanced_round), tasks] for advanced_round, tasks in scenario.iter_round_tasks()] == \
+           [[advanced_round, tasks] for advanced_round, tasks in streamed_scenario.iter_round_tasks()]
+
+    streamed_scenario.execute()
+
+
+def test_scenario_profiler(tmp_path):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', 'btcfi_scenario.json')
+
+    scenario.load(file_path)
+    scenario.set_profiler(Profiler({"scenario": "btcfi"}))
+    scenario.execute()
+
+    profiler = scenario.get_profiler()
+    task_profiles = profiler.get_task_profiles()
+    method_profiles = profiler.get_method_profiles()
+    assert task_profiles["TurnRound"].count > 0
+    assert task_profiles["TurnRound"].gas_used > 0
+    # every round the scenario advances is one turnRound, whichever task sends it
+    advanced_rounds = max(int(advanced_round) for advanced_round, tasks in scenario.iter_round_tasks())
+    assert get_current_round() - scenario.init_round == advanced_rounds
+    assert method_profiles["CandidateHubMock.turnRound"].tx_count == advanced_rounds
+    assert sum(task_profile.checker_eth_calls for task_profile in task_profiles.values()) > 0
+
+    file_prefix = str(tmp_path / "btcfi")
+    profiler.dump(file_prefix)
+    for suffix in [".json", "_tasks.csv", "_methods.csv"]:
+        assert os.path.isfile(file_prefix + suffix)
+
+
+@pytest.mark.parametrize("file_name,verify_policy", [
+    ['example_scenario.json', 'every-task'],
+    ['btcfi_scenario.json', 'every-task'],
+    ['btcfi_scenario.json', 'per-round'],
+])
+def test_scenario_pipelined(file_name, verify_policy):
+    init_account_mgr()
+    scenario = Scenario()
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    scenario.load(file_path)
+    scenario.set_pipelined(True)
+    scenario.execute(verify_policy)
+
+    assert scenario.get_verifier().get_queued_check_count() == 0
+
+
+def seed_random_sources(seed, param_source=None):
+    random.seed(seed)
+    init_account_mgr(seed, param_source)
+    Payment.set_random(random.Random(seed))
+    Payment.set_key_pool(KeyPool("payment", seed))
+
+
+@pytest.mark.parametrize("file_name", [
+    'example_scenario.json',
+    'btcfi_scenario.json',
+])
+def test_scenario_model_only(file_name, tmp_path):
+    base_dir = os.path.dirname(os.path.abspath(__file__))
+    file_path = os.path.join(base_dir, 'scenario', 'config', file_name)
+
+    seed_random_sources(0)
+    param_file = str(tmp_path / "params.json")
+    StaticParamSource.capture_from_chain().dump(param_file)
+
+    scenario = Scenario()
+    scenario.load(file_path)
+    scenario.execute()
+    chain_state = scenario.chain
+
+    # the same scenario against the off-chain model alone ends in the same state
+    param_source = StaticParamSource.load(param_file)
+    seed_random_sources(0, param_source)
+    model_scenario = Scenario()
+    model_scenario.load(file_path)
+    model_scenario.set_param_source(param_source)
+    model_scenario.execute()
+    model_state = model_scenario.chain
+
+    assert model_state.get_round() == chain_state.get_round()
+    assert model_state.get_total_unclaimed_reward() == chain_state.get_total_unclaimed_reward()
+    assert [str(addr) for addr in model_state.get_validators().keys()] == \
+           [str(addr) for addr in chain_state.get_validators().keys()]
+    assert {str(addr): balance for addr, balance in model_state.balances.items()} == \
+           {str(addr): balance for addr, balance in chain_state.balances.items()}
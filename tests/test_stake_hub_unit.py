@@ -424,6 +424,64 @@ def test_system_reward_insufficient_balance(stake_hub):
         stake_hub.claimReward()
 
 
+def test_claim_reward_for_success(stake_hub, core_agent):
+    __mock_stake_hub_reward()
+    reward = 10000
+    claimer = accounts[5]
+    delegators = accounts[:3]
+    for delegator in delegators:
+        core_agent.setCoreRewardMap(delegator, reward, 0)
+        stake_hub.setRewardClaimer(claimer, {'from': delegator})
+    assert stake_hub.rewardClaimerMap(delegators[0]) == claimer
+    trackers = get_trackers(delegators)
+    claimer_tracker = get_tracker(claimer)
+    tx = stake_hub.claimRewardFor(delegators, {'from': claimer})
+    assert tx.return_value == [reward] * len(delegators)
+    assert len(tx.events['claimedReward']) == len(delegators)
+    for tracker in trackers:
+        assert tracker.delta() == reward
+    assert claimer_tracker.delta() == 0
+
+
+def test_claim_reward_for_self(stake_hub, core_agent):
+    __mock_stake_hub_reward()
+    reward = 10000
+    core_agent.setCoreRewardMap(accounts[0], reward, 0)
+    tracker = get_tracker(accounts[0])
+    stake_hub.claimRewardFor([accounts[0]], {'from': accounts[0]})
+    assert tracker.delta() == reward
+
+
+def test_claim_reward_for_not_allowed(stake_hub, core_agent):
+    __mock_stake_hub_reward()
+    core_agent.setCoreRewardMap(accounts[1], 10000, 0)
+    stake_hub.setRewardClaimer(accounts[5], {'from': accounts[0]})
+    with brownie.reverts("not allowed to claim for the delegator"):
+        stake_hub.claimRewardFor([accounts[0], accounts[1]], {'from': accounts[5]})
+    stake_hub.setRewardClaimer(ZERO_ADDRESS, {'from': accounts[0]})
+    with brownie.reverts("not allowed to claim for the delegator"):
+        stake_hub.claimRewardFor([accounts[0]], {'from': accounts[5]})
+
+
+def test_claim_reward_for_settles_surplus_once(stake_hub, btc_agent):
+    stake_manager.set_lp_rates([[0, 20000]])
+    btc_agent.setPercentage(20000)
+    stake_manager.set_is_stake_hub_active(True)
+    __mock_stake_hub_reward()
+    btc_reward = 10000
+    delegators = accounts[:2]
+    for delegator in delegators:
+        round_reward_manager.mock_btc_reward_map(delegator, btc_reward, 0, MIN_INIT_DELEGATE_VALUE)
+        stake_hub.setRewardClaimer(accounts[5], {'from': delegator})
+    stake_hub.setSurplus(0)
+    trackers = get_trackers(delegators)
+    stake_hub.claimRewardFor(delegators, {'from': accounts[5]})
+    # the float rewards of the batch are refilled 10x at once
+    assert stake_hub.surplus() == btc_reward * len(delegators) * 9
+    for tracker in trackers:
+        assert tracker.delta() == btc_reward * 2
+
+
 def test_only_pledge_agent_can_call(stake_hub):
     with brownie.reverts("the sender must be pledge agent contract"):
         stake_hub.proxyClaimReward(accounts[0])